@@ -0,0 +1,41 @@
+"""add autofill answers table
+
+Revision ID: add_autofill_answers
+Revises: add_job_analyses
+Create Date: 2025-09-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = 'add_autofill_answers'
+down_revision = 'add_job_analyses'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Per-user cache of LLM-generated answers to application form questions
+    op.create_table(
+        'autofill_answers',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('field_category', sa.String(), nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('job_fingerprint', sa.String(), nullable=False),
+        sa.Column('resume_version', sa.String(), nullable=False),
+        sa.Column('answer', sa.Text(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=False),
+        sa.Column('embedding', Vector(768), nullable=True),
+        sa.Column('hit_count', sa.Integer(), nullable=True),
+        sa.Column('last_used', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_autofill_answers_user_job', 'autofill_answers', ['user_id', 'job_fingerprint'])
+
+def downgrade():
+    op.drop_index('ix_autofill_answers_user_job', table_name='autofill_answers')
+    op.drop_table('autofill_answers')
@@ -0,0 +1,35 @@
+"""add conversation_summaries table
+
+Revision ID: add_conversation_summaries
+Revises: add_admin_field
+Create Date: 2025-09-05 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversation_summaries'
+down_revision = 'add_admin_field'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Rolling per-page summary of chat messages that aged out of the history window
+    op.create_table(
+        'conversation_summaries',
+        sa.Column('page_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False, server_default=''),
+        sa.Column('summarized_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('summarized_message_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['page_id'], ['pages.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('page_id')
+    )
+    op.create_index('ix_conversation_summaries_user_id', 'conversation_summaries', ['user_id'])
+
+def downgrade():
+    op.drop_index('ix_conversation_summaries_user_id', table_name='conversation_summaries')
+    op.drop_table('conversation_summaries')
@@ -0,0 +1,22 @@
+"""add last summarized message id to conversation_summaries
+
+Revision ID: add_conversation_summary_watermark_id
+Revises: add_document_processing_error
+Create Date: 2025-10-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_conversation_summary_watermark_id'
+down_revision = 'add_document_processing_error'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Messages created in the same instant as the last summarized one are told apart by id
+    op.add_column('conversation_summaries', sa.Column('summarized_until_id', sa.String(), nullable=True))
+
+def downgrade():
+    op.drop_column('conversation_summaries', 'summarized_until_id')
@@ -0,0 +1,22 @@
+"""add processing error to documents
+
+Revision ID: add_document_processing_error
+Revises: add_autofill_answers
+Create Date: 2025-09-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_document_processing_error'
+down_revision = 'add_autofill_answers'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Failed uploads keep their error after the in-memory job is pruned
+    op.add_column('documents', sa.Column('processing_error', sa.Text(), nullable=True))
+
+def downgrade():
+    op.drop_column('documents', 'processing_error')
@@ -0,0 +1,50 @@
+"""add graph rag index tables
+
+Revision ID: add_graph_rag_index
+Revises: add_conversation_summaries
+Create Date: 2025-09-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = 'add_graph_rag_index'
+down_revision = 'add_conversation_summaries'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Persisted per-user Graph RAG chunks with their embeddings
+    op.create_table(
+        'graph_rag_chunks',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('source_id', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('chunk_index', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('cmetadata', sa.JSON(), nullable=True),
+        sa.Column('embedding', Vector(768), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_graph_rag_chunks_user_id', 'graph_rag_chunks', ['user_id'])
+    op.create_index('ix_graph_rag_chunks_user_source', 'graph_rag_chunks', ['user_id', 'source_id'])
+
+    # Extracted document metadata keyed by content hash
+    op.create_table(
+        'graph_rag_metadata',
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('cmetadata', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+
+def downgrade():
+    op.drop_table('graph_rag_metadata')
+    op.drop_index('ix_graph_rag_chunks_user_source', table_name='graph_rag_chunks')
+    op.drop_index('ix_graph_rag_chunks_user_id', table_name='graph_rag_chunks')
+    op.drop_table('graph_rag_chunks')
@@ -0,0 +1,32 @@
+"""add job analyses table
+
+Revision ID: add_job_analyses
+Revises: add_graph_rag_index
+Create Date: 2025-09-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_job_analyses'
+down_revision = 'add_graph_rag_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Job description analyses keyed by normalized description hash
+    op.create_table(
+        'job_analyses',
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('source_url', sa.String(), nullable=True),
+        sa.Column('analysis', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.create_index('ix_job_analyses_source_url', 'job_analyses', ['source_url'])
+
+def downgrade():
+    op.drop_index('ix_job_analyses_source_url', table_name='job_analyses')
+    op.drop_table('job_analyses')
@@ -0,0 +1,289 @@
+"""
+Auth Cache - cached token verification and user lookup for HTTP and WebSocket auth
+Verified Clerk tokens and extension tokens are cached by token hash until they
+expire (bounded by AUTH_CACHE_TTL_SECONDS), users are cached by external id with
+explicit invalidation, and extension token last_used writes are batched.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from jose import jwt
+from sqlalchemy import event, inspect as sa_inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.clerk import verify_token, ClerkUser, jwks_cache
+from app.db import async_session_maker
+from app.models_db import User
+from app.user_events import subscribe, PROFILE_UPDATED
+
+logger = logging.getLogger(__name__)
+
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+LAST_USED_FLUSH_SECONDS = float(os.getenv("EXTENSION_TOKEN_LAST_USED_FLUSH_SECONDS", "30"))
+
+
+class _TTLCache:
+    """Small LRU cache whose entries carry their own wall-clock expiry"""
+
+    def __init__(self, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_clerk_tokens = _TTLCache()
+_extension_tokens = _TTLCache()
+_users = _TTLCache()
+_external_ids: Dict[str, str] = {}  # user id -> external id, for invalidation by user id
+
+
+def hash_auth_token(token: str) -> str:
+    """Cache key of a bearer token; the plain token is never stored"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# ============================================================================
+# CLERK TOKENS
+# ============================================================================
+
+async def verify_token_cached(token: str) -> ClerkUser:
+    """verify_token with a cache keyed by token hash, valid until the token's exp at the latest"""
+    key = hash_auth_token(token)
+    clerk_user = _clerk_tokens.get(key)
+    if clerk_user is not None:
+        return clerk_user
+
+    # Raises HTTPException for invalid tokens, which are never cached
+    clerk_user = await verify_token(token)
+
+    expires_at = time.time() + AUTH_CACHE_TTL_SECONDS
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        if exp:
+            expires_at = min(expires_at, float(exp))
+    except Exception:
+        pass
+    _clerk_tokens.set(key, clerk_user, expires_at)
+    return clerk_user
+
+
+# ============================================================================
+# EXTENSION TOKENS
+# ============================================================================
+
+@dataclass
+class ExtensionTokenInfo:
+    token_id: str
+    token_hash: str
+    external_id: str
+    name: str
+    expires_at: Optional[datetime]
+
+    @property
+    def is_expired(self) -> bool:
+        return bool(self.expires_at and self.expires_at < datetime.utcnow())
+
+
+async def get_extension_token_cached(token_hash: str, db: AsyncSession) -> Optional[ExtensionTokenInfo]:
+    """Active extension token by hash. Expired tokens are returned so callers can report them."""
+    info = _extension_tokens.get(token_hash)
+    if info is not None:
+        return info
+
+    from app.extension_tokens import ExtensionToken
+
+    result = await db.execute(
+        select(ExtensionToken).where(
+            ExtensionToken.token_hash == token_hash,
+            ExtensionToken.is_active == True
+        )
+    )
+    token = result.scalar_one_or_none()
+    if token is None:
+        return None
+
+    info = ExtensionTokenInfo(
+        token_id=token.id,
+        token_hash=token.token_hash,
+        external_id=token.user_id,
+        name=token.name,
+        expires_at=token.expires_at,
+    )
+    if not info.is_expired:
+        expires_at = time.time() + AUTH_CACHE_TTL_SECONDS
+        if info.expires_at:
+            # expires_at is naive UTC
+            expires_at = min(expires_at, (info.expires_at - datetime.utcnow()).total_seconds() + time.time())
+        _extension_tokens.set(token_hash, info, expires_at)
+    return info
+
+
+def invalidate_extension_token(token_hash: str) -> None:
+    """Forget a cached extension token (on revocation)"""
+    _extension_tokens.pop(token_hash)
+
+
+class LastUsedRecorder:
+    """
+    Collects extension token last_used timestamps and writes them in one batched
+    UPDATE every flush interval, instead of a commit on every authenticated call.
+    """
+
+    def __init__(self, flush_interval: float = LAST_USED_FLUSH_SECONDS):
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "flushes": 0, "rows_written": 0, "errors": 0}
+
+    def record(self, token_id: str, used_at: Optional[datetime] = None) -> None:
+        self._pending[token_id] = used_at or datetime.utcnow()
+        self.stats["recorded"] += 1
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No running loop (e.g. sync context); the next record or shutdown flushes
+                pass
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        from app.extension_tokens import ExtensionToken
+
+        batch, self._pending = self._pending, {}
+        try:
+            async with async_session_maker() as db:
+                await db.execute(
+                    update(ExtensionToken),
+                    [{"id": token_id, "last_used": used_at} for token_id, used_at in batch.items()]
+                )
+                await db.commit()
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(batch)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Failed to write extension token last_used for {len(batch)} tokens: {e}")
+            # Keep newer timestamps recorded meanwhile
+            for token_id, used_at in batch.items():
+                self._pending.setdefault(token_id, used_at)
+
+    async def shutdown(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+
+last_used_recorder = LastUsedRecorder()
+
+
+# ============================================================================
+# USERS
+# ============================================================================
+
+def _user_snapshot(user: User) -> Dict[str, Any]:
+    return {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+
+
+def cache_user(user: User) -> None:
+    """Remember a loaded user's column values"""
+    _users.set(user.external_id, _user_snapshot(user), time.time() + USER_CACHE_TTL_SECONDS)
+    _external_ids[user.id] = user.external_id
+
+
+async def get_user_by_external_id_cached(external_id: str, db: AsyncSession) -> Optional[User]:
+    """
+    User by Clerk id. Cache hits are attached to db without a query (merge with
+    load=False), so routes can modify and commit current_user as before.
+    """
+    values = _users.get(external_id)
+    if values is not None:
+        user = User(**values)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    result = await db.execute(select(User).where(User.external_id == external_id))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        cache_user(user)
+    return user
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop a cached user so the next request reads it from the database"""
+    external_id = _external_ids.pop(user_id, None)
+    if external_id:
+        _users.pop(external_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session, flush_context):
+    # Any ORM write to a user (profile, subscription, admin flags...) drops the cached copy
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id:
+            invalidate_user(obj.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_user_writes(orm_execute_state):
+    # update(User)/delete(User) statements bypass the flush; they are rare, so drop every cached user
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) \
+            and orm_execute_state.bind_mapper is not None and orm_execute_state.bind_mapper.class_ is User:
+        _users.clear()
+        _external_ids.clear()
+
+
+subscribe(PROFILE_UPDATED, invalidate_user)
+
+
+def get_auth_cache_stats() -> Dict[str, Any]:
+    return {
+        "clerk_tokens": _clerk_tokens.get_stats(),
+        "extension_tokens": _extension_tokens.get_stats(),
+        "users": _users.get_stats(),
+        "last_used": dict(last_used_recorder.stats),
+        "jwks": jwks_cache.get_stats(),
+    }
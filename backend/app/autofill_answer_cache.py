@@ -0,0 +1,333 @@
+"""
+Autofill Answer Cache - per-user reuse of LLM-generated form answers
+Application forms keep asking the same questions ("Why do you want to work here?",
+"Are you authorized to work in...", "Years of experience with Python"). Answers are
+stored per user under the normalized question and field category. Questions about
+the specific role or company are additionally keyed by a fingerprint of the job
+context, all others are shared across postings. A question that is worded
+differently ("Total years of professional Python experience") is matched by
+embedding similarity within the same category. Embeddings barely separate questions
+that differ in one entity, so a semantic match also needs both questions to name the
+same specific terms: every content word outside GENERIC_TERMS (the vocabulary
+application forms phrase questions with) and every number. "Experience with Python"
+therefore never answers "experience with Java", and "authorized to work in the US"
+never answers "... in Canada". Answers are tied to the resume they were generated
+from and dropped when the resume or profile changes.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, update
+from sqlalchemy.future import select
+
+from app.db import async_session_maker
+from app.models_db import AutofillAnswer
+from app.user_events import subscribe, PROFILE_UPDATED, RESUME_UPDATED
+
+logger = logging.getLogger(__name__)
+
+# Cosine similarity above which a differently worded question reuses an answer
+AUTOFILL_ANSWER_SIMILARITY = float(os.getenv("AUTOFILL_ANSWER_SIMILARITY", "0.92"))
+# Only answers at least this confident are stored (LLM answers are 0.7)
+AUTOFILL_ANSWER_MIN_CONFIDENCE = float(os.getenv("AUTOFILL_ANSWER_MIN_CONFIDENCE", "0.7"))
+AUTOFILL_ANSWER_TTL_DAYS = int(os.getenv("AUTOFILL_ANSWER_TTL_DAYS", "90"))
+
+# Questions whose answer depends on the role or company being applied to
+JOB_SPECIFIC_MARKERS = (
+    "why", "interest", "motivat", "this role", "this position", "this job", "this company",
+    "our company", "our team", "join us", "cover letter", "for this", "salary", "compensation",
+    "relocat", "hear about", "excite", "fit for",
+)
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+BRITISH_SPELLING = re.compile(r"(?<=\w{3})is(e|ed|es|ing|ation|ations)$")
+
+# Words that do not change what a question asks. Negations and "us" are deliberately absent.
+STOPWORDS = frozenset("""
+    a an the and or of to in on at for with by from as is are was were be been being am do does did
+    have has had having you your yours i my me we our please what which who whom whose how when where
+    will would can could should shall may might must if this that these those it its there their they
+    them about into than then so such any all some each per many much currently describe provide list tell
+""".split())
+
+# Folded content words (see question_terms) that only phrase a question. Anything else,
+# e.g. a skill, country, tool, negation or number, must be the same in both questions.
+GENERIC_TERMS = frozenset("""
+    year month week day total professional relevant overall practical hand level experience experienced
+    work worked working employment employer job position role company team industry field area
+    skill proficiency proficient familiar familiarity knowledge expertise expert use using used
+    authorized authorization legally legal eligible eligibility right permit permitted valid hold
+    require required requirement need sponsorship sponsor visa status
+    notice period start date earliest available availability soon
+    salary expected expectation desired compensation current range annual
+    relocate relocation willing able open remote onsite hybrid travel commute office
+    country city location live living based reside resident citizen citizenship
+    long now future present obtain additional information anything else other like want know share here
+""".split())
+
+
+def normalize_question(text: str) -> str:
+    """Case, punctuation, Unicode form and whitespace do not make a different question"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return WHITESPACE.sub(" ", PUNCTUATION.sub(" ", text)).strip()
+
+
+def question_terms(normalized: str) -> FrozenSet[str]:
+    """Content words and numbers of a normalized question, with spelling and plural variants folded"""
+    terms = set()
+    for token in normalized.split():
+        if token in STOPWORDS:
+            continue
+        token = BRITISH_SPELLING.sub(r"iz\1", token)
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.add(token)
+    return frozenset(terms)
+
+
+def question_entities(normalized: str) -> FrozenSet[str]:
+    """The specific things a question is about: its terms outside GENERIC_TERMS"""
+    return frozenset(term for term in question_terms(normalized) if term not in GENERIC_TERMS)
+
+
+def is_job_specific(question: str) -> bool:
+    normalized = normalize_question(question)
+    return any(marker in normalized for marker in JOB_SPECIFIC_MARKERS)
+
+
+def job_fingerprint(title: Optional[str], company: Optional[str], description: Optional[str] = None) -> Optional[str]:
+    """Identifies the posting an answer was written for; None without any job context"""
+    if (title and title.strip()) or (company and company.strip()):
+        source = f"{normalize_question(company)}\0{normalize_question(title)}"
+    elif description and description.strip():
+        source = normalize_question(description)
+    else:
+        return None
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+
+
+def resume_version(resume_data: Optional[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(resume_data or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class AnswerQuery:
+    """A form field as seen by the cache"""
+    field_id: str
+    category: str
+    question: str
+    # "" for questions shared across postings, None when the answer must not be cached
+    job_fingerprint: Optional[str] = ""
+    options: List[str] = field(default_factory=list)
+    max_chars: Optional[int] = None
+
+    @property
+    def normalized(self) -> str:
+        return normalize_question(self.question)
+
+    def accepts(self, answer: str) -> bool:
+        """A cached answer must fit this form's character limit and dropdown options"""
+        if self.max_chars and len(answer) > self.max_chars:
+            return False
+        if self.options:
+            return answer.casefold() in {option.casefold() for option in self.options}
+        return True
+
+
+def answer_id(user_id: str, query: AnswerQuery) -> str:
+    key = f"{user_id}\0{query.category}\0{query.normalized}\0{query.job_fingerprint}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class AutofillAnswerCache:
+    """Persisted per-user answers with exact and embedding-similarity lookup"""
+
+    def __init__(
+        self,
+        similarity_threshold: float = AUTOFILL_ANSWER_SIMILARITY,
+        min_confidence: float = AUTOFILL_ANSWER_MIN_CONFIDENCE,
+        ttl_days: int = AUTOFILL_ANSWER_TTL_DAYS,
+        embeddings=None,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.min_confidence = min_confidence
+        self.ttl = timedelta(days=ttl_days)
+        self._embeddings = embeddings
+        self._pending: set = set()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stored": 0, "invalidations": 0, "errors": 0}
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            from app.embedding_service import embedding_service
+            self._embeddings = embedding_service
+        return self._embeddings
+
+    async def lookup(self, user_id: str, resume_ver: str, queries: Sequence[AnswerQuery]) -> Dict[str, Tuple[str, float]]:
+        """(answer, confidence) by field id for the questions answered before; never raises"""
+        queries = [query for query in queries if query.job_fingerprint is not None]
+        if not queries:
+            return {}
+        try:
+            return await self._lookup(user_id, resume_ver, queries)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Autofill answer cache lookup failed: {e}")
+            return {}
+
+    async def _lookup(self, user_id: str, resume_ver: str, queries: List[AnswerQuery]) -> Dict[str, Tuple[str, float]]:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(AutofillAnswer).where(
+                    AutofillAnswer.user_id == user_id,
+                    AutofillAnswer.resume_version == resume_ver,
+                    AutofillAnswer.job_fingerprint.in_({query.job_fingerprint for query in queries}),
+                    AutofillAnswer.created_at > datetime.now(timezone.utc) - self.ttl,
+                )
+            )
+            rows = result.scalars().all()
+
+            hits: Dict[str, Tuple[str, float]] = {}
+            used_ids = set()
+            rows_by_id = {row.id: row for row in rows}
+            remaining = []
+            for query in queries:
+                row = rows_by_id.get(answer_id(user_id, query))
+                if row is not None and query.accepts(row.answer):
+                    hits[query.field_id] = (row.answer, row.confidence)
+                    used_ids.add(row.id)
+                    self.stats["exact_hits"] += 1
+                else:
+                    remaining.append(query)
+
+            candidates = [row for row in rows if row.embedding is not None]
+            if remaining and candidates:
+                vectors = await self.embeddings.aembed_queries([query.normalized for query in remaining])
+                for query, vector in zip(remaining, vectors):
+                    match = self._best_match(query, vector, candidates)
+                    if match is not None:
+                        row, similarity = match
+                        # Less confident the further the wording drifts
+                        hits[query.field_id] = (row.answer, round(row.confidence * similarity, 2))
+                        used_ids.add(row.id)
+                        self.stats["semantic_hits"] += 1
+            self.stats["misses"] += len(queries) - len(hits)
+
+            if used_ids:
+                await db.execute(
+                    update(AutofillAnswer)
+                    .where(AutofillAnswer.id.in_(used_ids))
+                    .values(hit_count=AutofillAnswer.hit_count + 1, last_used=datetime.now(timezone.utc))
+                )
+                await db.commit()
+        return hits
+
+    def _best_match(self, query: AnswerQuery, vector: List[float], candidates: List[AutofillAnswer]) -> Optional[Tuple[AutofillAnswer, float]]:
+        # Embeddings of questions that differ in one entity ("Python" / "Java", "US" / "Canada")
+        # are nearly identical, so the questions must also be about the same things
+        entities = question_entities(query.normalized)
+        rows = [
+            row for row in candidates
+            if row.field_category == query.category and row.job_fingerprint == query.job_fingerprint
+            and question_entities(row.question) == entities and query.accepts(row.answer)
+        ]
+        if not rows:
+            return None
+        matrix = np.asarray([row.embedding for row in rows], dtype=np.float32)
+        query_vector = np.asarray(vector, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+        norms[norms == 0] = 1.0
+        similarities = matrix @ query_vector / norms
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return rows[best], float(similarities[best])
+
+    def store_later(self, user_id: str, resume_ver: str, answers: Sequence[Tuple[AnswerQuery, str, float]]) -> None:
+        """Stores new answers in the background so the caller does not wait for the write"""
+        answers = [
+            (query, answer, confidence) for query, answer, confidence in answers
+            if query.job_fingerprint is not None and answer and answer != "[MISSING]"
+            and confidence >= self.min_confidence
+        ]
+        if answers:
+            self._track(asyncio.get_running_loop().create_task(self.store(user_id, resume_ver, answers)))
+
+    async def store(self, user_id: str, resume_ver: str, answers: Sequence[Tuple[AnswerQuery, str, float]]) -> None:
+        try:
+            try:
+                vectors = await self.embeddings.aembed_queries([query.normalized for query, _, _ in answers])
+            except Exception as e:
+                # Still usable for exact matches
+                logger.warning(f"Could not embed autofill questions: {e}")
+                vectors = [None] * len(answers)
+
+            now = datetime.now(timezone.utc)
+            async with async_session_maker() as db:
+                for (query, answer, confidence), vector in zip(answers, vectors):
+                    await db.merge(AutofillAnswer(
+                        id=answer_id(user_id, query),
+                        user_id=user_id,
+                        field_category=query.category,
+                        question=query.normalized,
+                        job_fingerprint=query.job_fingerprint,
+                        resume_version=resume_ver,
+                        answer=answer,
+                        confidence=confidence,
+                        embedding=vector,
+                        hit_count=0,
+                        created_at=now,
+                    ))
+                await db.commit()
+            self.stats["stored"] += len(answers)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Could not store autofill answers: {e}")
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drops a user's answers; stale rows are never served anyway since lookups match the resume version"""
+        self.stats["invalidations"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._track(loop.create_task(self.clear_user(user_id)))
+
+    async def clear_user(self, user_id: str) -> None:
+        try:
+            async with async_session_maker() as db:
+                await db.execute(delete(AutofillAnswer).where(AutofillAnswer.user_id == user_id))
+                await db.commit()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Could not clear autofill answers for {user_id}: {e}")
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def wait_pending(self) -> None:
+        """Waits for background writes, e.g. before shutdown or in tests"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending_writes": len(self._pending)}
+
+
+# Global cache used by the extension autofill
+autofill_answer_cache = AutofillAnswerCache()
+
+subscribe(RESUME_UPDATED, autofill_answer_cache.invalidate_user)
+subscribe(PROFILE_UPDATED, autofill_answer_cache.invalidate_user)
@@ -4,17 +4,24 @@ Handles form filling requests from the Job Hacker Bot Chrome Extension
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, File, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, update
+from app.db import async_session_maker
 from app.dependencies import get_current_user, get_db
-from app.models_db import User, Resume, Document
+from app.models_db import User, Resume, Document, SavedApplicationResponse
 from app.extension_tokens import ExtensionToken, hash_token
+from app.auth_cache import get_extension_token_cached, get_user_by_external_id_cached, last_used_recorder
+from app.job_analysis import job_analysis_service, parse_analysis
+from app.autofill_answer_cache import AnswerQuery, autofill_answer_cache, is_job_specific, job_fingerprint, resume_version
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Awaitable
+import asyncio
 import json
 from datetime import datetime
 import logging
 import os
+import re
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 
@@ -22,6 +29,107 @@ log = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/chrome-extension", tags=["chrome-extension"])
 
+# ============================================================================
+# Autofill configuration
+# ============================================================================
+
+# Fields sent to the LLM in one prompt; larger forms are split into concurrent batches
+AUTOFILL_LLM_BATCH_SIZE = int(os.getenv("AUTOFILL_LLM_BATCH_SIZE", "15"))
+# Smaller batches for the streaming endpoint so the first LLM answers arrive sooner
+AUTOFILL_STREAM_BATCH_SIZE = int(os.getenv("AUTOFILL_STREAM_BATCH_SIZE", "5"))
+# Output token ceiling of a batch call; batches are sized so their expected answers stay well below it
+AUTOFILL_BATCH_MAX_TOKENS = int(os.getenv("AUTOFILL_BATCH_MAX_TOKENS", "8192"))
+# Expected answer tokens per field, used to size batches
+AUTOFILL_SHORT_ANSWER_TOKENS = 50
+AUTOFILL_FREE_TEXT_ANSWER_TOKENS = 400
+
+FORM_FILLER_SYSTEM_PROMPT = """You are an intelligent form-filling assistant helping someone apply for jobs. Your primary goal is to FILL IN AS MANY FIELDS AS POSSIBLE using the user's data.
+
+CRITICAL RULES:
+1. ALWAYS try to provide an answer if you have relevant information
+2. Analyze what the question is REALLY asking for - look beyond exact wording
+3. If you have partial information that could answer the question, USE IT
+4. Only return empty if you truly have NO relevant information
+5. Return ONLY the answer text, no explanations or meta-commentary
+6. NEVER return error messages like "I don't have" or "I cannot" - return empty string instead
+7. For skill/experience questions: The user HAS a resume - find relevant content and use it
+8. Character limits are STRICT - if specified, stay within the exact limit
+
+LOCATION PARSING:
+- Extract location components from the user's Location field in their CV
+- Parse intelligently: "City, State/Province, Country" format
+- Remove descriptors like "Area", "Bay Area", "Greater", etc.
+- For country dropdowns, use full names: "United States", "United Kingdom", "Germany"
+- Use the ACTUAL location from the CV, not placeholder values
+
+NAME PARSING:
+- Extract from the 'Full Name:' field in the user context
+- First Name = FIRST word/part of the full name (e.g., 'John' from 'John Smith')
+- Last Name = EVERYTHING AFTER the first name (e.g., 'Smith' from 'John Smith')
+- NEVER swap first and last names - order matters!
+
+UNDERSTANDING QUESTIONS:
+- Questions can be phrased in countless ways - understand the INTENT
+- For name fields: "First Name" means FIRST part of full name, "Last Name" means EVERYTHING AFTER first name
+- "Do you have experience with X?" -> Check if X appears ANYWHERE in resume (skills, experience, projects)
+- "Are you familiar with Y?" -> Look for Y in ALL sections - even partial matches count
+- "How many years..." -> Calculate from the experience dates in resume
+- "Describe your experience..." -> Summarize relevant parts from their actual background
+- "List any..." -> Search comprehensively through skills, experience, education, projects
+- "Have you worked with..." -> Check experience descriptions, skills, and projects
+- "What is your level in..." -> Provide proficiency if mentioned anywhere
+- "Tell me about..." -> Find and summarize relevant information
+- "Please provide..." -> Look for the requested information in all sections
+- Open text fields -> Use relevant experience and skills to craft a response
+
+PROACTIVE ANSWERING:
+- If asked about a skill/technology and it appears ANYWHERE in the user's profile, mention it
+- If asked about experience and you see related work, describe it
+- If asked for examples and you have any relevant experience, provide them
+- For location fields, ALWAYS use the actual location from the CV
+- When in doubt, if you have ANY relevant information, provide it
+
+FORMAT MATCHING:
+- Yes/No questions: Answer "Yes" or "No" based on the data
+- Number questions: Return just the number
+- List questions: Comma-separated or line-separated as appropriate
+- Descriptive questions: Brief, relevant response from the data
+- Dropdown fields: Return the exact text that would match an option
+
+Remember: It's better to provide relevant information than to leave fields empty. The user can always edit if needed."""
+
+BATCH_FILL_INSTRUCTIONS = """
+
+BATCHED FIELDS:
+- You will receive several fields at once, each introduced by its field id
+- Answer every field independently, following the instructions given for that field
+- Return ONLY a JSON object mapping each field id to its answer string, e.g. {"field_1": "John", "field_2": ""}
+- Use an empty string for fields you cannot answer"""
+
+JSON_SEPARATOR = re.compile(r"\s*,?\s*")
+JSON_COLON = re.compile(r"\s*:\s*")
+
+
+def parse_partial_answers(content: str) -> Dict[str, Any]:
+    """Complete key/value pairs of a JSON object reply, also when it was cut off mid-way"""
+    decoder = json.JSONDecoder()
+    answers = {}
+    position = content.find("{")
+    if position == -1:
+        return answers
+    position += 1
+    while True:
+        position = JSON_SEPARATOR.match(content, position).end()
+        try:
+            key, position = decoder.raw_decode(content, position)
+            colon = JSON_COLON.match(content, position)
+            if not isinstance(key, str) or colon is None:
+                return answers
+            value, position = decoder.raw_decode(content, colon.end())
+        except ValueError:
+            return answers
+        answers[key] = value
+
 async def get_user_from_token_or_clerk(
     request: Request,
     db: AsyncSession = Depends(get_db)
@@ -37,15 +145,8 @@ async def get_user_from_token_or_clerk(
         plain_token = authorization.replace("Bearer ", "")
         token_hash_value = hash_token(plain_token)
         
-        # Find the token
-        result = await db.execute(
-            select(ExtensionToken)
-            .filter(
-                ExtensionToken.token_hash == token_hash_value,
-                ExtensionToken.is_active == True
-            )
-        )
-        token = result.scalar_one_or_none()
+        # Find the token (cached by hash)
+        token = await get_extension_token_cached(token_hash_value, db)
         
         if not token:
             raise HTTPException(
@@ -54,23 +155,23 @@ async def get_user_from_token_or_clerk(
             )
         
         # Check expiration
-        if token.expires_at and token.expires_at < datetime.utcnow():
-            token.is_active = False
+        if token.is_expired:
+            await db.execute(
+                update(ExtensionToken)
+                .where(ExtensionToken.id == token.token_id)
+                .values(is_active=False)
+            )
             await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Extension token has expired"
             )
         
-        # Update last used
-        token.last_used = datetime.utcnow()
-        await db.commit()
+        # Update last used (written in batches)
+        last_used_recorder.record(token.token_id)
         
         # Get the user by external_id
-        user_result = await db.execute(
-            select(User).where(User.external_id == token.user_id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = await get_user_by_external_id_cached(token.external_id, db)
         
         if not user:
             raise HTTPException(
@@ -139,7 +240,9 @@ class FormFillerService:
         self.db = db
         self.resume_data = None
         self.job_context = job_context
+        self.job_analysis = None
         self.llm = None  # Initialize lazily when needed
+        self.batch_llm = None
         
     async def load_resume(self):
         """Load user's latest resume"""
@@ -164,19 +267,142 @@ class FormFillerService:
         Get value for a field from resume data or saved responses
         Returns: (value, confidence)
         """
-        # First, check for saved responses
-        saved_value = await self._get_saved_response(field.category)
-        if saved_value:
-            return saved_value, 1.0  # High confidence for saved responses
-        
-        # Try to get from resume data
-        value, confidence = self._get_from_resume(field)
-        
-        # If we couldn't find it in resume, try LLM for certain field types
-        if value == "[MISSING]" and self._should_use_llm(field):
-            value, confidence = await self._get_llm_suggestion(field)
+        return (await self.fill_fields([field]))[field.id]
+    
+    async def fill_fields(self, fields: List[FormField]) -> Dict[str, tuple[str, float]]:
+        """(value, confidence) for every field, keyed by field id"""
+        return {
+            field_id: (value, confidence)
+            async for field_id, value, confidence in self.iter_field_values(fields)
+        }
+    
+    async def iter_field_values(
+        self,
+        fields: List[FormField],
+        batch_size: Optional[int] = None,
+        saved_responses: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[tuple[str, str, float]]:
+        """
+        (field_id, value, confidence) as each field is resolved. Saved responses are
+        loaded with one query and resume mappings are resolved in memory, so those
+        fields come first, then answers reused from the per-user answer cache. The
+        remaining fields follow batch by batch as the concurrent LLM calls return,
+        and their answers are added to the cache. The usage counters of the saved
+        responses that were used are written in one statement in the background.
+        Pass saved_responses from load_saved_responses() when iterating after the
+        request's session is gone (streaming responses).
+        """
+        if saved_responses is None:
+            saved_responses = await self.load_saved_responses(fields)
+        
+        resolved = []
+        used_response_ids = set()
+        llm_fields = []
+        for field in fields:
+            saved = saved_responses.get(field.category)
+            if saved is not None:
+                resolved.append((field.id, saved.field_value, 1.0))  # High confidence for saved responses
+                used_response_ids.add(saved.id)
+                continue
+            
+            # Try to get from resume data
+            value, confidence = self._get_from_resume(field)
+            
+            # If we couldn't find it in resume, try LLM for certain field types
+            if value == "[MISSING]" and self._should_use_llm(field):
+                llm_fields.append(field)
+            else:
+                resolved.append((field.id, value, confidence))
         
-        return value, confidence
+        # The usage update has its own session, so it can overlap the LLM calls
+        usage_update = asyncio.create_task(self._record_saved_response_usage(used_response_ids))
+        batches = []
+        try:
+            for item in resolved:
+                yield item
+            
+            # Answers this user got for the same (or a similarly worded) question before
+            queries = {field.id: self._answer_query(field) for field in llm_fields}
+            version = resume_version(self.resume_data)
+            cached = await autofill_answer_cache.lookup(self.user.id, version, list(queries.values()))
+            for field_id, (value, confidence) in cached.items():
+                yield field_id, value, confidence
+            
+            batches = self._start_llm_batches(
+                [field for field in llm_fields if field.id not in cached],
+                batch_size or AUTOFILL_LLM_BATCH_SIZE
+            )
+            new_answers = []
+            for next_batch in asyncio.as_completed(batches):
+                for field_id, (value, confidence) in (await next_batch).items():
+                    new_answers.append((queries[field_id], value, confidence))
+                    yield field_id, value, confidence
+            autofill_answer_cache.store_later(self.user.id, version, new_answers)
+        finally:
+            # The consumer may stop early (e.g. the extension disconnected)
+            for batch in batches:
+                batch.cancel()
+            await usage_update
+    
+    def _answer_query(self, field: FormField) -> AnswerQuery:
+        """How the answer cache sees a field; answers about the role are tied to the posting"""
+        question = field.label or field.placeholder or field.name
+        fingerprint = ""
+        if is_job_specific(question):
+            context = self.job_context
+            fingerprint = job_fingerprint(context.title, context.company, context.description) if context else None
+        options = [
+            text for option in field.options or []
+            for text in (option.get('text'), option.get('value')) if text
+        ]
+        return AnswerQuery(
+            field_id=field.id,
+            category=field.category,
+            question=question,
+            job_fingerprint=fingerprint,
+            options=options,
+            max_chars=self._character_limit(field),
+        )
+    
+    async def load_saved_responses(self, fields: List[FormField]) -> Dict[str, Any]:
+        """Default saved responses for the categories of fields, keyed by category"""
+        categories = {field.category for field in fields}
+        if not categories:
+            return {}
+        result = await self.db.execute(
+            select(SavedApplicationResponse)
+            .where(
+                SavedApplicationResponse.user_id == self.user.id,
+                SavedApplicationResponse.field_category.in_(categories),
+                SavedApplicationResponse.is_default == True
+            )
+            .order_by(desc(SavedApplicationResponse.updated_at))
+        )
+        responses = {}
+        for response in result.scalars().all():
+            responses.setdefault(response.field_category, response)
+        return responses
+    
+    async def _record_saved_response_usage(self, response_ids: set) -> None:
+        """
+        Update usage count and last used for all saved responses used by one fill.
+        Uses its own session: when streaming, the request's session may already be closed.
+        """
+        if not response_ids:
+            return
+        try:
+            async with async_session_maker() as db:
+                await db.execute(
+                    update(SavedApplicationResponse)
+                    .where(SavedApplicationResponse.id.in_(response_ids))
+                    .values(
+                        usage_count=SavedApplicationResponse.usage_count + 1,
+                        last_used=datetime.now()
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            log.warning(f"Could not record saved response usage: {e}")
     
     def _get_from_resume(self, field: FormField) -> tuple[str, float]:
         """Get field value from resume data"""
@@ -235,29 +461,6 @@ class FormFillerService:
         # This includes linkedin, website, and all other fields that might need intelligent parsing
         return True
     
-    async def _get_saved_response(self, category: str) -> Optional[str]:
-        """Get the default saved response for a category"""
-        from app.models_db import SavedApplicationResponse
-        
-        result = await self.db.execute(
-            select(SavedApplicationResponse)
-            .where(
-                SavedApplicationResponse.user_id == self.user.id,
-                SavedApplicationResponse.field_category == category,
-                SavedApplicationResponse.is_default == True
-            )
-        )
-        response = result.scalar_one_or_none()
-        
-        if response:
-            # Update usage count and last used
-            response.usage_count += 1
-            response.last_used = datetime.now()
-            await self.db.commit()
-            return response.field_value
-        
-        return None
-    
     def _get_personal_field(self, field_type: str) -> tuple[str, float]:
         """Get personal information fields - basic fields only, complex ones use LLM"""
         personal_info = self.resume_data.get('personalInfo', {})
@@ -359,124 +562,204 @@ class FormFillerService:
                 anthropic_api_key=os.getenv("ANTHROPIC_API_KEY")
             )
     
+    def _init_batch_llm(self):
+        """Claude LLM with room for the answers to a whole batch of fields"""
+        if not self.batch_llm:
+            self.batch_llm = ChatAnthropic(
+                model="claude-3-7-sonnet-20250219",
+                temperature=0.3,
+                max_tokens=AUTOFILL_BATCH_MAX_TOKENS,
+                anthropic_api_key=os.getenv("ANTHROPIC_API_KEY")
+            )
+    
     async def _get_llm_suggestion(self, field: FormField) -> tuple[str, float]:
         """Get LLM-generated suggestion for a field"""
         try:
             self._init_llm()
             
-            # Build context about the user
-            user_context = self._build_user_context()
-            
-            # Build job context if available
-            job_info = ""
-            if self.job_context:
-                job_info = f"""
-                Job Details:
-                - Title: {self.job_context.title or 'Not specified'}
-                - Company: {self.job_context.company or 'Not specified'}
-                - Location: {self.job_context.location or 'Not specified'}
-                - Description: {self.job_context.description[:500] if self.job_context.description else 'Not provided'}
-                """
-            
             # Create prompt based on field category
-            prompt = self._create_field_prompt(field, user_context, job_info)
+            prompt = self._create_field_prompt(field, self._build_user_context(), await self._build_job_info())
             
             # Get response from Claude
             messages = [
-                SystemMessage(content="""You are an intelligent form-filling assistant helping someone apply for jobs. Your primary goal is to FILL IN AS MANY FIELDS AS POSSIBLE using the user's data.
-
-CRITICAL RULES:
-1. ALWAYS try to provide an answer if you have relevant information
-2. Analyze what the question is REALLY asking for - look beyond exact wording
-3. If you have partial information that could answer the question, USE IT
-4. Only return empty if you truly have NO relevant information
-5. Return ONLY the answer text, no explanations or meta-commentary
-6. NEVER return error messages like "I don't have" or "I cannot" - return empty string instead
-7. For skill/experience questions: The user HAS a resume - find relevant content and use it
-8. Character limits are STRICT - if specified, stay within the exact limit
-
-LOCATION PARSING:
-- Extract location components from the user's Location field in their CV
-- Parse intelligently: "City, State/Province, Country" format
-- Remove descriptors like "Area", "Bay Area", "Greater", etc.
-- For country dropdowns, use full names: "United States", "United Kingdom", "Germany"
-- Use the ACTUAL location from the CV, not placeholder values
-
-NAME PARSING:
-- Extract from the 'Full Name:' field in the user context
-- First Name = FIRST word/part of the full name (e.g., 'John' from 'John Smith')
-- Last Name = EVERYTHING AFTER the first name (e.g., 'Smith' from 'John Smith')
-- NEVER swap first and last names - order matters!
-
-UNDERSTANDING QUESTIONS:
-- Questions can be phrased in countless ways - understand the INTENT
-- For name fields: "First Name" means FIRST part of full name, "Last Name" means EVERYTHING AFTER first name
-- "Do you have experience with X?" -> Check if X appears ANYWHERE in resume (skills, experience, projects)
-- "Are you familiar with Y?" -> Look for Y in ALL sections - even partial matches count
-- "How many years..." -> Calculate from the experience dates in resume
-- "Describe your experience..." -> Summarize relevant parts from their actual background
-- "List any..." -> Search comprehensively through skills, experience, education, projects
-- "Have you worked with..." -> Check experience descriptions, skills, and projects
-- "What is your level in..." -> Provide proficiency if mentioned anywhere
-- "Tell me about..." -> Find and summarize relevant information
-- "Please provide..." -> Look for the requested information in all sections
-- Open text fields -> Use relevant experience and skills to craft a response
-
-PROACTIVE ANSWERING:
-- If asked about a skill/technology and it appears ANYWHERE in the user's profile, mention it
-- If asked about experience and you see related work, describe it
-- If asked for examples and you have any relevant experience, provide them
-- For location fields, ALWAYS use the actual location from the CV
-- When in doubt, if you have ANY relevant information, provide it
-
-FORMAT MATCHING:
-- Yes/No questions: Answer "Yes" or "No" based on the data
-- Number questions: Return just the number
-- List questions: Comma-separated or line-separated as appropriate
-- Descriptive questions: Brief, relevant response from the data
-- Dropdown fields: Return the exact text that would match an option
-
-Remember: It's better to provide relevant information than to leave fields empty. The user can always edit if needed."""),
+                SystemMessage(content=FORM_FILLER_SYSTEM_PROMPT),
                 HumanMessage(content=prompt)
             ]
             
             response = await self.llm.ainvoke(messages)
-            
-            # Extract the response text
-            suggestion = response.content.strip()
-            
-            # Check for error responses from the LLM
-            # Be more selective - only reject clear error messages, not valid responses
-            error_indicators = [
-                "Chatbot:", "ChatGPT:", "Assistant:", "I apologize",
-                "I'm an AI", "As an AI", "I am an AI"
-            ]
-            
-            # Check if it's JUST an error message (short response with error indicator)
-            if len(suggestion) < 50:
-                short_error_indicators = ["I don't have", "I cannot", "I'm sorry", "Unable to", "I need"]
-                if any(indicator in suggestion for indicator in short_error_indicators):
-                    return "", 0.0
-            
-            # Always reject if it starts with bot identifiers
-            if any(suggestion.startswith(indicator) for indicator in error_indicators):
-                return "", 0.0
-            
-            # Don't return [MISSING] from LLM, return empty if we can't generate
-            if "[MISSING]" in suggestion or not suggestion:
-                return "", 0.0
-            
-            # Clean up the response - remove any meta commentary
-            if ":" in suggestion and suggestion.startswith(("Chatbot", "ChatGPT", "Assistant")):
-                suggestion = suggestion.split(":", 1)[1].strip()
-            
-            # Return with confidence of 0.7 for LLM-generated content
-            return suggestion, 0.7
+            return self._clean_suggestion(response.content)
             
         except Exception as e:
             log.error(f"Error getting LLM suggestion: {e}")
             return "[MISSING]", 0.0
     
+    def _start_llm_batches(self, fields: List[FormField], batch_size: int) -> List[asyncio.Task]:
+        """
+        One task per batch of fields; each batch is answered by a single LLM call,
+        and the job analysis behind the shared job details is fetched once
+        """
+        if not fields:
+            return []
+        job_info = asyncio.ensure_future(self._build_job_info())
+        return [
+            asyncio.create_task(self._get_llm_batch(batch, job_info))
+            for batch in self._plan_batches(fields, batch_size)
+        ]
+    
+    def _expected_answer_tokens(self, field: FormField) -> int:
+        limit = self._character_limit(field)
+        if limit:
+            # About 3-4 characters per token, plus the JSON key
+            return limit // 3 + 20
+        if field.type == 'textarea' or field.category.startswith('questions.'):
+            return AUTOFILL_FREE_TEXT_ANSWER_TOKENS
+        return AUTOFILL_SHORT_ANSWER_TOKENS
+    
+    def _plan_batches(self, fields: List[FormField], batch_size: int) -> List[List[FormField]]:
+        """Batches of at most batch_size fields whose answers fit in half the output ceiling"""
+        budget = AUTOFILL_BATCH_MAX_TOKENS // 2
+        batches, batch, tokens = [], [], 0
+        for field in fields:
+            needed = self._expected_answer_tokens(field)
+            if batch and (len(batch) >= batch_size or tokens + needed > budget):
+                batches.append(batch)
+                batch, tokens = [], 0
+            batch.append(field)
+            tokens += needed
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _get_llm_batch(self, fields: List[FormField], job_info: Awaitable[str]) -> Dict[str, tuple[str, float]]:
+        """
+        One structured prompt for several fields, answered as a JSON object keyed by
+        field id. If the reply is cut off or malformed, the answers that did arrive
+        are kept and the other fields are asked again in smaller batches.
+        """
+        try:
+            self._init_batch_llm()
+            user_context = self._build_user_context()
+            job_details = await asyncio.shield(job_info)
+        except Exception as e:
+            log.error(f"Error preparing LLM suggestions: {e}")
+            return {field.id: ("[MISSING]", 0.0) for field in fields}
+        
+        field_sections = [
+            f"""
+        Field id: {json.dumps(field.id)}
+        {self._describe_field(field)}
+        {self._field_instructions(field)}
+        """
+            for field in fields
+        ]
+        prompt = f"""
+        User Information:
+        {user_context}
+        
+        {job_details}
+        
+        Fields to fill ({len(fields)}):
+        {"".join(field_sections)}
+        
+        Return only a JSON object with one answer per field id:
+        """
+        
+        try:
+            response = await self.batch_llm.ainvoke([
+                SystemMessage(content=FORM_FILLER_SYSTEM_PROMPT + BATCH_FILL_INSTRUCTIONS),
+                HumanMessage(content=prompt)
+            ])
+        except Exception as e:
+            log.error(f"Error getting LLM suggestions for {len(fields)} fields: {e}")
+            return {field.id: ("[MISSING]", 0.0) for field in fields}
+        
+        try:
+            answers = parse_analysis(response.content)
+            complete = True
+        except Exception as e:
+            # Typically a reply truncated at max_tokens
+            answers = parse_partial_answers(response.content)
+            complete = False
+            log.warning(f"Incomplete LLM reply for {len(fields)} fields ({len(answers)} answers recovered): {e}")
+        
+        suggestions = {}
+        unanswered = []
+        for field in fields:
+            answer = answers.get(field.id)
+            if answer is None and not complete:
+                unanswered.append(field)
+                continue
+            if isinstance(answer, list):
+                answer = ", ".join(str(item) for item in answer)
+            suggestions[field.id] = self._clean_suggestion("" if answer is None else str(answer))
+        
+        if unanswered and len(fields) > 1:
+            half = max(1, (len(unanswered) + 1) // 2)
+            for retried in await asyncio.gather(*(
+                self._get_llm_batch(unanswered[i:i + half], job_info)
+                for i in range(0, len(unanswered), half)
+            )):
+                suggestions.update(retried)
+        else:
+            for field in unanswered:
+                suggestions[field.id] = ("[MISSING]", 0.0)
+        return suggestions
+    
+    def _clean_suggestion(self, suggestion: str) -> tuple[str, float]:
+        """Rejects refusals and meta commentary in an LLM answer"""
+        suggestion = suggestion.strip()
+        
+        # Check for error responses from the LLM
+        # Be more selective - only reject clear error messages, not valid responses
+        error_indicators = [
+            "Chatbot:", "ChatGPT:", "Assistant:", "I apologize",
+            "I'm an AI", "As an AI", "I am an AI"
+        ]
+        
+        # Check if it's JUST an error message (short response with error indicator)
+        if len(suggestion) < 50:
+            short_error_indicators = ["I don't have", "I cannot", "I'm sorry", "Unable to", "I need"]
+            if any(indicator in suggestion for indicator in short_error_indicators):
+                return "", 0.0
+        
+        # Always reject if it starts with bot identifiers
+        if any(suggestion.startswith(indicator) for indicator in error_indicators):
+            return "", 0.0
+        
+        # Don't return [MISSING] from LLM, return empty if we can't generate
+        if "[MISSING]" in suggestion or not suggestion:
+            return "", 0.0
+        
+        # Clean up the response - remove any meta commentary
+        if ":" in suggestion and suggestion.startswith(("Chatbot", "ChatGPT", "Assistant")):
+            suggestion = suggestion.split(":", 1)[1].strip()
+        
+        # Return with confidence of 0.7 for LLM-generated content
+        return suggestion, 0.7
+    
+    async def _build_job_info(self) -> str:
+        """Job details for the prompts, enriched with the shared posting analysis"""
+        if not self.job_context:
+            return ""
+        analysis = await self._get_job_analysis() or {}
+        requirements = ", ".join(analysis.get("required_skills") or [])
+        return f"""
+                Job Details:
+                - Title: {self.job_context.title or analysis.get('job_title') or 'Not specified'}
+                - Company: {self.job_context.company or analysis.get('company') or 'Not specified'}
+                - Location: {self.job_context.location or analysis.get('location') or 'Not specified'}
+                - Key Requirements: {requirements or 'Not specified'}
+                - Description: {self.job_context.description[:500] if self.job_context.description else 'Not provided'}
+                """
+    
+    async def _get_job_analysis(self) -> Optional[Dict[str, Any]]:
+        """Shared analysis of the posting, computed once per posting across all features"""
+        if not self.job_context or not self.job_context.description:
+            return None
+        if self.job_analysis is None:
+            self.job_analysis = await job_analysis_service.analyze(self.job_context.description, fallback={})
+        return self.job_analysis
+    
     def _build_user_context(self) -> str:
         """Build context about the user from their resume"""
         if not self.resume_data:
@@ -604,27 +887,52 @@ Remember: It's better to provide relevant information than to leave fields empty
     
     def _create_field_prompt(self, field: FormField, user_context: str, job_info: str) -> str:
         """Create a specific prompt based on field type"""
-        category_parts = field.category.split('.')
-        main_category = category_parts[0] if category_parts else ''
-        sub_category = category_parts[1] if len(category_parts) > 1 else ''
-        
-        base_prompt = f"""
+        return f"""
         User Information:
         {user_context}
         
         {job_info}
         
         Field to fill:
-        - Label: {field.label}
+        {self._describe_field(field)}
+        """ + self._field_instructions(field)
+    
+    def _describe_field(self, field: FormField) -> str:
+        """Label, name, category and placeholder lines shared by the single and batched prompts"""
+        description = f"""- Label: {field.label}
         - Name: {field.name}
         - Category: {field.category}
-        - Placeholder: {field.placeholder or 'None'}
-        """
+        - Placeholder: {field.placeholder or 'None'}"""
+        if field.options:
+            option_texts = [option.get('text') or option.get('value') or '' for option in field.options]
+            description += f"\n        - Options: {', '.join(text for text in option_texts if text)}"
+        return description
+    
+    def _character_limit(self, field: FormField) -> Optional[int]:
+        """Character limit mentioned in the label, placeholder or name, if any"""
+        full_text = f"{field.label or ''} {field.placeholder or ''} {field.name or ''}".lower()
+        
+        # Look for patterns like "200 characters" or "200 char" or "(200)"
+        if 'character' in full_text or 'char' in full_text:
+            # Take the first reasonable character limit (usually 100-1000)
+            for num in re.findall(r'\d+', full_text):
+                num_int = int(num)
+                if 50 <= num_int <= 5000:  # Reasonable character limit range
+                    return num_int
+        return None
+    
+    def _field_instructions(self, field: FormField) -> str:
+        """Category-specific instructions for a field"""
+        category_parts = field.category.split('.')
+        main_category = category_parts[0] if category_parts else ''
+        sub_category = category_parts[1] if len(category_parts) > 1 else ''
+        
+        instructions = ""
         
         # Address and location parsing with improved CV location usage
         if main_category == 'personal':
             if sub_category in ['firstName', 'first_name'] or 'first' in field.label.lower():
-                base_prompt += """\nExtract ONLY the FIRST name from the 'Full Name' field in the user information above.
+                instructions += """\nExtract ONLY the FIRST name from the 'Full Name' field in the user information above.
                 
                 IMPORTANT: The first name is the FIRST WORD in the full name.
                 Examples:
@@ -636,7 +944,7 @@ Remember: It's better to provide relevant information than to leave fields empty
                 Look for 'Full Name:' in the context above and extract the FIRST part only.
                 Return ONLY the first name, nothing else. Do NOT return the last name."""
             elif sub_category in ['lastName', 'last_name'] or 'last' in field.label.lower():
-                base_prompt += """\nExtract ONLY the LAST name(s) from the 'Full Name' field in the user information above.
+                instructions += """\nExtract ONLY the LAST name(s) from the 'Full Name' field in the user information above.
                 
                 IMPORTANT: The last name is everything AFTER the first name.
                 Examples:
@@ -649,7 +957,7 @@ Remember: It's better to provide relevant information than to leave fields empty
                 Look for 'Full Name:' in the context above and extract everything AFTER the first name.
                 Return ONLY the last name(s), nothing else. Do NOT return the first name."""
             elif sub_category in ['city', 'town'] or 'city' in field.label.lower():
-                base_prompt += """\nExtract ONLY the city name from the Location/City field in the user's information above.
+                instructions += """\nExtract ONLY the city name from the Location/City field in the user's information above.
                 Examples:
                 - 'New York, NY, USA' -> 'New York'
                 - 'San Francisco Bay Area' -> 'San Francisco'
@@ -658,7 +966,7 @@ Remember: It's better to provide relevant information than to leave fields empty
                 Look for the City field or parse it from the Location field.
                 Return ONLY the city name without 'Area' or other descriptors."""
             elif sub_category in ['state', 'province'] or 'state' in field.label.lower():
-                base_prompt += """\nExtract the state/province if applicable from the user's location.
+                instructions += """\nExtract the state/province if applicable from the user's location.
                 For countries without states/provinces, return empty.
                 For US locations, return the state abbreviation (e.g., 'CA', 'NY').
                 Examples:
@@ -666,7 +974,7 @@ Remember: It's better to provide relevant information than to leave fields empty
                 - 'Berlin, Germany' -> empty
                 - 'Toronto, Ontario, Canada' -> 'Ontario'"""
             elif sub_category in ['country'] or 'country' in field.label.lower():
-                base_prompt += """\nExtract the country from the user's Location or Country field.
+                instructions += """\nExtract the country from the user's Location or Country field.
                 Return the FULL country name suitable for dropdown selection.
                 Examples:
                 - 'New York, NY, USA' -> 'United States'
@@ -676,15 +984,15 @@ Remember: It's better to provide relevant information than to leave fields empty
                 Look for the Country field or extract it from the Location field.
                 Return standard country names (not abbreviations)."""
             elif sub_category in ['zip', 'zipCode', 'postalCode'] or 'zip' in field.label.lower() or 'postal' in field.label.lower():
-                base_prompt += "\nIf you have a zip/postal code in the user's data, return it. Otherwise return empty. Do not make up postal codes."
+                instructions += "\nIf you have a zip/postal code in the user's data, return it. Otherwise return empty. Do not make up postal codes."
             elif sub_category in ['address', 'street', 'streetAddress'] or 'address' in field.label.lower():
-                base_prompt += """\nFor street address fields:
+                instructions += """\nFor street address fields:
                 - If you have a specific street address with number and street name, return it
                 - If you only have city/country information, return empty
                 - Do NOT use city name as street address
                 - Only fill if you have an actual street address"""
             elif sub_category == 'nationality' or 'nationality' in field.label.lower():
-                base_prompt += """\nInfer nationality from the location or country in the user's data.
+                instructions += """\nInfer nationality from the location or country in the user's data.
                 Examples:
                 - United States/US location -> 'American'
                 - United Kingdom/UK location -> 'British'
@@ -711,32 +1019,16 @@ Remember: It's better to provide relevant information than to leave fields empty
             
             if any(indicator in combined_text for indicator in skill_indicators):
                 # Check if there's a character limit mentioned in label, placeholder, or nearby text
-                char_limit_match = None
-                
-                # Look for character limits in various places
-                import re
-                full_text = f"{field.label or ''} {field.placeholder or ''} {field.name or ''}".lower()
-                
-                # Look for patterns like "200 characters" or "200 char" or "(200)"
-                if 'character' in full_text or 'char' in full_text:
-                    # Extract all numbers from the text
-                    numbers = re.findall(r'\d+', full_text)
-                    if numbers:
-                        # Take the first reasonable character limit (usually 100-1000)
-                        for num in numbers:
-                            num_int = int(num)
-                            if 50 <= num_int <= 5000:  # Reasonable character limit range
-                                char_limit_match = num_int
-                                break
+                char_limit_match = self._character_limit(field)
                 
                 if char_limit_match:
-                    base_prompt += f"""\nDescribe the user's relevant skills and experience for this position.
+                    instructions += f"""\nDescribe the user's relevant skills and experience for this position.
                     IMPORTANT: Response must be EXACTLY {char_limit_match} characters or less (not words, characters).
                     Focus on the most relevant skills and experience from their profile.
                     Be concise and specific. Use their actual skills and experience.
                     Make every character count - provide maximum value within the limit."""
                 else:
-                    base_prompt += f"""\nThis is asking about skills/experience. 
+                    instructions += f"""\nThis is asking about skills/experience. 
                     Analyze the exact question: '{field.label}'
                     
                     IMPORTANT: The user HAS a resume with skills and experience. Find and use it!
@@ -750,76 +1042,76 @@ Remember: It's better to provide relevant information than to leave fields empty
                     Don't leave this empty - provide a strong response based on their actual background."""
             
             elif 'why' in combined_text or 'interest' in combined_text or 'motivat' in combined_text:
-                base_prompt += "\nGenerate a brief, professional response about why the candidate is interested in this role/company based on their background and the job context."
+                instructions += "\nGenerate a brief, professional response about why the candidate is interested in this role/company based on their background and the job context."
             
             elif 'salary' in combined_text or 'compensation' in combined_text or 'pay' in combined_text:
-                base_prompt += "\nProvide a professional salary expectation response. If unclear, respond with 'Competitive with market rates for this role and location'."
+                instructions += "\nProvide a professional salary expectation response. If unclear, respond with 'Competitive with market rates for this role and location'."
             
             elif 'start' in combined_text or 'available' in combined_text or 'begin' in combined_text:
-                base_prompt += "\nProvide a reasonable start date (e.g., '2 weeks from offer acceptance' or 'Immediately')."
+                instructions += "\nProvide a reasonable start date (e.g., '2 weeks from offer acceptance' or 'Immediately')."
             
             elif 'notice' in combined_text:
-                base_prompt += "\nProvide a standard notice period (e.g., '2 weeks', '1 month', '30 days')."
+                instructions += "\nProvide a standard notice period (e.g., '2 weeks', '1 month', '30 days')."
             
             elif 'year' in combined_text and 'experience' in combined_text:
-                base_prompt += "\nCalculate years of experience from the user's work history. Return just the number."
+                instructions += "\nCalculate years of experience from the user's work history. Return just the number."
             
             # Additional question patterns
             elif 'degree' in combined_text or 'education' in combined_text or 'university' in combined_text or 'college' in combined_text:
-                base_prompt += """\nProvide information about the user's education from their resume.
+                instructions += """\nProvide information about the user's education from their resume.
                 Include degree, institution, and graduation year if available.
                 If asking for highest degree, provide the most advanced degree."""
             
             elif 'authorization' in combined_text or 'authorized to work' in combined_text or 'work permit' in combined_text or 'visa' in combined_text:
-                base_prompt += """\nCheck if the user has mentioned work authorization in their profile.
+                instructions += """\nCheck if the user has mentioned work authorization in their profile.
                 Common responses: 'Yes', 'Authorized to work in [country]', or check their profile for visa/work status."""
             
             elif 'citizenship' in combined_text or 'citizen' in combined_text:
-                base_prompt += """\nIf citizenship information is available in the profile, provide it.
+                instructions += """\nIf citizenship information is available in the profile, provide it.
                 Otherwise, you may infer from location if appropriate, or leave empty."""
             
             elif 'language' in combined_text and ('speak' in combined_text or 'fluent' in combined_text or 'proficiency' in combined_text):
-                base_prompt += """\nList languages the user speaks if mentioned in their profile.
+                instructions += """\nList languages the user speaks if mentioned in their profile.
                 Include proficiency levels if available (native, fluent, professional, basic)."""
             
             elif 'relocate' in combined_text or 'relocation' in combined_text or 'willing to move' in combined_text:
-                base_prompt += """\nProvide a professional response about relocation willingness.
+                instructions += """\nProvide a professional response about relocation willingness.
                 Default to 'Open to relocation for the right opportunity' if not specified."""
             
             elif 'remote' in combined_text or 'hybrid' in combined_text or 'onsite' in combined_text or 'in-office' in combined_text:
-                base_prompt += """\nProvide a response about work arrangement preferences.
+                instructions += """\nProvide a response about work arrangement preferences.
                 Common responses: 'Open to remote/hybrid/onsite', 'Prefer remote', etc."""
             
             elif 'reference' in combined_text:
-                base_prompt += """\nProvide a standard response about references.
+                instructions += """\nProvide a standard response about references.
                 Common response: 'Available upon request' or 'Yes' if it's a yes/no question."""
             
             elif 'portfolio' in combined_text or 'github' in combined_text or 'website' in combined_text:
-                base_prompt += """\nProvide links to portfolio, GitHub, or personal website if available in the user's profile.
+                instructions += """\nProvide links to portfolio, GitHub, or personal website if available in the user's profile.
                 Check for website, linkedin, github fields."""
             
             elif 'hear about' in combined_text or 'how did you' in combined_text or 'where did you find' in combined_text:
-                base_prompt += """\nProvide a professional response about how they found the position.
+                instructions += """\nProvide a professional response about how they found the position.
                 Common responses: 'Company website', 'LinkedIn', 'Job board', 'Professional network'."""
             
             elif any(word in combined_text for word in ['gap', 'unemployed', 'break', 'time off']):
-                base_prompt += """\nIf there are employment gaps in the resume, provide a brief professional explanation.
+                instructions += """\nIf there are employment gaps in the resume, provide a brief professional explanation.
                 Otherwise, respond 'No significant gaps in employment'."""
             
             elif 'travel' in combined_text and 'willing' in combined_text:
-                base_prompt += """\nProvide a response about travel willingness.
+                instructions += """\nProvide a response about travel willingness.
                 Common responses: 'Yes', 'Up to 25%', 'As needed for the role'."""
             
             elif 'certif' in combined_text or 'license' in combined_text:
-                base_prompt += """\nList any certifications or licenses mentioned in the user's profile.
+                instructions += """\nList any certifications or licenses mentioned in the user's profile.
                 Include certification names and dates if available."""
             
             elif 'clearance' in combined_text or 'security' in combined_text:
-                base_prompt += """\nIf security clearance is mentioned in profile, provide it.
+                instructions += """\nIf security clearance is mentioned in profile, provide it.
                 Otherwise: 'Eligible to obtain clearance' or 'No current clearance'."""
             
             else:
-                base_prompt += f"""\nAnalyze this question carefully: '{field.label}'
+                instructions += f"""\nAnalyze this question carefully: '{field.label}'
                 
                 IMPORTANT: This is a question that needs answering. Look for:
                 1. What type of information is being requested?
@@ -840,13 +1132,13 @@ Remember: It's better to provide relevant information than to leave fields empty
         
         elif main_category == 'professional':
             if sub_category == 'yearsOfExperience':
-                base_prompt += "\nCalculate and return just the number of years of experience."
+                instructions += "\nCalculate and return just the number of years of experience."
             elif sub_category == 'currentTitle':
-                base_prompt += "\nReturn the user's current or most recent job title."
+                instructions += "\nReturn the user's current or most recent job title."
             elif sub_category == 'desiredSalary':
-                base_prompt += "\nProvide a salary range based on the role and location."
+                instructions += "\nProvide a salary range based on the role and location."
         
-        return base_prompt
+        return instructions
 
 # API Endpoints
 
@@ -892,13 +1184,8 @@ async def get_extension_status(
         profileComplete=profile_complete
     )
 
-@router.post("/autofill")
-async def autofill_form(
-    request: AutofillRequest,
-    current_user: User = Depends(get_user_from_token_or_clerk),
-    db: AsyncSession = Depends(get_db)
-) -> AutofillResponse:
-    """Process autofill request from extension"""
+async def _prepare_autofill(request: AutofillRequest, current_user: User, db: AsyncSession) -> tuple[FormFillerService, List[FormField]]:
+    """Checks the extension settings, loads the resume and drops password fields"""
     
     # Check if extension is enabled
     preferences = current_user.preferences or {}
@@ -928,20 +1215,34 @@ async def autofill_form(
             detail="No resume found. Please create a resume first."
         )
     
+    # Skip password fields
+    fields = [
+        field for field in request.formStructure.fields
+        if not (field.type == 'password' or
+                'password' in field.name.lower() or
+                'password' in field.category.lower() or
+                (field.label and 'password' in field.label.lower()))
+    ]
+    return filler, fields
+
+@router.post("/autofill")
+async def autofill_form(
+    request: AutofillRequest,
+    current_user: User = Depends(get_user_from_token_or_clerk),
+    db: AsyncSession = Depends(get_db)
+) -> AutofillResponse:
+    """Process autofill request from extension"""
+    filler, fields = await _prepare_autofill(request, current_user, db)
+    
     # Process each field
     field_values = {}
     confidence_scores = {}
     missing_info = {}
     
-    for field in request.formStructure.fields:
-        # Skip password fields
-        if (field.type == 'password' or 
-            'password' in field.name.lower() or 
-            'password' in field.category.lower() or
-            (field.label and 'password' in field.label.lower())):
-            continue
-            
-        value, confidence = await filler.get_field_value(field)
+    values = await filler.fill_fields(fields)
+    
+    for field in fields:
+        value, confidence = values[field.id]
         
         if value == "[MISSING]":
             missing_info[field.id] = f"Please provide {field.label or field.name}"
@@ -955,6 +1256,54 @@ async def autofill_form(
         missingInfo=missing_info
     )
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/autofill/stream")
+async def autofill_form_stream(
+    request: AutofillRequest,
+    current_user: User = Depends(get_user_from_token_or_clerk),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Streaming variant of /autofill (Server-Sent Events). Each field is sent as soon
+    as it is resolved: saved responses and resume mappings immediately, LLM answers
+    as their batch returns. Events:
+    - field: {"fieldId", "value", "confidence"}
+    - missing: {"fieldId", "message"}
+    - done: {"filled", "missing"}
+    - error: {"detail"} if autofill fails after the stream started
+    """
+    filler, fields = await _prepare_autofill(request, current_user, db)
+    # Depending on the FastAPI version, db is closed before the body is streamed,
+    # so everything that needs it is loaded here
+    saved_responses = await filler.load_saved_responses(fields)
+    labels = {field.id: field.label or field.name for field in fields}
+    
+    async def events():
+        filled = missing = 0
+        try:
+            async for field_id, value, confidence in filler.iter_field_values(
+                fields, AUTOFILL_STREAM_BATCH_SIZE, saved_responses
+            ):
+                if value == "[MISSING]":
+                    missing += 1
+                    yield _sse_event("missing", {"fieldId": field_id, "message": f"Please provide {labels[field_id]}"})
+                else:
+                    filled += 1
+                    yield _sse_event("field", {"fieldId": field_id, "value": value, "confidence": confidence})
+        except Exception as e:
+            log.error(f"Streaming autofill failed: {e}")
+            yield _sse_event("error", {"detail": "Autofill failed"})
+            return
+        yield _sse_event("done", {"filled": filled, "missing": missing})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/save-response")
 async def save_application_response(
     request: dict,
@@ -0,0 +1,161 @@
+"""
+Chunking - section-aware splitting shared by the vector store and Graph RAG
+Resume section headings are found in a single pass with one precompiled pattern.
+Every chunk carries its section type, and its id is derived from the document id
+and the chunk content, so the output is deterministic and unchanged chunks keep
+their ids across edits (which is what incremental re-embedding relies on).
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "1000"))
+# Bump when the chunking output changes so stored chunks are rebuilt on the next sync
+CHUNKER_VERSION = "2"
+
+GENERAL_SECTION = "general"
+
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history",
+    ),
+    "education": ("education", "academic background", "education and training", "qualifications"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "competencies"),
+    "projects": ("projects", "project experience", "personal projects", "selected projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications"),
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective", "about me"),
+    "languages": ("languages",),
+    "awards": ("awards", "honors", "achievements"),
+}
+
+
+def _compile_heading_pattern() -> re.Pattern:
+    groups = []
+    for section, headings in SECTION_HEADINGS.items():
+        # Longest first so "work experience" wins over "experience"
+        alternatives = "|".join(
+            re.escape(heading).replace(r"\ ", r"[ \t]+")
+            for heading in sorted(headings, key=len, reverse=True)
+        )
+        groups.append(f"(?P<{section}>{alternatives})")
+    first_letters = "".join(sorted({heading[0] for headings in SECTION_HEADINGS.values() for heading in headings}))
+    # A heading is a line of its own, optionally followed by a colon. The pattern
+    # starts with a literal newline and rejects lines by their first letter before
+    # trying the alternation, which keeps the scan fast; see split_sections.
+    return re.compile(
+        r"\n[ \t]*(?=[" + first_letters + r"])(?:" + "|".join(groups) + r")[ \t]*:?[ \t]*(?=\n|\Z)",
+        re.IGNORECASE,
+    )
+
+
+HEADING_PATTERN = _compile_heading_pattern()
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    chunk_id: str
+    text: str
+    section_type: str
+    index: int
+    content_hash: str
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    (section_type, body) pairs in document order; each body starts with its
+    heading line. Text before the first heading, or the whole text when there is
+    no recognised heading, is a general section.
+    """
+    sections = []
+    section_type = GENERAL_SECTION
+    start = 0
+    # Prefixing a newline lets the first line match too; match.start() in the
+    # padded text is then exactly the heading's offset in the original text
+    for match in HEADING_PATTERN.finditer("\n" + text):
+        body = text[start:match.start()].strip()
+        if body:
+            sections.append((section_type, body))
+        section_type = match.lastgroup
+        start = match.start()
+    body = text[start:].strip()
+    if body:
+        sections.append((section_type, body))
+    return sections
+
+
+def _split_long(piece: str, max_chars: int) -> List[str]:
+    """Splits an oversized paragraph at line, then word boundaries"""
+    if len(piece) <= max_chars:
+        return [piece]
+    separator = "\n" if "\n" in piece else " "
+    parts = []
+    current = ""
+    for unit in piece.split(separator):
+        candidate = f"{current}{separator}{unit}" if current else unit
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        if len(unit) > max_chars:
+            if separator == "\n":
+                parts.extend(_split_long(unit, max_chars))
+            else:
+                parts.extend(unit[i:i + max_chars] for i in range(0, len(unit), max_chars))
+            current = ""
+        else:
+            current = unit
+    if current:
+        parts.append(current)
+    return parts
+
+
+def pack_paragraphs(body: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """Greedily packs whole paragraphs into pieces of at most max_chars"""
+    pieces = []
+    current = ""
+    for paragraph in PARAGRAPH_BREAK.split(body):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for part in _split_long(paragraph, max_chars):
+            candidate = f"{current}\n\n{part}" if current else part
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                if current:
+                    pieces.append(current)
+                current = part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(
+    text: str,
+    document_id: str,
+    header: Optional[str] = None,
+    max_chars: int = CHUNK_MAX_CHARS,
+) -> List[Chunk]:
+    """
+    Splits a document into section-aware chunks. An optional header (e.g. the
+    document type and name) is prepended to every chunk so each one carries its
+    context into retrieval. Identical chunks within a document are emitted once.
+    """
+    chunks = []
+    seen_ids = set()
+    for section_type, body in split_sections(text or ""):
+        for piece in pack_paragraphs(body, max_chars):
+            content = f"{header}\n{piece}" if header else piece
+            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            chunk_id = f"{document_id}:{content_hash[:32]}"
+            if chunk_id in seen_ids:
+                continue
+            seen_ids.add(chunk_id)
+            chunks.append(Chunk(chunk_id, content, section_type, len(chunks), content_hash))
+    return chunks
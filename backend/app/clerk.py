@@ -1,4 +1,6 @@
 import os
+import time
+import asyncio
 import httpx
 import logging
 from pydantic import BaseModel
@@ -19,8 +21,10 @@ CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
 CLERK_API_URL = os.getenv("CLERK_API_URL")
 ALGORITHMS = ["RS256"]
 
-# Cache for JWKS
-_jwks_cache: List[Dict[str, Any]] = []
+# JWKS cache settings
+JWKS_TTL_SECONDS = int(os.getenv("CLERK_JWKS_TTL_SECONDS", "3600"))
+# Minimum delay between refetches triggered by tokens with an unknown kid
+JWKS_UNKNOWN_KID_COOLDOWN_SECONDS = int(os.getenv("CLERK_JWKS_UNKNOWN_KID_COOLDOWN_SECONDS", "30"))
 
 class ClerkUser(BaseModel):
     sub: str
@@ -31,28 +35,120 @@ class ClerkUser(BaseModel):
     public_metadata: Dict[str, Any] = {}
 
 
-async def get_jwks() -> List[Dict[str, Any]]:
+class JWKSCache:
     """
-    Retrieves and caches the JSON Web Key Set (JWKS) from Clerk.
+    Clerk signing keys, parsed once and indexed by kid.
+
+    Lookups never touch the network while the key set is fresh. Once it is older
+    than the TTL, the stale keys keep being served while a background refresh
+    runs. A token with an unknown kid (key rotation) triggers one shared refetch,
+    rate limited by a cooldown. Concurrent refreshes are single-flight.
     """
-    global _jwks_cache
-    if _jwks_cache:
-        return _jwks_cache
 
-    if not CLERK_ISSUER_URL:
-        logger.error("CLERK_ISSUER_URL not set")
-        raise HTTPException(status_code=500, detail="Clerk issuer URL not configured")
+    def __init__(self, ttl_seconds: int = JWKS_TTL_SECONDS, unknown_kid_cooldown: int = JWKS_UNKNOWN_KID_COOLDOWN_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.unknown_kid_cooldown = unknown_kid_cooldown
+        self._keys: Dict[str, Any] = {}
+        self._jwks: List[Dict[str, Any]] = []
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "background_refreshes": 0,
+            "unknown_kid_refreshes": 0,
+            "lookups": 0,
+        }
 
-    url = f"{CLERK_ISSUER_URL}/.well-known/jwks.json"
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            _jwks_cache = response.json()["keys"]
-            return _jwks_cache
-    except httpx.HTTPError as e:
-        logger.error(f"Failed to fetch JWKS: {e}")
-        raise HTTPException(status_code=500, detail="Could not fetch JWKS from Clerk")
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl_seconds
+
+    async def _fetch(self) -> None:
+        if not CLERK_ISSUER_URL:
+            logger.error("CLERK_ISSUER_URL not set")
+            raise HTTPException(status_code=500, detail="Clerk issuer URL not configured")
+
+        url = f"{CLERK_ISSUER_URL}/.well-known/jwks.json"
+        self._last_attempt = time.monotonic()
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url)
+                response.raise_for_status()
+                jwks = response.json()["keys"]
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            self.stats["refresh_failures"] += 1
+            logger.error(f"Failed to fetch JWKS: {e}")
+            raise HTTPException(status_code=500, detail="Could not fetch JWKS from Clerk")
+
+        keys = {}
+        for key in jwks:
+            try:
+                keys[key["kid"]] = jwk.construct(key, algorithm=key.get("alg", ALGORITHMS[0]))
+            except Exception as e:
+                logger.warning(f"Skipping unusable JWKS key {key.get('kid')}: {e}")
+
+        self._keys = keys
+        self._jwks = jwks
+        self._fetched_at = time.monotonic()
+        self.stats["refreshes"] += 1
+        logger.info(f"JWKS refreshed: {len(keys)} keys")
+
+    async def refresh(self) -> None:
+        """Refetch the key set; concurrent callers share one request"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        await asyncio.shield(self._refresh_task)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self.stats["background_refreshes"] += 1
+        self._refresh_task = asyncio.create_task(self._fetch())
+        # Failures are counted and logged in _fetch; stale keys stay in use
+        self._refresh_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def get_key(self, kid: str) -> Optional[Any]:
+        """Public key for a kid, or None if Clerk does not publish it"""
+        self.stats["lookups"] += 1
+        if not self._keys:
+            await self.refresh()
+        elif self.is_stale:
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._last_attempt > self.unknown_kid_cooldown:
+            # Probably a key rotation: refetch once, shared by all waiting requests
+            self.stats["unknown_kid_refreshes"] += 1
+            await self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    async def get_jwks(self) -> List[Dict[str, Any]]:
+        if not self._jwks:
+            await self.refresh()
+        elif self.is_stale:
+            self._refresh_in_background()
+        return self._jwks
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "keys": len(self._keys),
+            "age_seconds": round(time.monotonic() - self._fetched_at, 1) if self._fetched_at else None,
+        }
+
+
+# Global JWKS cache
+jwks_cache = JWKSCache()
+
+
+async def get_jwks() -> List[Dict[str, Any]]:
+    """
+    Retrieves and caches the JSON Web Key Set (JWKS) from Clerk.
+    """
+    return await jwks_cache.get_jwks()
 
 
 async def verify_token(token: str) -> ClerkUser:
@@ -78,25 +174,18 @@ async def verify_token(token: str) -> ClerkUser:
         )
     
     try:
-        jwks = await get_jwks()
         unverified_header = jwt.get_unverified_header(token)
         
-        rsa_key = {}
-        for key in jwks:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = key
-                break
+        # Parsed public key by kid; no network unless the kid is unknown or the cache is empty
+        public_key = await jwks_cache.get_key(unverified_header.get("kid"))
         
-        if not rsa_key:
+        if public_key is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Unable to find appropriate key",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Correctly construct the public key from the JWK dictionary
-        public_key = jwk.construct(rsa_key, algorithm=ALGORITHMS[0])
-
         payload = jwt.decode(
             token,
             public_key,
@@ -0,0 +1,244 @@
+"""
+Conversation Memory - token-budgeted chat history with a rolling per-page summary
+The newest messages are sent verbatim as long as they fit the token budget. Older
+messages are folded into a persisted summary, incrementally and in the background,
+so a turn never waits for (or repeats) a full-conversation summarization.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import async_session_maker
+from app.models_db import ChatMessage, ConversationSummary
+
+log = logging.getLogger(__name__)
+
+# Token budget for the history sent to the model (summary included)
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "6000"))
+# Single messages (full resumes, cover letters, tool dumps) are clipped to this size
+MESSAGE_TOKEN_LIMIT = int(os.getenv("CHAT_MESSAGE_TOKEN_LIMIT", "1500"))
+# Upper bound on unsummarized messages read per turn
+MAX_UNSUMMARIZED_MESSAGES = 200
+SUMMARY_MAX_CHARS = 2000
+SUMMARY_PREFIX = "[Summary of the earlier conversation]"
+
+_summary_llm = None
+_summary_tasks: Dict[str, asyncio.Task] = {}
+
+
+@dataclass
+class HistoryEntry:
+    created_at: datetime
+    message: BaseMessage
+    message_id: Optional[str] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return max(1, len(text) // 4)
+
+
+def clip_message_content(content: str, max_tokens: int = MESSAGE_TOKEN_LIMIT) -> str:
+    """Keep the beginning and the end of an oversized message"""
+    max_chars = max_tokens * 4
+    if len(content) <= max_chars:
+        return content
+    head = content[: max_chars * 2 // 3]
+    tail = content[-(max_chars // 3):]
+    omitted = len(content) - len(head) - len(tail)
+    return f"{head}\n\n[... {omitted} characters omitted ...]\n\n{tail}"
+
+
+def is_unsummarized(entry: HistoryEntry, summary_row: ConversationSummary) -> bool:
+    """Whether a message comes after the summary watermark, ordered by (created_at, id)"""
+    if summary_row.summarized_until_id is None:
+        # Summaries written before the id was stored only know the timestamp
+        return entry.created_at > summary_row.summarized_until
+    return (entry.created_at, entry.message_id) > (summary_row.summarized_until, summary_row.summarized_until_id)
+
+
+def to_langchain_message(msg: ChatMessage) -> Optional[BaseMessage]:
+    """Convert a stored ChatMessage, skipping empty messages and bare file attachments"""
+    if not msg.message or msg.message.strip() == "":
+        log.warning(f"Skipping empty message {msg.id} for user {msg.user_id}")
+        return None
+
+    content = msg.message.strip()
+
+    # Handle special message formats (e.g., file attachments)
+    if content.startswith("File Attached:"):
+        parts = content.split("\n\nMessage:", 1)
+        if len(parts) > 1 and parts[1].strip():
+            content = parts[1].strip()
+        else:
+            log.info(f"Skipping file attachment message without text content: {msg.id}")
+            return None
+
+    if msg.is_user_message:
+        return HumanMessage(content=content)
+    return AIMessage(content=content)
+
+
+def pack_history(
+    entries: List[HistoryEntry],
+    token_budget: int,
+    max_messages: Optional[int] = None
+) -> Tuple[List[BaseMessage], List[HistoryEntry]]:
+    """
+    Split entries (oldest first) into the newest messages that fit the budget and
+    the older ones that aged out. The newest message is always kept.
+    """
+    kept: List[BaseMessage] = []
+    used = 0
+    split = len(entries)
+    for index in range(len(entries) - 1, -1, -1):
+        message = entries[index].message
+        # The newest message is the request being answered and is never clipped
+        content = message.content if not kept else clip_message_content(message.content)
+        cost = estimate_tokens(content)
+        if kept and (used + cost > token_budget or (max_messages and len(kept) >= max_messages)):
+            break
+        kept.append(message.__class__(content=content))
+        used += cost
+        split = index
+    kept.reverse()
+    return kept, entries[:split]
+
+
+async def load_packed_history(
+    user_id: str,
+    page_id: str,
+    db: AsyncSession,
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+    max_messages: Optional[int] = None
+) -> List[BaseMessage]:
+    """
+    History for the next turn: the rolling summary (if any) followed by the newest
+    messages that fit the token budget. Messages that no longer fit are scheduled
+    to be folded into the summary.
+    """
+    result = await db.execute(
+        select(ConversationSummary).where(ConversationSummary.page_id == page_id)
+    )
+    summary_row = result.scalar_one_or_none()
+
+    conditions = [
+        ChatMessage.user_id == user_id,
+        ChatMessage.page_id == page_id,
+        ChatMessage.deleted_at.is_(None)
+    ]
+    if summary_row and summary_row.summarized_until:
+        until = summary_row.summarized_until
+        if summary_row.summarized_until_id is None:
+            conditions.append(ChatMessage.created_at > until)
+        else:
+            # Messages sharing the watermark's timestamp are told apart by id
+            conditions.append(or_(
+                ChatMessage.created_at > until,
+                and_(ChatMessage.created_at == until, ChatMessage.id > summary_row.summarized_until_id)
+            ))
+
+    result = await db.execute(
+        select(ChatMessage)
+        .where(and_(*conditions))
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(MAX_UNSUMMARIZED_MESSAGES)
+    )
+    rows = list(reversed(result.scalars().all()))
+
+    entries = []
+    for row in rows:
+        message = to_langchain_message(row)
+        if message is not None:
+            entries.append(HistoryEntry(created_at=row.created_at, message=message, message_id=row.id))
+
+    summary_text = summary_row.summary if summary_row and summary_row.summary else ""
+    budget = token_budget - (estimate_tokens(summary_text) if summary_text else 0)
+    kept, aged_out = pack_history(entries, budget, max_messages)
+
+    if aged_out:
+        schedule_summary_update(user_id, page_id, aged_out)
+
+    history: List[BaseMessage] = []
+    if summary_text:
+        # Anthropic only accepts the system prompt first, so the summary is sent as context from the user
+        history.append(HumanMessage(content=f"{SUMMARY_PREFIX}\n{summary_text}"))
+    history.extend(kept)
+    return history
+
+
+def schedule_summary_update(user_id: str, page_id: str, aged_out: List[HistoryEntry]) -> None:
+    """Fold aged-out messages into the page summary in the background (one update per page at a time)"""
+    running = _summary_tasks.get(page_id)
+    if running is not None and not running.done():
+        # The next turn picks up whatever this update does not cover
+        return
+    task = asyncio.create_task(update_rolling_summary(user_id, page_id, aged_out))
+    _summary_tasks[page_id] = task
+    task.add_done_callback(lambda _: _summary_tasks.pop(page_id, None))
+
+
+async def update_rolling_summary(user_id: str, page_id: str, aged_out: List[HistoryEntry]) -> None:
+    """Extend the stored summary with the aged-out messages and advance its watermark"""
+    try:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(ConversationSummary).where(ConversationSummary.page_id == page_id)
+            )
+            summary_row = result.scalar_one_or_none()
+
+            # Another worker may already have summarized part of these messages
+            if summary_row and summary_row.summarized_until:
+                aged_out = [entry for entry in aged_out if is_unsummarized(entry, summary_row)]
+            if not aged_out:
+                return
+
+            previous_summary = summary_row.summary if summary_row else ""
+            summary = await summarize_incrementally(previous_summary, [entry.message for entry in aged_out])
+
+            if summary_row is None:
+                summary_row = ConversationSummary(page_id=page_id, user_id=user_id, summarized_message_count=0)
+                db.add(summary_row)
+            summary_row.summary = summary
+            summary_row.summarized_until = aged_out[-1].created_at
+            summary_row.summarized_until_id = aged_out[-1].message_id
+            summary_row.summarized_message_count = (summary_row.summarized_message_count or 0) + len(aged_out)
+            await db.commit()
+            log.info(f"Folded {len(aged_out)} messages into the summary of page {page_id}")
+    except Exception as e:
+        # The messages stay unsummarized and are retried on the next turn
+        log.error(f"Failed to update conversation summary for page {page_id}: {e}")
+
+
+def get_summary_llm():
+    global _summary_llm
+    if _summary_llm is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        _summary_llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.1)
+    return _summary_llm
+
+
+async def summarize_incrementally(previous_summary: str, messages: List[BaseMessage]) -> str:
+    """Update a running summary with new messages only; the old messages are never re-read"""
+    transcript = "\n".join(
+        f"{'User' if isinstance(message, HumanMessage) else 'Assistant'}: {clip_message_content(message.content, 500)}"
+        for message in messages
+    )
+    response = await get_summary_llm().ainvoke([
+        SystemMessage(content=(
+            "You maintain a running summary of a conversation between a user and a career assistant. "
+            "Update the summary with the new messages. Keep the user's goals, target roles and companies, "
+            "facts about their background, documents that were generated and decisions that were made. "
+            f"Reply with the updated summary only, in at most {SUMMARY_MAX_CHARS} characters."
+        )),
+        HumanMessage(content=f"Current summary:\n{previous_summary or '(empty)'}\n\nNew messages:\n{transcript}")
+    ])
+    return str(response.content).strip()[:SUMMARY_MAX_CHARS]
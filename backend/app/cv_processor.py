@@ -8,12 +8,11 @@ from pydantic import BaseModel, EmailStr, Field, validator
 import json
 from pathlib import Path
 import io
-import docx
 from PIL import Image
 from pdf2image import convert_from_path
-from pypdf import PdfReader
 
 from app.resume import ResumeData, PersonalInfo, Experience, Education, Dates
+from app.text_extraction import extract_text_sync, text_extractor
 
 logger = logging.getLogger(__name__)
 
@@ -100,12 +99,8 @@ class CVProcessor:
         try:
             file_extension = file_path.suffix.lower()
             
-            if file_extension == '.pdf':
-                return self._extract_from_pdf(file_path)
-            elif file_extension == '.docx':
-                return self._extract_from_docx(file_path)
-            elif file_extension in ['.txt', '.md']:
-                return self._extract_from_text(file_path)
+            if file_extension in ['.pdf', '.docx', '.txt', '.md']:
+                return extract_text_sync(file_path).strip()
             else:
                 raise ValueError(f"Unsupported file format: {file_extension}")
                 
@@ -113,47 +108,15 @@ class CVProcessor:
             logger.error(f"Error extracting text from {file_path}: {e}")
             raise
     
-    def _extract_from_pdf(self, file_path: Path) -> str:
-        """Extract text from PDF file"""
-        try:
-            reader = PdfReader(str(file_path))
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error reading PDF {file_path}: {e}")
-            raise
-    
-    def _extract_from_docx(self, file_path: Path) -> str:
-        """Extract text from DOCX file"""
-        try:
-            doc = docx.Document(str(file_path))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error reading DOCX {file_path}: {e}")
-            raise
-    
-    def _extract_from_text(self, file_path: Path) -> str:
-        """Extract text from text file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        except Exception as e:
-            logger.error(f"Error reading text file {file_path}: {e}")
-            raise
-    
     async def extract_cv_information(self, file_path: Path) -> CVExtractionResult:
-        """Extract structured information from CV using LLM with structured output"""
+        """Extract structured information from a CV file"""
+        # Parsed in the extraction pool and memoized by file hash
+        raw_text = await text_extractor.extract(file_path)
+        return await self.extract_cv_information_from_text(raw_text)
+    
+    async def extract_cv_information_from_text(self, raw_text: str) -> CVExtractionResult:
+        """Extract structured information from CV text using LLM with structured output"""
         try:
-            # Extract raw text
-            raw_text = self.extract_text_from_file(file_path)
-            
             if not raw_text.strip():
                 raise ValueError("No text could be extracted from the file")
             
@@ -11,6 +11,7 @@ from app.db import get_db
 from app.dependencies import get_current_active_user
 from app.models_db import User
 from app.resume import ResumeData
+from app.user_events import publish_user_event, RESUME_UPDATED
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -204,6 +205,7 @@ async def apply_cv_suggestion(
         # Save updated resume
         resume_record.data = resume_data
         await db.commit()
+        publish_user_event(current_user.id, RESUME_UPDATED)
         
         logger.info(f"Applied suggestion {suggestion_id} to {section} for user {current_user.id}")
         
@@ -7,7 +7,13 @@ from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from jose import JWTError, jwt
 from app.db import get_db
 from app.models_db import User
-from app.clerk import verify_token, ClerkUser
+from app.clerk import ClerkUser
+from app.auth_cache import (
+    verify_token_cached,
+    get_user_by_external_id_cached,
+    get_extension_token_cached,
+    last_used_recorder,
+)
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -101,7 +107,7 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        clerk_user: ClerkUser = await verify_token(auth_token)
+        clerk_user: ClerkUser = await verify_token_cached(auth_token)
         if not clerk_user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -109,8 +115,7 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        result = await db.execute(select(User).where(User.external_id == clerk_user.sub))
-        user = result.scalar_one_or_none()
+        user = await get_user_by_external_id_cached(clerk_user.sub, db)
         
         # This block ensures the user profile is always synchronized with Clerk.
         # It handles both new user creation and updates for existing users.
@@ -211,48 +216,37 @@ async def get_current_active_user_ws(
         # Check if it's an extension token
         if token.startswith("jhb_"):
             # Import here to avoid circular imports
-            from app.extension_tokens import hash_token, ExtensionToken
+            from app.extension_tokens import hash_token
             
-            token_hash = hash_token(token)
-            result = await db.execute(
-                select(ExtensionToken).where(
-                    ExtensionToken.token_hash == token_hash,
-                    ExtensionToken.is_active == True
-                )
-            )
-            ext_token = result.scalar_one_or_none()
+            ext_token = await get_extension_token_cached(hash_token(token), db)
             
             if not ext_token:
                 logger.warning("WebSocket connection with an invalid extension token.")
                 raise credentials_exception
             
             # Check expiration
-            from datetime import datetime
-            if ext_token.expires_at and ext_token.expires_at < datetime.utcnow():
+            if ext_token.is_expired:
                 logger.warning("WebSocket connection with an expired extension token.")
                 raise credentials_exception
             
-            # Update last used
-            ext_token.last_used = datetime.utcnow()
-            await db.commit()
+            # Update last used (written in batches)
+            last_used_recorder.record(ext_token.token_id)
             
             # Get the user by external_id
-            result = await db.execute(select(User).where(User.external_id == ext_token.user_id))
-            user = result.scalar_one_or_none()
+            user = await get_user_by_external_id_cached(ext_token.external_id, db)
             
             if not user:
-                logger.warning(f"WS Auth: User with external_id {ext_token.user_id} not found.")
+                logger.warning(f"WS Auth: User with external_id {ext_token.external_id} not found.")
                 raise credentials_exception
         else:
             # Handle Clerk token
-            clerk_user: ClerkUser = await verify_token(token)
+            clerk_user: ClerkUser = await verify_token_cached(token)
             if not clerk_user:
                 logger.warning("WebSocket connection with an invalid token.")
                 raise credentials_exception
             
             # This logic is now a direct, correct implementation, mirroring get_current_user.
-            result = await db.execute(select(User).where(User.external_id == clerk_user.sub))
-            user = result.scalar_one_or_none()
+            user = await get_user_by_external_id_cached(clerk_user.sub, db)
 
             if user is None:
                 logger.info(f"WS Auth: User with external_id {clerk_user.sub} not found. Creating new user.")
@@ -326,13 +320,12 @@ async def get_current_user_from_ws(
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return None
 
-        clerk_user: ClerkUser = await verify_token(token)
+        clerk_user: ClerkUser = await verify_token_cached(token)
         if not clerk_user:
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return None
 
-        result = await db.execute(select(User).where(User.external_id == clerk_user.sub))
-        user = result.scalar_one_or_none()
+        user = await get_user_by_external_id_cached(clerk_user.sub, db)
 
         if not user:
             # Create new user if they don't exist
@@ -0,0 +1,212 @@
+"""
+Document Pipeline - streaming uploads and background document processing
+Uploads are streamed to disk in chunks with async file I/O and the request returns
+as soon as the file and its Document row are stored. Text extraction (through
+text_extraction), optional CV parsing and embedding run in a small pool of worker
+tasks; progress is available from get_job (exposed by GET /documents/{doc_id}/status).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import anyio
+from fastapi import UploadFile
+
+from app.db import async_session_maker
+from app.models_db import Document
+from app.text_extraction import text_extractor
+from app.user_events import publish_user_event, DOCUMENTS_CHANGED
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+DOCUMENT_PIPELINE_WORKERS = int(os.getenv("DOCUMENT_PIPELINE_WORKERS", "2"))
+# Finished jobs are kept this long for status queries
+DOCUMENT_JOB_RETENTION_SECONDS = int(os.getenv("DOCUMENT_JOB_RETENTION_SECONDS", "3600"))
+
+# Job states
+QUEUED = "queued"
+EXTRACTING = "extracting"
+PARSING = "parsing"
+EMBEDDING = "embedding"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+async def save_upload_file(upload: UploadFile, destination: Path, chunk_size: int = UPLOAD_CHUNK_SIZE) -> int:
+    """Streams an upload to disk chunk by chunk without holding the whole file in memory"""
+    size = 0
+    async with await anyio.open_file(destination, "wb") as f:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            await f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+@dataclass
+class DocumentJob:
+    document_id: str
+    user_id: str
+    file_path: Path
+    filename: str
+    parse_cv: bool = False
+    status: str = QUEUED
+    error: Optional[str] = None
+    extracted_info: Optional[Any] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "document_id": self.document_id,
+            "status": self.status,
+            "error": self.error,
+            "extracted_info": self.extracted_info,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class DocumentPipeline:
+    """
+    In-process job queue with a fixed number of worker tasks.
+
+    Each job uses its own database session. Jobs are tracked by document id; a
+    document whose job was lost (e.g. on restart) can be resubmitted with its
+    stored upload, see find_upload.
+    """
+
+    def __init__(self, workers: int = DOCUMENT_PIPELINE_WORKERS):
+        self.worker_count = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, DocumentJob]" = OrderedDict()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._worker(i)) for i in range(self.worker_count)]
+        logger.info(f"Document pipeline started with {self.worker_count} workers")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: DocumentJob) -> DocumentJob:
+        if not self.running:
+            self.start()
+        self._prune()
+        self._jobs[job.document_id] = job
+        self._queue.put_nowait(job)
+        self.stats["submitted"] += 1
+        return job
+
+    def get_job(self, document_id: str) -> Optional[DocumentJob]:
+        return self._jobs.get(document_id)
+
+    async def wait(self, document_id: str, timeout: Optional[float] = None) -> Optional[DocumentJob]:
+        """Wait until a job is finished (used by tests and scripts)"""
+        async def poll():
+            while True:
+                job = self._jobs.get(document_id)
+                if job is None or job.done:
+                    return job
+                await asyncio.sleep(0.01)
+        return await asyncio.wait_for(poll(), timeout)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - DOCUMENT_JOB_RETENTION_SECONDS
+        for document_id, job in list(self._jobs.items()):
+            if job.done and job.finished_at and job.finished_at < cutoff:
+                del self._jobs[document_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: DocumentJob) -> None:
+        from app.vector_store import add_document_to_vector_store
+
+        try:
+            job.status = EXTRACTING
+            text = await text_extractor.extract(job.file_path, job.filename)
+
+            if job.parse_cv:
+                job.status = PARSING
+                from app.cv_processor import cv_processor
+                job.extracted_info = await cv_processor.extract_cv_information_from_text(text)
+
+            async with async_session_maker() as db:
+                document = await db.get(Document, job.document_id)
+                if document is None:
+                    raise LookupError("Document was deleted before processing finished")
+                document.content = text
+                document.processing_error = None
+                await db.commit()
+
+                job.status = EMBEDDING
+                await add_document_to_vector_store(document, db)
+
+            job.status = COMPLETED
+            self.stats["completed"] += 1
+            publish_user_event(job.user_id, DOCUMENTS_CHANGED)
+            logger.info(f"Processed document {job.document_id} ({len(text)} characters)")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            self.stats["failed"] += 1
+            logger.error(f"Processing failed for document {job.document_id}: {e}")
+            await self._record_failure(job)
+        finally:
+            job.finished_at = time.time()
+
+    async def _record_failure(self, job: DocumentJob) -> None:
+        """Keeps the failure on the row, so it outlives the job and the file is not queued again"""
+        try:
+            async with async_session_maker() as db:
+                document = await db.get(Document, job.document_id)
+                if document is not None:
+                    document.processing_error = job.error or "Processing failed"
+                    await db.commit()
+        except Exception as e:
+            logger.warning(f"Could not record the failure of document {job.document_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return {**self.stats, "queued": pending, "tracked_jobs": len(self._jobs), "running": self.running}
+
+
+def find_upload(upload_dir: Path, user_id: str, document_id: str) -> Optional[Path]:
+    """Stored upload of a document; uploads are saved as <user_id>/<document_id>_<filename>"""
+    matches = sorted((upload_dir / user_id).glob(f"{document_id}_*"))
+    return matches[0] if matches else None
+
+
+# Global pipeline instance, started from the app lifespan
+document_pipeline = DocumentPipeline()
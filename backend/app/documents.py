@@ -8,21 +8,21 @@ from app.models_db import Document, User, Resume
 from app.dependencies import get_current_active_user
 from app.cv_processor import cv_processor, CVExtractionResult
 from app.enhanced_memory import EnhancedMemoryManager
+from app.user_events import publish_user_event, DOCUMENTS_CHANGED, PROFILE_UPDATED
 from datetime import datetime
 import os
 import uuid
 import asyncio
 from pathlib import Path
 import io
-import docx
-from pypdf import PdfReader
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
+from app.vector_store import remove_documents_from_vector_store, remove_legacy_faiss_index
+from app.document_pipeline import (
+    document_pipeline, DocumentJob, save_upload_file, find_upload, COMPLETED, FAILED
+)
+from app.text_extraction import text_extractor
 from langchain.docstore.document import Document as LCDocument
 from typing import List, Optional
 from pydantic import BaseModel
-import shutil
 import logging
 
 UPLOAD_DIR = Path("uploads")
@@ -190,6 +190,7 @@ class DocumentOut(BaseModel):
     name: str
     date_created: datetime
     date_updated: datetime
+    processing_status: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -248,9 +249,15 @@ async def upload_document(
     file: UploadFile = File(...),
     doc_type: str = Form(...),  # 'resume', 'cover_letter', or 'generic'
     name: str = Form(...),
+    parse_cv: bool = Form(False),
     db: AsyncSession = Depends(get_db),
     db_user: User = Depends(get_current_active_user)
 ):
+    """
+    Stores the upload and returns immediately. Text extraction, optional CV parsing
+    and embedding run in the document pipeline; poll GET /documents/{doc_id}/status
+    or wait for the documents_changed event.
+    """
     if doc_type not in ("resume", "cover_letter", "generic"):
         raise HTTPException(status_code=400, detail="Invalid document type. Must be 'resume', 'cover_letter', or 'generic'.")
     
@@ -263,59 +270,39 @@ async def upload_document(
     file_path = user_dir / f"{doc_id}_{file.filename}"
     
     try:
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        
-        # Extract text
-        if file.filename.lower().endswith(".pdf"):
-            try:
-                pdf = PdfReader(str(file_path))
-                text = "".join(page.extract_text() or "" for page in pdf.pages)
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing PDF: {e}")
-        else:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    text = f.read()
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error reading file: {e}")
-        
-        # Build FAISS index with enhanced embeddings
-        embedding = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
-        
-        # Smart chunking based on document type and user preferences
-        chunk_size = _get_optimal_chunk_size(doc_type, len(text))
-        chunks = [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-        docs = [LCDocument(page_content=chunk) for chunk in chunks]
-        
-        faiss_dir = user_dir / f"faiss_{doc_id}"
-        faiss_dir.mkdir(exist_ok=True)
+        await save_upload_file(file, file_path)
         
-        # Use async FAISS methods to prevent greenlet errors
-        vectorstore = await FAISS.afrom_documents(docs, embedding)
-        
-        # Run save_local in thread executor to avoid blocking
-        await asyncio.get_event_loop().run_in_executor(
-            None, vectorstore.save_local, str(faiss_dir)
-        )
-        
-        # Store document metadata FIRST (avoid transaction conflicts)
+        # Content is filled in by the pipeline once the text is extracted
         now = datetime.utcnow()
         doc = Document(
             id=doc_id,
             user_id=db_user.id,
             type=doc_type,
             name=name,
-            content=text,
-            vector_store_path=str(faiss_dir),
+            content=None,
             date_created=now,
             date_updated=now
         )
         db.add(doc)
         await db.commit()
         await db.refresh(doc)
+
+        job = document_pipeline.submit(DocumentJob(
+            document_id=doc_id,
+            user_id=db_user.id,
+            file_path=file_path,
+            filename=file.filename,
+            parse_cv=parse_cv and doc_type == "resume",
+        ))
         
-        return doc
+        return DocumentOut(
+            id=doc.id,
+            type=doc.type,
+            name=doc.name,
+            date_created=doc.date_created,
+            date_updated=doc.date_updated,
+            processing_status=job.status,
+        )
         
     except Exception as e:
         # Ensure transaction rollback on main error
@@ -324,9 +311,44 @@ async def upload_document(
                 await db.rollback()
         except Exception:
             pass
+        if file_path.exists():
+            os.remove(file_path)
             
         logger.error(f"Error processing document upload: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process document: {str(e)}")
+
+
+@router.get("/documents/{doc_id}/status", response_model=dict)
+async def get_document_status(
+    doc_id: str,
+    db: AsyncSession = Depends(get_db),
+    db_user: User = Depends(get_current_active_user)
+):
+    """Processing state of an uploaded document."""
+    result = await db.execute(select(Document).where(Document.id == doc_id, Document.user_id == db_user.id))
+    doc = result.scalars().first()
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    job = document_pipeline.get_job(doc_id)
+    if job is not None:
+        return job.to_dict()
+    if doc.content is not None:
+        return {"document_id": doc_id, "status": COMPLETED, "error": None}
+    if doc.processing_error:
+        return {"document_id": doc_id, "status": FAILED, "error": doc.processing_error}
+
+    # The job was lost (e.g. the server restarted mid-processing); queue it again
+    file_path = find_upload(UPLOAD_DIR, db_user.id, doc_id)
+    if file_path is None:
+        return {"document_id": doc_id, "status": FAILED, "error": "Uploaded file is no longer available"}
+    job = document_pipeline.submit(DocumentJob(
+        document_id=doc_id,
+        user_id=db_user.id,
+        file_path=file_path,
+        filename=file_path.name,
+    ))
+    return job.to_dict()
     
 
     
@@ -407,38 +429,14 @@ async def upload_cv_with_extraction(
         user_dir.mkdir(exist_ok=True)
         file_path = user_dir / f"{doc_id}_{file.filename}"
         
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
+        await save_upload_file(file, file_path)
         
-        # Enhanced text extraction with proper file type handling
-        if file.filename and file.filename.lower().endswith(".pdf"):
-            try:
-                pdf = PdfReader(str(file_path))
-                text = "".join(page.extract_text() or "" for page in pdf.pages)
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing PDF: {e}")
-        elif file.filename and file.filename.lower().endswith((".docx", ".doc")):
-            try:
-                import docx
-                doc = docx.Document(str(file_path))
-                text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing Word document: {e}")
-        else:
-            # For text files, try different encodings
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            text = None
-            for encoding in encodings:
-                try:
-                    with open(file_path, "r", encoding=encoding) as f:
-                        text = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-            if text is None:
-                raise HTTPException(status_code=400, detail=f"Error reading file: Unable to decode text file with common encodings")
+        try:
+            text = await text_extractor.extract(file_path, file.filename)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error reading file: {e}")
         
-        # Store document metadata with basic FAISS processing
+        # Store document metadata; it is embedded by the next vector store sync
         now = datetime.utcnow()
         doc = Document(
             id=doc_id,
@@ -446,19 +444,19 @@ async def upload_cv_with_extraction(
             type="resume",
             name=name,
             content=text,
-            vector_store_path=None,  # Will be added after FAISS processing
             date_created=now,
             date_updated=now
         )
         db.add(doc)
         await db.commit()
+        publish_user_event(db_user.id, DOCUMENTS_CHANGED)
         # Skip refresh to avoid greenlet issues - we have all the data we need
         
         # Now, process CV data and update profile in a separate step
         # This separation helps isolate transaction scopes and debug greenlet issues
         try:
-            # FIX: Call the correct method 'extract_cv_information' and pass the file_path.
-            cv_data = await cv_processor.extract_cv_information(file_path)
+            # Reuse the text extracted above instead of parsing the file again
+            cv_data = await cv_processor.extract_cv_information_from_text(text)
             
             # Auto-update profile if enabled
             profile_updated = False
@@ -468,6 +466,7 @@ async def upload_cv_with_extraction(
                 if profile_updated:
                     await db.commit()
                     await db.refresh(db_user) # Refresh user to get latest state
+                    publish_user_event(db_user.id, PROFILE_UPDATED)
             
             # This is a placeholder for the more advanced features you were working on
             insights = "This is a placeholder for personalized insights."
@@ -567,14 +566,6 @@ async def _learn_from_cv_content(content: str, memory_manager: Optional[Enhanced
     logger.info("Learned skills, experience, and industry from CV content.")
 
 
-def _get_optimal_chunk_size(doc_type: str, content_length: int) -> int:
-    # Simple logic to adjust chunk size
-    if doc_type == "resume":
-        return 512  # Smaller chunks for denser resume content
-    elif content_length > 10000:
-        return 2048 # Larger chunks for very long documents
-    return 1024
-
 def _extract_resume_themes(content: str) -> List[str]:
     # This is a simplified keyword-based theme extraction
     themes = []
@@ -663,24 +654,24 @@ async def delete_all_documents_for_user(
     db_user: User = Depends(get_current_active_user)
 ):
     """
-    Deletes all documents (and their associated FAISS indexes) for the authenticated user.
+    Deletes all documents (and their indexed chunks) for the authenticated user.
     This is a destructive operation.
     """
     logger.warning(f"Initiating deletion of all documents for user {db_user.id}")
     
-    # First, get all documents to find their FAISS index paths
     docs_result = await db.execute(select(Document).where(Document.user_id == db_user.id))
     documents_to_delete = docs_result.scalars().all()
     
+    await remove_documents_from_vector_store(db_user.id, [doc.id for doc in documents_to_delete], db)
+    
     deleted_count = 0
     for doc in documents_to_delete:
-        # Delete the physical FAISS index directory if it exists
-        if doc.vector_store_path and os.path.exists(doc.vector_store_path):
-            try:
-                shutil.rmtree(doc.vector_store_path)
+        # Delete a legacy FAISS index directory that was not migrated yet
+        try:
+            if remove_legacy_faiss_index(doc.vector_store_path):
                 logger.info(f"Deleted FAISS index for document {doc.id} at {doc.vector_store_path}")
-            except Exception as e:
-                logger.error(f"Error deleting FAISS index for document {doc.id}: {e}")
+        except Exception as e:
+            logger.error(f"Error deleting FAISS index for document {doc.id}: {e}")
         
         # Delete the document record from the database
         await db.delete(doc)
@@ -689,6 +680,7 @@ async def delete_all_documents_for_user(
     if deleted_count > 0:
         try:
             await db.commit()
+            publish_user_event(db_user.id, DOCUMENTS_CHANGED)
             logger.info(f"Successfully deleted {deleted_count} documents for user {db_user.id}")
         except Exception as e:
             await db.rollback()
@@ -732,25 +724,8 @@ async def reprocess_cv_extraction(
         raise HTTPException(status_code=400, detail="Document has no content to process")
 
     try:
-        # Reconstruct the file path. This assumes the file exists at the path stored in the DB.
-        # A more robust solution would check if the file exists.
-        file_path = Path(doc.path) if doc.path else None
-        if not file_path or not file_path.exists():
-            # If path is not stored or file deleted, create a temporary file to process
-            user_dir = UPLOAD_DIR / db_user.id
-            user_dir.mkdir(exist_ok=True)
-            # Use doc.id to avoid filename collisions
-            temp_file_path = user_dir / f"temp_{doc.id}.tmp"
-            with open(temp_file_path, "w", encoding="utf-8") as f:
-                f.write(doc.content)
-            file_path = temp_file_path
-        
-        # FIX: Call the correct method 'extract_cv_information'.
-        cv_data = await cv_processor.extract_cv_information(file_path)
-        
-        # Clean up temporary file if it was created
-        if 'temp_file_path' in locals() and temp_file_path.exists():
-            os.remove(temp_file_path)
+        # The stored content is the extracted text of the upload; the file is not parsed again
+        cv_data = await cv_processor.extract_cv_information_from_text(doc.content)
 
         profile_updated = False
         updated_fields = []
@@ -759,6 +734,7 @@ async def reprocess_cv_extraction(
             if profile_updated:
                 await db.commit()
                 await db.refresh(db_user)
+                publish_user_event(db_user.id, PROFILE_UPDATED)
 
         return {
             "message": "CV re-processed successfully.",
@@ -784,18 +760,19 @@ async def delete_document(
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
-    # Delete the physical FAISS index directory if it exists
-    if doc.vector_store_path and os.path.exists(doc.vector_store_path):
-        try:
-            shutil.rmtree(doc.vector_store_path)
+    # Delete a legacy FAISS index directory that was not migrated yet
+    try:
+        if remove_legacy_faiss_index(doc.vector_store_path):
             logger.info(f"Deleted FAISS index at {doc.vector_store_path}")
-        except Exception as e:
-            # Log error but don't block deletion of the DB record
-            logger.error(f"Error deleting FAISS index for doc {doc.id}: {e}")
+    except Exception as e:
+        # Log error but don't block deletion of the DB record
+        logger.error(f"Error deleting FAISS index for doc {doc.id}: {e}")
     
     try:
+        await remove_documents_from_vector_store(db_user.id, [doc.id], db)
         await db.delete(doc)
         await db.commit()
+        publish_user_event(db_user.id, DOCUMENTS_CHANGED)
         logger.info(f"Successfully deleted document {doc_id} for user {db_user.id}")
     except Exception as e:
         await db.rollback()
@@ -833,6 +810,7 @@ async def update_document(
     try:
         await db.commit()
         await db.refresh(doc)
+        publish_user_event(db_user.id, DOCUMENTS_CHANGED)
         return doc
     except Exception as e:
         await db.rollback()
@@ -864,13 +842,8 @@ async def get_personalized_document_insights(
         return {"message": "No documents found to generate insights."}
 
     # Initialize memory manager (optional, for advanced context)
+    # The per-user FAISS memory index (User.faiss_index_path) is retired
     memory_manager = None
-    if db_user.faiss_index_path and os.path.exists(db_user.faiss_index_path):
-        try:
-            memory_manager = EnhancedMemoryManager(user_id=db_user.id, db_session=db)
-            await memory_manager.load_memory()
-        except Exception as e:
-            logger.warning(f"Could not load enhanced memory for user {db_user.id}: {e}")
 
     try:
         insights = await _generate_comprehensive_document_insights(documents, user_profile, memory_manager)
@@ -904,13 +877,8 @@ async def get_document_analysis(
         raise HTTPException(status_code=4.04, detail="Document not found")
 
     # Initialize memory manager for contextual analysis
+    # The per-user FAISS memory index (User.faiss_index_path) is retired
     memory_manager = None
-    if db_user.faiss_index_path and os.path.exists(db_user.faiss_index_path):
-        try:
-            memory_manager = EnhancedMemoryManager(user_id=db_user.id, db_session=db)
-            await memory_manager.load_memory()
-        except Exception as e:
-            logger.warning(f"Could not load enhanced memory for single doc analysis: {e}")
 
     try:
         analysis = await _analyze_single_document(doc, user_profile, memory_manager)
@@ -13,6 +13,7 @@ from bs4 import BeautifulSoup
 from langchain_anthropic import ChatAnthropic
 from langchain.schema import HumanMessage, SystemMessage
 import os
+from app.loop_monitor import run_blocking
 
 
 class EmailContext(BaseModel):
@@ -138,7 +139,7 @@ Best regards,
     async def extract_job_info_from_url(self, url: str) -> Dict[str, Any]:
         """Extract job information from a URL"""
         try:
-            response = requests.get(url, timeout=10)
+            response = await run_blocking(requests.get, url, timeout=10)
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # Extract basic information
@@ -0,0 +1,301 @@
+"""
+Embedding Service - the single embedding client shared by every vector path
+Concurrent requests are coalesced into batches of at most EMBEDDING_MAX_BATCH_SIZE
+texts, identical texts are embedded once (content hash -> vector cache, shared
+in-flight requests), calls go through a token-bucket rate limiter and transient
+failures (429, 5xx) are retried with jittered exponential backoff.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_DIMENSION = 768
+
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "100"))
+EMBEDDING_BATCH_WINDOW_MS = int(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10"))
+# Batch requests per minute allowed to the embedding API, and how many may burst at once
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "300"))
+EMBEDDING_BURST = int(os.getenv("EMBEDDING_BURST", "10"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "4"))
+# Vectors are cached as float32 arrays, about 3.4 KB per entry with its key: ~34 MB per process
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+DOCUMENT_TASK = "RETRIEVAL_DOCUMENT"
+QUERY_TASK = "RETRIEVAL_QUERY"
+
+RETRYABLE_MARKERS = ("429", "resource exhausted", "resource_exhausted", "quota", "rate limit",
+                     "500", "502", "503", "504", "unavailable", "deadline exceeded", "timeout")
+
+
+def is_retryable(error: Exception) -> bool:
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket usable from the event loop and from worker threads"""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def acquire_sync(self) -> float:
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class EmbeddingService(Embeddings):
+    """
+    LangChain Embeddings implementation used by PGVector, FAISS and Graph RAG.
+
+    The async methods coalesce concurrent callers: texts are queued per task type
+    and flushed as one batch request when the batch is full or after the batch
+    window. The sync methods (used by sync LangChain code paths) share the cache,
+    rate limiter and retries but call the API directly.
+    """
+
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL,
+        client: Optional[Any] = None,
+        max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+        batch_window_ms: int = EMBEDDING_BATCH_WINDOW_MS,
+        requests_per_minute: int = EMBEDDING_REQUESTS_PER_MINUTE,
+        burst: int = EMBEDDING_BURST,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        cache_size: int = EMBEDDING_CACHE_SIZE,
+    ):
+        self.model = model
+        self._client = client
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.max_retries = max_retries
+        self.cache_size = cache_size
+        self.rate_limiter = TokenBucket(requests_per_minute / 60, burst)
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[str, "OrderedDict[str, Tuple[str, asyncio.Future]]"] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self.stats = {"texts": 0, "cache_hits": 0, "coalesced": 0, "api_calls": 0,
+                      "texts_embedded": 0, "retries": 0, "rate_limited_seconds": 0.0, "errors": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            self._client = GoogleGenerativeAIEmbeddings(model=self.model)
+        return self._client
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _key(self, text: str, task_type: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{task_type}\0{text}".encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[List[float]]:
+        with self._cache_lock:
+            vector = self._cache.get(key)
+            if vector is None:
+                return None
+            self._cache.move_to_end(key)
+        return vector.tolist()
+
+    def _cache_set(self, key: str, vector: List[float]) -> None:
+        # A list of Python floats takes ~25 KB for 768 dimensions, a float32 array ~3 KB
+        packed = np.asarray(vector, dtype=np.float32)
+        with self._cache_lock:
+            self._cache[key] = packed
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Async, coalesced
+    # ------------------------------------------------------------------
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._aembed(list(texts), DOCUMENT_TASK)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._aembed([text], QUERY_TASK))[0]
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Several search queries, embedded as queries in as few requests as possible"""
+        return await self._aembed(list(texts), QUERY_TASK)
+
+    async def _aembed(self, texts: List[str], task_type: str) -> List[List[float]]:
+        self._bind_loop()
+        loop = asyncio.get_running_loop()
+        self.stats["texts"] += len(texts)
+
+        futures: List[asyncio.Future] = []
+        queue = self._queues.setdefault(task_type, OrderedDict())
+        for text in texts:
+            key = self._key(text, task_type)
+            vector = self._cache_get(key)
+            if vector is not None:
+                self.stats["cache_hits"] += 1
+                future = loop.create_future()
+                future.set_result(vector)
+            elif key in self._in_flight:
+                self.stats["coalesced"] += 1
+                future = self._in_flight[key]
+            else:
+                future = loop.create_future()
+                self._in_flight[key] = future
+                queue[key] = (text, future)
+            futures.append(future)
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(task_type)
+        elif queue and task_type not in self._flush_handles:
+            self._flush_handles[task_type] = loop.call_later(self.batch_window, self._flush, task_type)
+
+        # Shared futures are shielded so a cancelled caller does not cancel other waiters
+        return list(await asyncio.gather(*(asyncio.shield(future) for future in futures)))
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pending futures belong to the previous loop (e.g. tests); start over
+            self._loop = loop
+            self._queues.clear()
+            self._in_flight.clear()
+            self._flush_handles.clear()
+
+    def _flush(self, task_type: str) -> None:
+        handle = self._flush_handles.pop(task_type, None)
+        if handle is not None:
+            handle.cancel()
+        queue = self._queues.get(task_type)
+        while queue:
+            batch = []
+            while queue and len(batch) < self.max_batch_size:
+                batch.append(queue.popitem(last=False))
+            asyncio.get_running_loop().create_task(self._embed_batch(batch, task_type))
+
+    async def _embed_batch(self, batch: List[Tuple[str, Tuple[str, asyncio.Future]]], task_type: str) -> None:
+        texts = [text for _, (text, _) in batch]
+        try:
+            vectors = await self._call_with_retries(texts, task_type)
+            for (key, (_, future)), vector in zip(batch, vectors):
+                self._cache_set(key, vector)
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            self.stats["errors"] += 1
+            for _, (_, future) in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for key, _ in batch:
+                self._in_flight.pop(key, None)
+
+    async def _call_with_retries(self, texts: List[str], task_type: str) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            self.stats["rate_limited_seconds"] += await self.rate_limiter.acquire()
+            try:
+                self.stats["api_calls"] += 1
+                vectors = await self.client.aembed_documents(texts, task_type=task_type, batch_size=self.max_batch_size)
+                self.stats["texts_embedded"] += len(texts)
+                return [list(vector) for vector in vectors]
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                self.stats["retries"] += 1
+                logger.warning(f"Embedding request failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_sync(list(texts), DOCUMENT_TASK)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_sync([text], QUERY_TASK)[0]
+
+    def _embed_sync(self, texts: List[str], task_type: str) -> List[List[float]]:
+        self.stats["texts"] += len(texts)
+        keys = [self._key(text, task_type) for text in texts]
+        results: List[Optional[List[float]]] = [self._cache_get(key) for key in keys]
+        self.stats["cache_hits"] += sum(1 for vector in results if vector is not None)
+
+        missing: Dict[str, List[int]] = OrderedDict()
+        for index, (key, vector) in enumerate(zip(keys, results)):
+            if vector is None:
+                missing.setdefault(key, []).append(index)
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.max_batch_size):
+            batch = pending[start:start + self.max_batch_size]
+            vectors = self._call_with_retries_sync([texts[indexes[0]] for _, indexes in batch], task_type)
+            for (key, indexes), vector in zip(batch, vectors):
+                self._cache_set(key, vector)
+                for index in indexes:
+                    results[index] = vector
+        return results
+
+    def _call_with_retries_sync(self, texts: List[str], task_type: str) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            self.stats["rate_limited_seconds"] += self.rate_limiter.acquire_sync()
+            try:
+                self.stats["api_calls"] += 1
+                vectors = self.client.embed_documents(texts, task_type=task_type, batch_size=self.max_batch_size)
+                self.stats["texts_embedded"] += len(texts)
+                return [list(vector) for vector in vectors]
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                self.stats["retries"] += 1
+                time.sleep(backoff_delay(attempt))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_vectors": len(self._cache), "model": self.model}
+
+
+# Global embedding service instance
+embedding_service = EmbeddingService()
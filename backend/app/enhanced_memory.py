@@ -15,7 +15,6 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain.schema import Document
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -25,6 +24,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.models_db import ChatMessage, User, UserPreference, UserBehavior
 from app.db import async_session_maker
+from app.embedding_service import embedding_service
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +62,7 @@ class EnhancedMemoryManager:
         
         # FIX: Re-enable the LLM and embeddings for advanced memory functions.
         self.llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.1)
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        self.embeddings = embedding_service
         
         # Memory configuration
         self.max_context_messages = 20
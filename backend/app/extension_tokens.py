@@ -9,10 +9,11 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 import secrets
 import hashlib
-from sqlalchemy import Column, String, DateTime, Boolean, select
+from sqlalchemy import Column, String, DateTime, Boolean, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import get_db
 from app.dependencies import get_current_user
+from app.auth_cache import get_extension_token_cached, invalidate_extension_token, last_used_recorder
 from app.models_db import Base
 import uuid
 
@@ -165,6 +166,7 @@ async def revoke_token(
         # Soft delete - mark as inactive
         token.is_active = False
         await db.commit()
+        invalidate_extension_token(token.token_hash)
         
         return {"message": "Token revoked successfully"}
     except HTTPException:
@@ -194,15 +196,8 @@ async def verify_token(
         plain_token = authorization.replace("Bearer ", "")
         token_hash = hash_token(plain_token)
         
-        # Find the token
-        result = await db.execute(
-            select(ExtensionToken)
-            .filter(
-                ExtensionToken.token_hash == token_hash,
-                ExtensionToken.is_active == True
-            )
-        )
-        token = result.scalar_one_or_none()
+        # Find the token (cached by hash)
+        token = await get_extension_token_cached(token_hash, db)
         
         if not token:
             raise HTTPException(
@@ -211,21 +206,24 @@ async def verify_token(
             )
         
         # Check expiration
-        if token.expires_at and token.expires_at < datetime.utcnow():
-            token.is_active = False
+        if token.is_expired:
+            await db.execute(
+                update(ExtensionToken)
+                .where(ExtensionToken.id == token.token_id)
+                .values(is_active=False)
+            )
             await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
         
-        # Update last used
-        token.last_used = datetime.utcnow()
-        await db.commit()
+        # Update last used (written in batches)
+        last_used_recorder.record(token.token_id)
         
         return {
             "valid": True,
-            "user_id": token.user_id,
+            "user_id": token.external_id,
             "token_name": token.name
         }
     except HTTPException:
@@ -251,14 +249,7 @@ async def verify_extension_token(
         plain_token = authorization.replace("Bearer ", "")
         token_hash = hash_token(plain_token)
         
-        result = await db.execute(
-            select(ExtensionToken)
-            .filter(
-                ExtensionToken.token_hash == token_hash,
-                ExtensionToken.is_active == True
-            )
-        )
-        token = result.scalar_one_or_none()
+        token = await get_extension_token_cached(token_hash, db)
         
         if not token:
             raise HTTPException(
@@ -267,17 +258,16 @@ async def verify_extension_token(
             )
         
         # Check expiration
-        if token.expires_at and token.expires_at < datetime.utcnow():
+        if token.is_expired:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Extension token has expired"
             )
         
-        # Update last used
-        token.last_used = datetime.utcnow()
-        await db.commit()
+        # Update last used (written in batches)
+        last_used_recorder.record(token.token_id)
         
-        return {"id": token.user_id, "token_id": token.id}
+        return {"id": token.external_id, "token_id": token.token_id}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
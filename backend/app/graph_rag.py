@@ -1,23 +1,28 @@
+import asyncio
 import logging
-from typing import List, Dict, Optional, Any
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain_core.vectorstores import InMemoryVectorStore
+import os
+from typing import AsyncIterator, List, Dict, Optional, Any
+from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.documents import Document as LCDocument
-# NOTE: langchain_graph_retriever is not a standard package
-# Commenting out until proper graph retrieval package is identified
-# from langchain_graph_retriever import GraphRetriever
-# from graph_retriever.strategies import Eager
-# from langchain_graph_retriever.transformers import ShreddingTransformer  # Optional, not needed for basic functionality
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models_db import Document, User
 from app.enhanced_memory import EnhancedMemoryManager
+from app.embedding_service import embedding_service
+from app.chunking import CHUNKER_VERSION, chunk_text
+from app.job_analysis import job_analysis_service
+from app.graph_rag_index import (
+    IndexSource, content_hash, get_cached_metadata, store_cached_metadata, graph_rag_index_store
+)
 from datetime import datetime
 import json
 import re
 
 logger = logging.getLogger(__name__)
 
+# Independent LLM generations (form answers, cover letter, resume) run concurrently up to this limit
+LLM_CONCURRENCY_LIMIT = int(os.getenv("GRAPH_RAG_LLM_CONCURRENCY", "4"))
+
 class EnhancedGraphRAG:
     """
     Graph RAG system that creates intelligent connections between documents, 
@@ -27,7 +32,7 @@ class EnhancedGraphRAG:
     def __init__(self, user_id: str, db: AsyncSession):
         self.user_id = user_id
         self.db = db
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
+        self.embeddings = embedding_service
         self.llm = ChatGoogleGenerativeAI(model='gemini-2.0-flash')
         self.vector_store = None
         self.graph_retriever = None
@@ -48,65 +53,73 @@ class EnhancedGraphRAG:
             memory_manager = EnhancedMemoryManager(self.db, user)
             user_profile = await memory_manager.get_user_learning_profile()
             
-            # Create enhanced documents with graph metadata
-            enhanced_docs = await self._create_enhanced_documents(documents, user, user_profile)
+            # Describe the index sources; only new or changed ones are chunked and embedded
+            sources = self._create_index_sources(documents, user, user_profile)
             
-            if not enhanced_docs:
+            if not sources:
                 logger.warning(f"No documents available for Graph RAG initialization for user {self.user_id}")
                 return False
             
-            # Create vector store with graph-compatible documents
-            self.vector_store = InMemoryVectorStore.from_documents(
-                documents=enhanced_docs,
-                embedding=self.embeddings,
+            # Persisted per-user index, reused across requests while the sources are unchanged
+            self.vector_store = await graph_rag_index_store.get_index(
+                self.user_id, sources, self.embeddings, self.db
             )
             
-            # Create graph retriever with intelligent traversal strategies
-            # NOTE: GraphRetriever disabled due to missing package
-            self.graph_retriever = None
-            # self.graph_retriever = GraphRetriever(
-            #     store=self.vector_store,
-            #     edges=self._define_graph_edges(),
-            #     strategy=Eager(k=8, start_k=2, max_depth=3),  # More comprehensive retrieval
-            # )
+            # Inverted indexes and adjacency for traversal; built once per loaded index
+            self.graph_retriever = self.vector_store.graph(self._define_graph_edges())
             
-            logger.info(f"Graph RAG initialized for user {self.user_id} with {len(enhanced_docs)} enhanced documents")
+            logger.info(f"Graph RAG initialized for user {self.user_id} with {len(self.vector_store)} indexed chunks")
             return True
             
         except Exception as e:
             logger.error(f"Failed to initialize Graph RAG for user {self.user_id}: {e}")
             return False
     
-    async def _create_enhanced_documents(self, documents: List[Document], user: User, user_profile) -> List[LCDocument]:
-        """Create enhanced documents with rich metadata for graph traversal"""
-        enhanced_docs = []
+    def _create_index_sources(self, documents: List[Document], user: User, user_profile) -> List[IndexSource]:
+        """Describe every document of the graph by a stable id and a hash of what its chunks depend on"""
+        sources = []
+        
+        # Add user profile document as foundation
+        user_doc = self._create_user_profile_document(user, user_profile)
+        sources.append(self._static_source("user_profile", [user_doc]))
+        
+        # Process each user document
+        for doc in documents:
+            if not doc.content:
+                continue
+            sources.append(IndexSource(
+                source_id=f"document:{doc.id}",
+                content_hash=content_hash(
+                    CHUNKER_VERSION, doc.type, doc.name,
+                    doc.date_created.isoformat() if doc.date_created else "", doc.content
+                ),
+                build_chunks=lambda doc=doc: self._create_document_chunks(doc, user_profile),
+            ))
         
-        try:
-            # Add user profile document as foundation
-            user_doc = self._create_user_profile_document(user, user_profile)
-            enhanced_docs.append(user_doc)
-            
-            # Process each user document
-            for doc in documents:
-                if not doc.content:
-                    continue
-                
-                # Extract metadata from document content
-                metadata = await self._extract_document_metadata(doc, user_profile)
-                
-                # Split document into semantic chunks with preserved context
-                chunks = await self._create_semantic_chunks(doc, metadata)
-                enhanced_docs.extend(chunks)
-            
-            # Add synthetic knowledge documents
-            knowledge_docs = await self._create_knowledge_documents(user_profile)
-            enhanced_docs.extend(knowledge_docs)
-            
-            return enhanced_docs
-            
-        except Exception as e:
-            logger.error(f"Error creating enhanced documents: {e}")
-            return []
+        # Add synthetic knowledge documents
+        for knowledge_doc in self._create_knowledge_documents(user_profile):
+            sources.append(self._static_source(knowledge_doc.metadata["document_id"], [knowledge_doc]))
+        
+        return sources
+    
+    def _static_source(self, source_id: str, chunks: List[LCDocument]) -> IndexSource:
+        """Index source for documents that are built without any LLM work"""
+        
+        async def build_chunks() -> List[LCDocument]:
+            return chunks
+        
+        return IndexSource(
+            source_id=source_id,
+            content_hash=content_hash(*(
+                chunk.page_content + json.dumps(chunk.metadata, sort_keys=True, default=str) for chunk in chunks
+            )),
+            build_chunks=build_chunks,
+        )
+    
+    async def _create_document_chunks(self, doc: Document, user_profile) -> List[LCDocument]:
+        """Extract metadata from a document and split it into semantic chunks with preserved context"""
+        metadata = await self._extract_document_metadata(doc, user_profile)
+        return await self._create_semantic_chunks(doc, metadata)
     
     def _create_user_profile_document(self, user: User, user_profile) -> LCDocument:
         """Create a comprehensive user profile document for graph connections"""
@@ -157,50 +170,56 @@ class EnhancedGraphRAG:
         )
     
     async def _extract_document_metadata(self, doc: Document, user_profile) -> Dict[str, Any]:
-        """Extract rich metadata from document content using AI"""
+        """Extract rich metadata from document content using AI, cached by content hash"""
         
-        try:
-            # Use LLM to extract structured metadata
-            extraction_prompt = f"""
-            Analyze this {doc.type} document and extract structured metadata.
-            Return a JSON object with the following fields:
-            - skills: list of technical skills mentioned
-            - industries: list of industries/sectors mentioned  
-            - job_titles: list of job titles/roles mentioned
-            - experience_level: estimated experience level (entry/mid/senior)
-            - technologies: list of technologies/tools mentioned
-            - achievements: list of key achievements or accomplishments
-            - education: educational background mentioned
-            - certifications: any certifications mentioned
-            
-            Document content:
-            {doc.content[:2000]}  # Limit content for processing
-            
-            Return only valid JSON:
-            """
-            
-            result = await self.llm.ainvoke(extraction_prompt)
-            
+        metadata_hash = content_hash(doc.type, doc.content)
+        metadata = await get_cached_metadata(metadata_hash, self.db)
+        
+        if metadata is None:
             try:
-                metadata = json.loads(result.content)
-            except json.JSONDecodeError:
-                # Fallback to basic extraction
+                # Use LLM to extract structured metadata
+                extraction_prompt = f"""
+                Analyze this {doc.type} document and extract structured metadata.
+                Return a JSON object with the following fields:
+                - skills: list of technical skills mentioned
+                - industries: list of industries/sectors mentioned  
+                - job_titles: list of job titles/roles mentioned
+                - experience_level: estimated experience level (entry/mid/senior)
+                - technologies: list of technologies/tools mentioned
+                - achievements: list of key achievements or accomplishments
+                - education: educational background mentioned
+                - certifications: any certifications mentioned
+                
+                Document content:
+                {doc.content[:2000]}  # Limit content for processing
+                
+                Return only valid JSON:
+                """
+                
+                result = await self.llm.ainvoke(extraction_prompt)
+                
+                try:
+                    metadata = json.loads(result.content)
+                    await store_cached_metadata(metadata_hash, metadata, self.db)
+                except json.JSONDecodeError:
+                    # Fallback to basic extraction
+                    metadata = self._extract_metadata_fallback(doc.content)
+                
+            except Exception as e:
+                logger.warning(f"AI metadata extraction failed for doc {doc.id}: {e}")
                 metadata = self._extract_metadata_fallback(doc.content)
-            
-            # Add document-specific metadata
-            metadata.update({
-                "document_type": doc.type,
-                "document_id": doc.id,
-                "document_name": doc.name,
-                "upload_date": doc.date_created.isoformat() if doc.date_created else None,
-                "content_length": len(doc.content) if doc.content else 0
-            })
-            
-            return metadata
-            
-        except Exception as e:
-            logger.warning(f"AI metadata extraction failed for doc {doc.id}: {e}")
-            return self._extract_metadata_fallback(doc.content)
+        
+        # Add document-specific metadata
+        metadata = dict(metadata)
+        metadata.update({
+            "document_type": doc.type,
+            "document_id": doc.id,
+            "document_name": doc.name,
+            "upload_date": doc.date_created.isoformat() if doc.date_created else None,
+            "content_length": len(doc.content) if doc.content else 0
+        })
+        
+        return metadata
     
     def _extract_metadata_fallback(self, content: str) -> Dict[str, Any]:
         """Fallback metadata extraction using pattern matching"""
@@ -236,72 +255,21 @@ class EnhancedGraphRAG:
         }
     
     async def _create_semantic_chunks(self, doc: Document, metadata: Dict[str, Any]) -> List[LCDocument]:
-        """Create semantic chunks that preserve context and relationships"""
+        """Create section-aware chunks that preserve context and relationships"""
         
         chunks = []
-        content = doc.content
-        
-        # Split into logical sections
-        sections = self._split_into_sections(content)
-        
-        for i, section in enumerate(sections):
+        for chunk in chunk_text(doc.content, doc.id):
             chunk_metadata = metadata.copy()
             chunk_metadata.update({
-                "chunk_index": i,
-                "section_type": self._identify_section_type(section),
-                "chunk_id": f"{doc.id}_chunk_{i}"
+                "chunk_index": chunk.index,
+                "section_type": chunk.section_type,
+                "chunk_id": chunk.chunk_id
             })
-            
-            chunk = LCDocument(
-                page_content=section,
-                metadata=chunk_metadata
-            )
-            chunks.append(chunk)
+            chunks.append(LCDocument(page_content=chunk.text, metadata=chunk_metadata))
         
         return chunks
     
-    def _split_into_sections(self, content: str) -> List[str]:
-        """Split content into logical sections"""
-        
-        # Split by common resume/document sections
-        section_patterns = [
-            r'\n\s*(?:EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT)\s*\n',
-            r'\n\s*(?:EDUCATION|ACADEMIC BACKGROUND)\s*\n',
-            r'\n\s*(?:SKILLS|TECHNICAL SKILLS|COMPETENCIES)\s*\n',
-            r'\n\s*(?:PROJECTS|PROJECT EXPERIENCE)\s*\n',
-            r'\n\s*(?:CERTIFICATIONS|CERTIFICATES)\s*\n',
-            r'\n\s*(?:SUMMARY|PROFILE|OBJECTIVE)\s*\n'
-        ]
-        
-        # Try to split by sections first
-        for pattern in section_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                sections = re.split(pattern, content, flags=re.IGNORECASE)
-                return [section.strip() for section in sections if section.strip()]
-        
-        # Fallback to paragraph splitting
-        paragraphs = content.split('\n\n')
-        return [para.strip() for para in paragraphs if len(para.strip()) > 50]
-    
-    def _identify_section_type(self, section: str) -> str:
-        """Identify the type of document section"""
-        
-        section_lower = section.lower()
-        
-        if any(keyword in section_lower for keyword in ["experience", "work", "employment", "position"]):
-            return "experience"
-        elif any(keyword in section_lower for keyword in ["education", "degree", "university", "college"]):
-            return "education"
-        elif any(keyword in section_lower for keyword in ["skills", "technical", "programming", "tools"]):
-            return "skills"
-        elif any(keyword in section_lower for keyword in ["project", "developed", "built", "created"]):
-            return "projects"
-        elif any(keyword in section_lower for keyword in ["summary", "profile", "objective"]):
-            return "summary"
-        else:
-            return "general"
-    
-    async def _create_knowledge_documents(self, user_profile) -> List[LCDocument]:
+    def _create_knowledge_documents(self, user_profile) -> List[LCDocument]:
         """Create synthetic knowledge documents to enhance graph connectivity"""
         
         knowledge_docs = []
@@ -371,12 +339,11 @@ class EnhancedGraphRAG:
             # Enhance query with context
             enhanced_query = await self._enhance_search_query(query, context)
             
-            # Perform vector similarity search as fallback since graph retriever is disabled
-            # Using similarity search with score threshold for relevant results
-            results = await self.vector_store.asimilarity_search(
-                enhanced_query, 
+            # Start from the best vector hits and expand along shared skills, titles, technologies...
+            results = await self.vector_store.agraph_search(
+                enhanced_query,
+                edges=self.graph_retriever.edges,
                 k=k,
-                filter=None  # Can add metadata filters here if needed
             )
             
             # Track search for learning
@@ -388,6 +355,32 @@ class EnhancedGraphRAG:
             logger.error(f"Graph search failed: {e}")
             return []
     
+    async def intelligent_search_many(self, queries: List[str], context: Optional[Dict[str, Any]] = None, k: int = 8) -> List[List[LCDocument]]:
+        """intelligent_search for several queries, embedded together in one request"""
+        
+        if not self.vector_store:
+            logger.error("Vector store not initialized")
+            return [[] for _ in queries]
+        
+        try:
+            enhanced_queries = [await self._enhance_search_query(query, context) for query in queries]
+            
+            results = await self.vector_store.agraph_search_many(
+                enhanced_queries,
+                edges=self.graph_retriever.edges,
+                k=k,
+            )
+            
+            # Track searches for learning (sequentially; they share the database session)
+            for query, enhanced_query, query_results in zip(queries, enhanced_queries, results):
+                await self._track_search_behavior(query, enhanced_query, query_results)
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Graph search failed: {e}")
+            return [[] for _ in queries]
+    
     async def _enhance_search_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
         """Enhance search query with contextual information"""
         
@@ -434,106 +427,93 @@ class EnhancedGraphRAG:
         except Exception as e:
             logger.warning(f"Failed to track search behavior: {e}")
     
+    async def iter_contextualized_information(self, job_description: str, form_questions: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the parts of the job application context as soon as each is ready.
+        
+        All retrieval queries are embedded in one request, then the form answers,
+        cover letter and resume suggestions are generated concurrently (at most
+        LLM_CONCURRENCY_LIMIT at a time). Events, in completion order:
+        job_analysis, relevant_experience, form_answer (one per question, with its
+        index), cover_letter, optimized_resume.
+        """
+        form_questions = form_questions or []
+        
+        # Extract key information from job description
+        job_context = await self._analyze_job_description(job_description)
+        yield {"type": "job_analysis", "job_analysis": job_context}
+        
+        # Search for relevant user information, form answers, cover letter and resume content at once
+        queries = [
+            "professional experience skills achievements",
+            "professional summary achievements relevant experience",
+            "work experience education skills projects",
+            *form_questions,
+        ]
+        user_info_results, cover_letter_results, resume_results, *answer_results = await self.intelligent_search_many(
+            queries, context=job_context
+        )
+        yield {
+            "type": "relevant_experience",
+            "relevant_experience": [doc.page_content for doc in user_info_results[:3]],
+            "confidence_score": self._calculate_confidence_score(job_context, user_info_results),
+        }
+        
+        semaphore = asyncio.Semaphore(LLM_CONCURRENCY_LIMIT)
+        
+        async def generate(event: Dict[str, Any], key: str, coroutine) -> Dict[str, Any]:
+            async with semaphore:
+                event[key] = await coroutine
+            return event
+        
+        generations = [
+            generate(
+                {"type": "form_answer", "index": index, "question": question}, "answer",
+                self._generate_contextualized_answer(question, job_description, results)
+            )
+            for index, (question, results) in enumerate(zip(form_questions, answer_results))
+        ]
+        generations.append(generate(
+            {"type": "cover_letter"}, "cover_letter",
+            self._generate_smart_cover_letter(job_description, job_context, cover_letter_results)
+        ))
+        generations.append(generate(
+            {"type": "optimized_resume"}, "optimized_resume",
+            self._generate_optimized_resume(job_description, job_context, resume_results)
+        ))
+        
+        tasks = [asyncio.create_task(generation) for generation in generations]
+        try:
+            for next_event in asyncio.as_completed(tasks):
+                yield await next_event
+        finally:
+            # The consumer may stop early (a disconnect, or a failed generation)
+            for task in tasks:
+                task.cancel()
+    
     async def get_contextualized_information(self, job_description: str, form_questions: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get contextualized information for job applications using Graph RAG"""
         
         try:
-            # Extract key information from job description
-            job_context = await self._analyze_job_description(job_description)
-            
-            # Search for relevant user information
-            user_info_results = await self.intelligent_search(
-                "professional experience skills achievements",
-                context=job_context
-            )
-            
-            # Get specific answers for form questions
-            form_answers = []
-            if form_questions:
-                for question in form_questions:
-                    answer_results = await self.intelligent_search(
-                        question,
-                        context=job_context
-                    )
-                    
-                    # Generate contextualized answer
-                    answer = await self._generate_contextualized_answer(
-                        question, job_description, answer_results
-                    )
-                    
-                    form_answers.append({
-                        "question": question,
-                        "answer": answer
-                    })
-            
-            # Generate personalized cover letter content
-            cover_letter_results = await self.intelligent_search(
-                "professional summary achievements relevant experience",
-                context=job_context
-            )
-            
-            cover_letter = await self._generate_smart_cover_letter(
-                job_description, job_context, cover_letter_results
-            )
-            
-            # Generate optimized resume content
-            resume_results = await self.intelligent_search(
-                "work experience education skills projects",
-                context=job_context
-            )
-            
-            optimized_resume = await self._generate_optimized_resume(
-                job_description, job_context, resume_results
-            )
-            
-            return {
-                "job_analysis": job_context,
-                "form_answers": form_answers,
-                "cover_letter": cover_letter,
-                "optimized_resume": optimized_resume,
-                "relevant_experience": [doc.page_content for doc in user_info_results[:3]],
-                "confidence_score": self._calculate_confidence_score(job_context, user_info_results)
-            }
+            context: Dict[str, Any] = {"form_answers": [None] * len(form_questions or [])}
+            async for event in self.iter_contextualized_information(job_description, form_questions):
+                event_type = event.pop("type")
+                if event_type == "form_answer":
+                    context["form_answers"][event.pop("index")] = event
+                else:
+                    context.update(event)
+            return context
             
         except Exception as e:
             logger.error(f"Error getting contextualized information: {e}")
             return {}
     
+    # Name used by the /rag endpoints and the agent
+    get_job_application_context = get_contextualized_information
+    
     async def _analyze_job_description(self, job_description: str) -> Dict[str, Any]:
-        """Analyze job description to extract key requirements and context"""
-        
-        analysis_prompt = f"""
-        Analyze this job description and extract key information as JSON:
-        
-        {{
-            "job_title": "extracted job title",
-            "company": "company name if mentioned",
-            "required_skills": ["skill1", "skill2"],
-            "preferred_skills": ["skill1", "skill2"],
-            "industry": "industry/sector",
-            "experience_level": "entry/mid/senior",
-            "technologies": ["tech1", "tech2"],
-            "key_responsibilities": ["resp1", "resp2"],
-            "qualifications": ["qual1", "qual2"]
-        }}
-        
-        Job Description:
-        {job_description}
-        
-        Return only valid JSON:
-        """
-        
-        try:
-            result = await self.llm.ainvoke(analysis_prompt)
-            return json.loads(result.content)
-        except:
-            # Fallback analysis
-            return {
-                "job_title": "Software Engineer",
-                "required_skills": ["Programming", "Problem Solving"],
-                "industry": "Technology",
-                "experience_level": "mid"
-            }
+        """Analyze job description to extract key requirements and context (cached per posting)"""
+        return await job_analysis_service.analyze(job_description)
     
     async def _generate_contextualized_answer(self, question: str, job_description: str, relevant_docs: List[LCDocument]) -> str:
         """Generate a contextualized answer using Graph RAG results"""
@@ -0,0 +1,264 @@
+"""
+Graph RAG Index - persisted, incrementally maintained per-user index for EnhancedGraphRAG
+Chunks and their embeddings live in graph_rag_chunks, extracted document metadata is
+cached by content hash in graph_rag_metadata, and loaded indexes are kept in process.
+Only sources whose content hash changed are re-chunked and re-embedded.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document as LCDocument
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.embedding_service import EmbeddingService
+from app.graph_retriever import GraphTraversalIndex
+from app.models_db import GraphRagChunk, GraphRagMetadata
+
+logger = logging.getLogger(__name__)
+
+GRAPH_RAG_INDEX_CACHE_SIZE = int(os.getenv("GRAPH_RAG_INDEX_CACHE_SIZE", "128"))
+
+
+def content_hash(*parts: str) -> str:
+    return hashlib.sha256("\n".join(part or "" for part in parts).encode("utf-8")).hexdigest()
+
+
+async def aembed_queries(embeddings, queries: List[str]) -> List[List[float]]:
+    """Embed several search queries in one batched request"""
+    if isinstance(embeddings, EmbeddingService):
+        return await embeddings.aembed_queries(queries)
+    return await embeddings.aembed_documents(queries)
+
+
+@dataclass
+class IndexSource:
+    """A document (or synthetic document) of the index and how to chunk it when it changes"""
+    source_id: str
+    content_hash: str
+    build_chunks: Callable[[], Awaitable[List[LCDocument]]]
+
+
+class GraphRagIndex:
+    """In-process view of a user's index: chunks plus a normalized embedding matrix"""
+
+    def __init__(self, documents: List[LCDocument], vectors: np.ndarray, embeddings):
+        self.documents = documents
+        self.embeddings = embeddings
+        self._graphs: Dict[Tuple[Tuple[str, str], ...], GraphTraversalIndex] = {}
+        if len(documents):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.vectors = (vectors / norms).astype(np.float32)
+        else:
+            self.vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def similarity_search_by_vector_with_scores(self, query_vector, k: int = 4) -> List[Tuple[int, float]]:
+        """(chunk position, cosine similarity) of the k closest chunks"""
+        if not len(self.documents):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.vectors @ query
+        top = np.argsort(-scores)[:k]
+        return [(int(index), float(scores[index])) for index in top]
+
+    async def asimilarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None) -> List[LCDocument]:
+        query_vector = await self.embeddings.aembed_query(query)
+        hits = self.similarity_search_by_vector_with_scores(query_vector, k=len(self.documents) if filter else k)
+        results = []
+        for index, _ in hits:
+            doc = self.documents[index]
+            if filter and any(doc.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            results.append(doc)
+            if len(results) >= k:
+                break
+        return results
+
+    def graph(self, edges: Sequence[Tuple[str, str]]) -> GraphTraversalIndex:
+        """Inverted indexes and adjacency for edges, built on first use and kept with the index"""
+        key = tuple(edges)
+        graph = self._graphs.get(key)
+        if graph is None:
+            graph = self._graphs[key] = GraphTraversalIndex(self.documents, key)
+        return graph
+
+    async def agraph_search(
+        self,
+        query: str,
+        edges: Sequence[Tuple[str, str]],
+        k: int = 8,
+        **traversal_options: Any,
+    ) -> List[LCDocument]:
+        """Vector hits for query expanded along shared metadata (see GraphTraversalIndex.traverse)"""
+        if not len(self.documents):
+            return []
+        query_vector = await self.embeddings.aembed_query(query)
+        return self._graph_search_by_vector(query_vector, edges, k, traversal_options)
+
+    async def agraph_search_many(
+        self,
+        queries: List[str],
+        edges: Sequence[Tuple[str, str]],
+        k: int = 8,
+        **traversal_options: Any,
+    ) -> List[List[LCDocument]]:
+        """agraph_search for several queries with a single batched embedding call"""
+        if not len(self.documents) or not queries:
+            return [[] for _ in queries]
+        query_vectors = await aembed_queries(self.embeddings, queries)
+        return [
+            self._graph_search_by_vector(query_vector, edges, k, traversal_options)
+            for query_vector in query_vectors
+        ]
+
+    def _graph_search_by_vector(self, query_vector, edges, k: int, traversal_options: Dict[str, Any]) -> List[LCDocument]:
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.vectors @ query
+        positions = self.graph(edges).traverse(scores, self.vectors, k=k, **traversal_options)
+        return [self.documents[position] for position in positions]
+
+
+class GraphRagIndexStore:
+    """
+    Keeps graph_rag_chunks in sync with a user's sources and serves loaded indexes.
+
+    A request whose sources (ids and content hashes) match the loaded index costs
+    no database reads for chunks, no LLM calls and no embeddings.
+    """
+
+    def __init__(self, max_users: int = GRAPH_RAG_INDEX_CACHE_SIZE):
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, Tuple[FrozenSet[Tuple[str, str]], GraphRagIndex]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"hits": 0, "loads": 0, "sources_embedded": 0, "chunks_embedded": 0, "chunks_deleted": 0}
+
+    async def get_index(self, user_id: str, sources: List[IndexSource], embeddings, db: AsyncSession) -> GraphRagIndex:
+        signature = frozenset((source.source_id, source.content_hash) for source in sources)
+        cached = self._indexes.get(user_id)
+        if cached and cached[0] == signature:
+            self._indexes.move_to_end(user_id)
+            self.stats["hits"] += 1
+            return cached[1]
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            cached = self._indexes.get(user_id)
+            if cached and cached[0] == signature:
+                self.stats["hits"] += 1
+                return cached[1]
+
+            await self._sync(user_id, sources, embeddings, db)
+            index = await self._load(user_id, embeddings, db)
+            self.stats["loads"] += 1
+
+            self._indexes[user_id] = (signature, index)
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                evicted_user_id, _ = self._indexes.popitem(last=False)
+                self._locks.pop(evicted_user_id, None)
+            return index
+
+    async def _sync(self, user_id: str, sources: List[IndexSource], embeddings, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(GraphRagChunk.id, GraphRagChunk.source_id, GraphRagChunk.content_hash)
+            .where(GraphRagChunk.user_id == user_id)
+        )
+        stored: Dict[str, set] = {}
+        stale_ids = []
+        wanted = {source.source_id: source.content_hash for source in sources}
+        for chunk_id, source_id, stored_hash in result.all():
+            if wanted.get(source_id) == stored_hash:
+                stored.setdefault(source_id, set()).add(chunk_id)
+            else:
+                stale_ids.append(chunk_id)
+
+        changed = [source for source in sources if source.source_id not in stored]
+
+        new_chunks: List[Tuple[IndexSource, int, LCDocument]] = []
+        for source in changed:
+            for chunk_index, chunk in enumerate(await source.build_chunks()):
+                new_chunks.append((source, chunk_index, chunk))
+
+        vectors = []
+        if new_chunks:
+            # One batched embedding call for every new chunk
+            vectors = await embeddings.aembed_documents([chunk.page_content for _, _, chunk in new_chunks])
+
+        if stale_ids:
+            await db.execute(delete(GraphRagChunk).where(GraphRagChunk.id.in_(stale_ids)))
+        for (source, chunk_index, chunk), vector in zip(new_chunks, vectors):
+            db.add(GraphRagChunk(
+                # Source ids such as "user_profile" repeat across users
+                id=f"{user_id}:{source.source_id}:{source.content_hash[:16]}:{chunk_index}",
+                user_id=user_id,
+                source_id=source.source_id,
+                content_hash=source.content_hash,
+                chunk_index=chunk_index,
+                content=chunk.page_content,
+                cmetadata=chunk.metadata,
+                embedding=vector,
+            ))
+        if stale_ids or new_chunks:
+            await db.commit()
+
+        self.stats["sources_embedded"] += len(changed)
+        self.stats["chunks_embedded"] += len(new_chunks)
+        self.stats["chunks_deleted"] += len(stale_ids)
+        if changed or stale_ids:
+            logger.info(
+                f"Graph RAG index for user {user_id}: {len(changed)} sources re-indexed "
+                f"({len(new_chunks)} chunks embedded), {len(stale_ids)} stale chunks removed"
+            )
+
+    async def _load(self, user_id: str, embeddings, db: AsyncSession) -> GraphRagIndex:
+        result = await db.execute(
+            select(GraphRagChunk.content, GraphRagChunk.cmetadata, GraphRagChunk.embedding)
+            .where(GraphRagChunk.user_id == user_id)
+            .order_by(GraphRagChunk.source_id, GraphRagChunk.chunk_index)
+        )
+        documents, vectors = [], []
+        for content, metadata, embedding in result.all():
+            if embedding is None:
+                continue
+            documents.append(LCDocument(page_content=content, metadata=metadata or {}))
+            vectors.append(np.asarray(embedding, dtype=np.float32))
+        matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        return GraphRagIndex(documents, matrix, embeddings)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self._indexes.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_users": len(self._indexes)}
+
+
+async def get_cached_metadata(hash_value: str, db: AsyncSession) -> Optional[Dict[str, Any]]:
+    result = await db.execute(select(GraphRagMetadata.cmetadata).where(GraphRagMetadata.content_hash == hash_value))
+    return result.scalar_one_or_none()
+
+
+async def store_cached_metadata(hash_value: str, metadata: Dict[str, Any], db: AsyncSession) -> None:
+    """Remember extracted metadata; committed together with the index sync"""
+    if await db.get(GraphRagMetadata, hash_value) is None:
+        db.add(GraphRagMetadata(content_hash=hash_value, cmetadata=metadata))
+
+
+# Global index store
+graph_rag_index_store = GraphRagIndexStore()
@@ -0,0 +1,154 @@
+"""
+Graph Retriever - in-process graph traversal over Graph RAG chunk metadata
+Chunks are connected when they share a value of an edge attribute (skills,
+technologies, job titles...). Inverted indexes and the adjacency matrix are built
+once per loaded index, so a traversal is a handful of vectorized numpy operations.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document as LCDocument
+
+logger = logging.getLogger(__name__)
+
+# Defaults of the previously planned Eager(k=8, start_k=2, max_depth=3) retriever
+GRAPH_TRAVERSAL_START_K = int(os.getenv("GRAPH_TRAVERSAL_START_K", "2"))
+GRAPH_TRAVERSAL_MAX_DEPTH = int(os.getenv("GRAPH_TRAVERSAL_MAX_DEPTH", "3"))
+GRAPH_TRAVERSAL_STRATEGY = os.getenv("GRAPH_TRAVERSAL_STRATEGY", "eager")
+MMR_LAMBDA = 0.5
+
+STRATEGIES = ("eager", "mmr")
+
+
+def edge_values(value: Any) -> List[str]:
+    """Normalized values of a metadata attribute (scalars and lists, case-insensitive)"""
+    if value is None or isinstance(value, dict):
+        return []
+    items: Iterable[Any] = value if isinstance(value, (list, tuple, set)) else [value]
+    values = []
+    for item in items:
+        if item is None or isinstance(item, (dict, list)):
+            continue
+        text = str(item).strip().lower()
+        if text:
+            values.append(text)
+    return values
+
+
+class GraphTraversalIndex:
+    """
+    Inverted indexes (attribute -> value -> chunk positions) and the adjacency
+    matrix they induce for a fixed list of chunks and edges.
+
+    An edge (source, target) connects chunk a to chunk b when a value of a's
+    `source` attribute is also a value of b's `target` attribute.
+    """
+
+    def __init__(self, documents: Sequence[LCDocument], edges: Sequence[Tuple[str, str]]):
+        self.edges = tuple(edges)
+        self.size = len(documents)
+
+        attributes = {attribute for edge in self.edges for attribute in edge}
+        postings: Dict[str, Dict[str, List[int]]] = {attribute: {} for attribute in attributes}
+        for position, doc in enumerate(documents):
+            for attribute in attributes:
+                for value in set(edge_values(doc.metadata.get(attribute))):
+                    postings[attribute].setdefault(value, []).append(position)
+        self.inverted: Dict[str, Dict[str, np.ndarray]] = {
+            attribute: {value: np.asarray(positions, dtype=np.int32) for value, positions in values.items()}
+            for attribute, values in postings.items()
+        }
+
+        self.adjacency = np.zeros((self.size, self.size), dtype=bool)
+        for source, target in self.edges:
+            for value, sources in self.inverted[source].items():
+                targets = self.inverted[target].get(value)
+                if targets is not None:
+                    self.adjacency[np.ix_(sources, targets)] = True
+        np.fill_diagonal(self.adjacency, False)
+
+    def lookup(self, attribute: str, value: Any) -> np.ndarray:
+        """Positions of the chunks whose attribute contains value"""
+        values = edge_values(value)
+        if not values or attribute not in self.inverted:
+            return np.zeros(0, dtype=np.int32)
+        return self.inverted[attribute].get(values[0], np.zeros(0, dtype=np.int32))
+
+    def neighbors(self, position: int) -> np.ndarray:
+        return np.flatnonzero(self.adjacency[position])
+
+    def expand(self, start: np.ndarray, max_depth: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Breadth-first expansion from start; returns reached positions and their depth"""
+        depth = np.full(self.size, -1, dtype=np.int32)
+        depth[start] = 0
+        frontier = start
+        for level in range(1, max_depth + 1):
+            if not len(frontier):
+                break
+            reached = self.adjacency[frontier].any(axis=0) & (depth < 0)
+            frontier = np.flatnonzero(reached)
+            depth[frontier] = level
+        reached = np.flatnonzero(depth >= 0)
+        return reached, depth[reached]
+
+    def traverse(
+        self,
+        scores: np.ndarray,
+        vectors: np.ndarray,
+        k: int = 8,
+        start_k: int = GRAPH_TRAVERSAL_START_K,
+        max_depth: int = GRAPH_TRAVERSAL_MAX_DEPTH,
+        strategy: str = GRAPH_TRAVERSAL_STRATEGY,
+        lambda_mult: float = MMR_LAMBDA,
+    ) -> List[int]:
+        """
+        Positions of up to k chunks, starting from the start_k best vector hits and
+        following shared attributes up to max_depth hops.
+
+        eager: nearer hops first, best similarity first within a hop.
+        mmr: maximal marginal relevance over everything reached, which trades
+        similarity to the query against similarity to already selected chunks.
+        When the graph reaches fewer than k chunks, the best remaining vector hits fill up.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown traversal strategy {strategy!r}, expected one of {STRATEGIES}")
+        if not self.size or k <= 0:
+            return []
+
+        start = np.argsort(-scores)[:max(1, start_k)]
+        reached, depth = self.expand(start, max_depth)
+
+        if strategy == "eager":
+            order = np.lexsort((-scores[reached], depth))
+            selected = [int(position) for position in reached[order][:k]]
+        else:
+            selected = self._select_mmr(reached, scores, vectors, k, lambda_mult)
+
+        if len(selected) < k:
+            chosen = set(selected)
+            for position in np.argsort(-scores):
+                if len(selected) >= k:
+                    break
+                if int(position) not in chosen:
+                    selected.append(int(position))
+        return selected
+
+    @staticmethod
+    def _select_mmr(reached: np.ndarray, scores: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+        selected: List[int] = []
+        candidates = reached
+        relevance = scores[candidates]
+        redundancy = np.zeros(len(candidates), dtype=np.float32)
+        while len(selected) < k and len(candidates):
+            mmr = relevance if not selected else lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            best = int(np.argmax(mmr))
+            chosen = int(candidates[best])
+            selected.append(chosen)
+            keep = np.arange(len(candidates)) != best
+            candidates, relevance, redundancy = candidates[keep], relevance[keep], redundancy[keep]
+            if len(candidates):
+                redundancy = np.maximum(redundancy, vectors[candidates] @ vectors[chosen])
+        return selected
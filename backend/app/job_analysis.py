@@ -0,0 +1,213 @@
+"""
+Job Analysis - one cached LLM analysis per job posting
+Tailoring a resume, writing a cover letter and autofilling an application for the
+same posting all need its title, company and requirements. The analysis is stored
+in the job_analyses table under the hash of the normalized description (and the
+posting URL when known), expires after JOB_ANALYSIS_TTL_HOURS, and concurrent
+requests for the same posting share one LLM call.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from sqlalchemy import or_
+from sqlalchemy.future import select
+
+from app.db import async_session_maker
+from app.models_db import JobAnalysis
+
+logger = logging.getLogger(__name__)
+
+JOB_ANALYSIS_TTL_HOURS = int(os.getenv("JOB_ANALYSIS_TTL_HOURS", "168"))
+# Longer descriptions are truncated before analysis (and before hashing)
+JOB_DESCRIPTION_MAX_CHARS = int(os.getenv("JOB_DESCRIPTION_MAX_CHARS", "8000"))
+
+# Returned when the LLM output cannot be used; never persisted
+FALLBACK_ANALYSIS = {
+    "job_title": "Software Engineer",
+    "required_skills": ["Programming", "Problem Solving"],
+    "industry": "Technology",
+    "experience_level": "mid"
+}
+
+ANALYSIS_PROMPT = """
+Analyze this job description and extract key information as JSON:
+
+{{
+    "job_title": "extracted job title",
+    "company": "company name if mentioned",
+    "location": "location if mentioned",
+    "summary": "two or three sentences on the role and its main responsibilities",
+    "required_skills": ["skill1", "skill2"],
+    "preferred_skills": ["skill1", "skill2"],
+    "industry": "industry/sector",
+    "experience_level": "entry/mid/senior",
+    "technologies": ["tech1", "tech2"],
+    "key_responsibilities": ["resp1", "resp2"],
+    "qualifications": ["qual1", "qual2"]
+}}
+
+Use an empty string or list for anything the description does not mention.
+
+Job Description:
+{job_description}
+
+Return only valid JSON:
+"""
+
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|ref|refid|trk|trackingid|src|source|fbclid|gclid)$", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_job_description(text: str) -> str:
+    """Case, Unicode form and whitespace differences do not make a different posting"""
+    text = unicodedata.normalize("NFKC", text or "")[:JOB_DESCRIPTION_MAX_CHARS]
+    return WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def normalize_job_url(url: Optional[str]) -> Optional[str]:
+    """Drops fragments, tracking parameters and trailing slashes from a posting URL"""
+    if not url or not url.strip():
+        return None
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def job_description_hash(text: str) -> str:
+    return hashlib.sha256(normalize_job_description(text).encode("utf-8")).hexdigest()
+
+
+def parse_analysis(content: str) -> Dict[str, Any]:
+    """JSON object from an LLM reply, tolerating code fences and surrounding text"""
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object in analysis response")
+    analysis = json.loads(content[start:end + 1])
+    if not isinstance(analysis, dict):
+        raise ValueError("Analysis is not a JSON object")
+    return analysis
+
+
+class JobAnalysisService:
+    """Persisted, single-flight job description analysis"""
+
+    def __init__(self, ttl_hours: int = JOB_ANALYSIS_TTL_HOURS):
+        self.ttl = timedelta(hours=ttl_hours)
+        self._llm = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "errors": 0}
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
+        return self._llm
+
+    async def lookup(self, job_description: Optional[str] = None, source_url: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Unexpired analysis for the posting URL or the description, without calling the LLM"""
+        url = normalize_job_url(source_url)
+        conditions = []
+        if url:
+            conditions.append(JobAnalysis.source_url == url)
+        if job_description and job_description.strip():
+            conditions.append(JobAnalysis.content_hash == job_description_hash(job_description))
+        if not conditions:
+            return None
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(JobAnalysis)
+                .where(or_(*conditions), JobAnalysis.expires_at > datetime.now(timezone.utc))
+                .order_by(JobAnalysis.created_at.desc())
+            )
+            rows = result.scalars().all()
+        if not rows:
+            return None
+        # The URL identifies the posting even when the scraped text differs
+        row = next((row for row in rows if url and row.source_url == url), rows[0])
+        return row.analysis
+
+    async def analyze(
+        self,
+        job_description: str,
+        source_url: Optional[str] = None,
+        fallback: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Analysis of a job description; the LLM is only called for postings not seen
+        within the TTL. When the analysis fails, a copy of fallback (by default
+        FALLBACK_ANALYSIS) is returned and nothing is stored.
+        """
+        flight_key = normalize_job_url(source_url) or job_description_hash(job_description)
+        task = self._in_flight.get(flight_key)
+        if task is not None:
+            self.stats["shared"] += 1
+        else:
+            # Detached from the caller, so a cancelled request does not cancel the others waiting on it
+            task = asyncio.create_task(self._analyze(job_description, source_url))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(flight_key, None))
+        analysis = await asyncio.shield(task)
+
+        if analysis is None:
+            return dict(FALLBACK_ANALYSIS if fallback is None else fallback)
+        return analysis
+
+    async def _analyze(self, job_description: str, source_url: Optional[str]) -> Optional[Dict[str, Any]]:
+        try:
+            cached = await self.lookup(job_description, source_url)
+        except Exception as e:
+            logger.warning(f"Job analysis cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        self.stats["misses"] += 1
+        try:
+            result = await self.llm.ainvoke(ANALYSIS_PROMPT.format(
+                job_description=job_description[:JOB_DESCRIPTION_MAX_CHARS]
+            ))
+            analysis = parse_analysis(result.content)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Job description analysis failed: {e}")
+            return None
+
+        try:
+            await self._store(job_description, source_url, analysis)
+        except Exception as e:
+            logger.warning(f"Could not store job analysis: {e}")
+        return analysis
+
+    async def _store(self, job_description: str, source_url: Optional[str], analysis: Dict[str, Any]) -> None:
+        now = datetime.now(timezone.utc)
+        async with async_session_maker() as db:
+            await db.merge(JobAnalysis(
+                content_hash=job_description_hash(job_description),
+                source_url=normalize_job_url(source_url),
+                analysis=analysis,
+                created_at=now,
+                expires_at=now + self.ttl,
+            ))
+            await db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._in_flight)}
+
+
+# Global service shared by Graph RAG, the resume tools and the extension autofill
+job_analysis_service = JobAnalysisService()
@@ -0,0 +1,223 @@
+"""
+Job Search Cache - shared, stale-while-revalidate cache of LinkedIn search results
+Many users run the same searches ("software engineer", "Remote", "past week"), so
+results are cached per normalized query for every user. How long a result stays
+fresh depends on the posting-date window: a "24hr" search goes stale sooner than a
+"past month" one. Stale results are still served for JOB_SEARCH_STALE_SECONDS while
+one background refresh fetches new ones, and concurrent identical searches share a
+single upstream call. Failed fetches are never cached, and an empty result (often a
+rate-limited upstream) is only kept for JOB_SEARCH_EMPTY_TTL_SECONDS.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+JOB_SEARCH_CACHE_SIZE = int(os.getenv("JOB_SEARCH_CACHE_SIZE", "2000"))
+# Freshness per date_since_posted window
+JOB_SEARCH_TTL_SECONDS = {
+    "24hr": int(os.getenv("JOB_SEARCH_TTL_24HR_SECONDS", "600")),
+    "past week": int(os.getenv("JOB_SEARCH_TTL_WEEK_SECONDS", "3600")),
+    "past month": int(os.getenv("JOB_SEARCH_TTL_MONTH_SECONDS", "14400")),
+}
+JOB_SEARCH_DEFAULT_TTL_SECONDS = int(os.getenv("JOB_SEARCH_DEFAULT_TTL_SECONDS", "3600"))
+# Empty results are retried soon and never served stale
+JOB_SEARCH_EMPTY_TTL_SECONDS = int(os.getenv("JOB_SEARCH_EMPTY_TTL_SECONDS", "60"))
+# How long past its TTL a result may still be served while it is refreshed
+JOB_SEARCH_STALE_SECONDS = int(os.getenv("JOB_SEARCH_STALE_SECONDS", "3600"))
+
+DATE_WINDOWS = {
+    "24hr": "24hr", "24h": "24hr", "past 24 hours": "24hr", "past day": "24hr", "day": "24hr",
+    "past week": "past week", "week": "past week", "7d": "past week",
+    "past month": "past month", "month": "past month", "30d": "past month",
+}
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: Any) -> str:
+    return WHITESPACE.sub(" ", str(value or "")).strip().casefold()
+
+
+class JobSearchQuery(NamedTuple):
+    keyword: str
+    location: str
+    date_since_posted: str
+    job_type: str
+    remote_filter: str
+    salary: str
+    experience_level: str
+    page: int
+
+
+def normalize_query(
+    keyword: str,
+    location: str = "Remote",
+    date_since_posted: str = "past week",
+    job_type: str = "",
+    remote_filter: str = "",
+    salary: str = "",
+    experience_level: str = "",
+    page: int = 0,
+) -> JobSearchQuery:
+    """Searches that differ only in case, spacing or date-window spelling share a key"""
+    date_window = _normalize(date_since_posted)
+    return JobSearchQuery(
+        keyword=_normalize(keyword),
+        location=_normalize(location),
+        date_since_posted=DATE_WINDOWS.get(date_window, date_window),
+        job_type=_normalize(job_type),
+        remote_filter=_normalize(remote_filter),
+        salary=_normalize(salary),
+        experience_level=_normalize(experience_level),
+        page=int(page or 0),
+    )
+
+
+@dataclass
+class CachedSearch:
+    results: List[Any]
+    fetched_at: float
+    ttl: float
+    stale: float
+
+
+class JobSearchCache:
+    """In-process LRU of search results with single-flight fetches and background refresh"""
+
+    def __init__(
+        self,
+        max_entries: int = JOB_SEARCH_CACHE_SIZE,
+        stale_seconds: float = JOB_SEARCH_STALE_SECONDS,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+        default_ttl: float = JOB_SEARCH_DEFAULT_TTL_SECONDS,
+        empty_ttl: float = JOB_SEARCH_EMPTY_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self.ttl_seconds = dict(JOB_SEARCH_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self.default_ttl = default_ttl
+        self.empty_ttl = empty_ttl
+        self._entries: "OrderedDict[JobSearchQuery, CachedSearch]" = OrderedDict()
+        self._in_flight: Dict[JobSearchQuery, asyncio.Task] = {}
+        self._refreshes: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "hits": 0, "stale_hits": 0, "misses": 0, "shared": 0,
+                      "upstream_calls": 0, "empty_results": 0, "refreshes": 0, "refresh_errors": 0,
+                      "errors": 0, "evictions": 0}
+
+    def ttl_for(self, query: JobSearchQuery) -> float:
+        return self.ttl_seconds.get(query.date_since_posted, self.default_ttl)
+
+    async def get_or_fetch(self, query: JobSearchQuery, fetch: Callable[[], Awaitable[List[Any]]]) -> List[Any]:
+        """
+        Cached results for the query. Fresh entries are returned as they are; stale
+        ones are returned immediately and refreshed in the background; missing or
+        expired ones are fetched, with concurrent callers sharing one fetch. Errors
+        from fetch propagate and nothing is cached.
+        """
+        self.stats["requests"] += 1
+        entry = self._entries.get(query)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age <= entry.ttl:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(query)
+                return entry.results
+            if age <= entry.ttl + entry.stale:
+                self.stats["stale_hits"] += 1
+                self._entries.move_to_end(query)
+                self._refresh(query, fetch)
+                return entry.results
+            self._entries.pop(query, None)
+
+        task = self._in_flight.get(query)
+        if task is not None:
+            self.stats["shared"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = self._start_fetch(query, fetch)
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, query: JobSearchQuery, fetch: Callable[[], Awaitable[List[Any]]]) -> asyncio.Task:
+        # Detached from the caller, so one cancelled search does not cancel the others waiting on it
+        task = asyncio.get_running_loop().create_task(self._fetch(query, fetch))
+        self._in_flight[query] = task
+        task.add_done_callback(self._fetch_done)
+        return task
+
+    async def _fetch(self, query: JobSearchQuery, fetch: Callable[[], Awaitable[List[Any]]]) -> List[Any]:
+        try:
+            self.stats["upstream_calls"] += 1
+            results = await fetch()
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._in_flight.pop(query, None)
+        self._store(query, results)
+        return results
+
+    @staticmethod
+    def _fetch_done(task: asyncio.Task) -> None:
+        # Mark a failure as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _refresh(self, query: JobSearchQuery, fetch: Callable[[], Awaitable[List[Any]]]) -> None:
+        if query in self._in_flight:
+            return
+        self.stats["refreshes"] += 1
+        task = self._start_fetch(query, fetch)
+        self._refreshes.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refreshes.discard(task)
+        error = None if task.cancelled() else task.exception()
+        if error is not None:
+            # Keep serving the stale results until they expire
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"Background refresh of a job search failed: {error}")
+
+    def _store(self, query: JobSearchQuery, results: List[Any]) -> None:
+        if results:
+            entry = CachedSearch(list(results), time.monotonic(), self.ttl_for(query), self.stale_seconds)
+        else:
+            self.stats["empty_results"] += 1
+            entry = CachedSearch([], time.monotonic(), self.empty_ttl, 0)
+        self._entries[query] = entry
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def wait_refreshes(self) -> None:
+        """Waits for background refreshes, e.g. in tests"""
+        while self._refreshes:
+            await asyncio.gather(*list(self._refreshes), return_exceptions=True)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        served_from_cache = self.stats["hits"] + self.stats["stale_hits"] + self.stats["shared"]
+        return {
+            **self.stats,
+            "hit_rate": round(served_from_cache / requests, 3) if requests else 0.0,
+            # Background refreshes count as upstream calls too
+            "upstream_calls_saved": max(requests - self.stats["upstream_calls"], 0),
+            "cached_queries": len(self._entries),
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Global cache shared by every user's LinkedIn searches
+job_search_cache = JobSearchCache()
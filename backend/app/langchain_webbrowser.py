@@ -8,6 +8,7 @@ from typing import Optional
 from playwright.sync_api import sync_playwright
 from langchain.tools import Tool
 from pydantic import BaseModel, Field
+from app.loop_monitor import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -102,12 +103,17 @@ def _sync_browser_navigate(url: str) -> str:
         logger.error(f"Browser navigation error: {e}")
         return f"Error accessing {url}: {str(e)}. The page might be protected or require special handling."
 
+async def _async_browser_navigate(url: str) -> str:
+    """Run the synchronous Playwright navigation on the blocking pool, off the event loop."""
+    return await run_blocking(_sync_browser_navigate, url)
+
 def create_webbrowser_tool():
     """Create a web browser tool using synchronous Playwright."""
     return Tool(
         name="web_browser",
         description="Navigate to a URL and extract content from web pages. Useful for scraping job postings, company information, and other web content.",
         func=_sync_browser_navigate,
+        coroutine=_async_browser_navigate,
         args_schema=BrowserInput
     )
 
@@ -1,20 +1,39 @@
 """
 LinkedIn Jobs API Service
 Provides job search capabilities using the linkedin-jobs-api Node.js package.
+Searches run in a small pool of long-lived Node.js workers (app/linkedin_worker.js)
+that keep the package loaded, instead of starting Node for every query. Results
+are shared across users through the job search cache (app/job_search_cache.py).
 """
 
-import asyncio
-import json
 import logging
-import subprocess
-import tempfile
 import os
+import shlex
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
-from datetime import datetime
+
+from app.job_search_cache import JobSearchCache, job_search_cache, normalize_query
+from app.node_worker_pool import NodeWorkerError, NodeWorkerPool, NodeWorkerTimeout
 
 log = logging.getLogger(__name__)
 
+LINKEDIN_WORKERS = int(os.getenv("LINKEDIN_WORKERS", "2"))
+# Concurrent searches per worker; further searches wait for a free slot
+LINKEDIN_WORKER_MAX_IN_FLIGHT = int(os.getenv("LINKEDIN_WORKER_MAX_IN_FLIGHT", "4"))
+LINKEDIN_SEARCH_TIMEOUT_SECONDS = int(os.getenv("LINKEDIN_SEARCH_TIMEOUT_SECONDS", "60"))
+# Upstream page size; every search fetches a full page so all limits share one cache entry
+LINKEDIN_PAGE_SIZE = 25
+# Overrides the worker, e.g. "python scripts/stub_linkedin_worker.py" for offline development
+LINKEDIN_WORKER_COMMAND = os.getenv("LINKEDIN_WORKER_COMMAND", "")
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linkedin_worker.js")
+
+
+def default_worker_command() -> List[str]:
+    if LINKEDIN_WORKER_COMMAND:
+        return shlex.split(LINKEDIN_WORKER_COMMAND)
+    return ["node", WORKER_SCRIPT]
+
 class LinkedInJobResult(BaseModel):
     position: str
     company: str
@@ -26,41 +45,32 @@ class LinkedInJobResult(BaseModel):
     job_url: str
 
 class LinkedInJobsService:
-    """Service to interact with LinkedIn Jobs API via Node.js subprocess."""
+    """Service to interact with LinkedIn Jobs API via a pool of Node.js workers."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        command: Optional[List[str]] = None,
+        pool_size: int = LINKEDIN_WORKERS,
+        max_in_flight: int = LINKEDIN_WORKER_MAX_IN_FLIGHT,
+        timeout: float = LINKEDIN_SEARCH_TIMEOUT_SECONDS,
+        cache: Optional[JobSearchCache] = None
+    ):
         # Get the backend directory at initialization
         self.backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.timeout = timeout
+        self.cache = cache or job_search_cache
         
-        self.node_script_template = '''
-const linkedIn = require('linkedin-jobs-api');
-
-async function searchJobs() {
-    try {
-        const queryOptions = {QUERY_OPTIONS};
-        
-        console.log('🔍 Searching LinkedIn with options:', JSON.stringify(queryOptions, null, 2));
+        # Set up environment with NODE_PATH pointing to our node_modules
+        env = os.environ.copy()
+        env['NODE_PATH'] = os.path.join(self.backend_dir, 'node_modules')
         
-        const response = await linkedIn.query(queryOptions);
-        
-        console.log('✅ LinkedIn API response received');
-        console.log('📊 Found', response.length, 'jobs');
-        
-        // Output the results as JSON
-        console.log('LINKEDIN_RESULTS_START');
-        console.log(JSON.stringify(response, null, 2));
-        console.log('LINKEDIN_RESULTS_END');
-        
-    } catch (error) {
-        console.error('❌ LinkedIn API Error:', error.message);
-        console.log('LINKEDIN_ERROR_START');
-        console.log(JSON.stringify({ error: error.message }, null, 2));
-        console.log('LINKEDIN_ERROR_END');
-    }
-}
-
-searchJobs();
-'''
+        self.pool = NodeWorkerPool(
+            command or default_worker_command(),
+            size=pool_size,
+            max_in_flight=max_in_flight,
+            cwd=self.backend_dir,
+            env=env
+        )
 
     async def search_jobs(
         self,
@@ -91,156 +101,82 @@ searchJobs();
         Returns:
             List of LinkedInJobResult objects
         """
-        try:
-            # Prepare query options
-            query_options = {
-                "keyword": keyword,
-                "location": location,
-                "dateSincePosted": date_since_posted,
-                "limit": str(min(limit, 25)),  # API limit
-                "page": str(page)
-            }
-            
-            # Add optional filters only if provided
-            if job_type:
-                query_options["jobType"] = job_type
-            if remote_filter:
-                query_options["remoteFilter"] = remote_filter
-            if salary:
-                query_options["salary"] = salary
-            if experience_level:
-                query_options["experienceLevel"] = experience_level
-            
+        query = normalize_query(
+            keyword, location, date_since_posted, job_type, remote_filter, salary, experience_level, page
+        )
+        
+        # Prepare query options
+        query_options = {
+            "keyword": keyword,
+            "location": location,
+            "dateSincePosted": query.date_since_posted,
+            "limit": str(LINKEDIN_PAGE_SIZE),  # API limit
+            "page": str(page)
+        }
+        
+        # Add optional filters only if provided
+        if job_type:
+            query_options["jobType"] = job_type
+        if remote_filter:
+            query_options["remoteFilter"] = remote_filter
+        if salary:
+            query_options["salary"] = salary
+        if experience_level:
+            query_options["experienceLevel"] = experience_level
+        
+        async def fetch() -> List[LinkedInJobResult]:
             log.info(f"🔍 Searching LinkedIn for '{keyword}' in '{location}'")
-            log.info(f"📋 Query options: {query_options}")
-            
-            # Create the Node.js script
-            script_content = self.node_script_template.replace(
-                '{QUERY_OPTIONS}', 
-                json.dumps(query_options, indent=8)
-            )
-            
-            # Write script to temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-                f.write(script_content)
-                script_path = f.name
-            
-            try:
-                # Execute the Node.js script
-                log.info(f"🚀 Executing LinkedIn API call...")
-                log.info(f"📁 Backend directory: {self.backend_dir}")
-                log.info(f"📄 Script path: {script_path}")
-                
-                node_modules_path = os.path.join(self.backend_dir, 'node_modules')
-                log.info(f"📦 Node modules exists: {os.path.exists(node_modules_path)}")
-                
-                # Set up environment with NODE_PATH pointing to our node_modules
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                process = await asyncio.create_subprocess_exec(
-                    'node', script_path,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    env=env,
-                    cwd=self.backend_dir
-                )
-                
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
-                
-                # Decode output
-                stdout_str = stdout.decode('utf-8')
-                stderr_str = stderr.decode('utf-8')
-                
-                log.info(f"📤 Node.js stdout: {stdout_str}")
-                if stderr_str:
-                    log.warning(f"⚠️ Node.js stderr: {stderr_str}")
-                
-                # Parse results
-                jobs = self._parse_node_output(stdout_str)
-                
-                log.info(f"✅ Successfully retrieved {len(jobs)} jobs from LinkedIn")
-                return jobs
-                
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(script_path)
-                except OSError:
-                    pass
-                    
-        except asyncio.TimeoutError:
-            log.error("⏰ LinkedIn API call timed out after 60 seconds")
+            log.debug(f"📋 Query options: {query_options}")
+            jobs_data = await self.pool.request("search", query_options, timeout=self.timeout)
+            jobs = self._parse_jobs(jobs_data)
+            log.info(f"✅ Successfully retrieved {len(jobs)} jobs from LinkedIn")
+            return jobs
+        
+        try:
+            jobs = await self.cache.get_or_fetch(query, fetch)
+        except NodeWorkerTimeout:
+            log.error(f"⏰ LinkedIn API call timed out after {self.timeout} seconds")
             return []
-        except Exception as e:
+        except NodeWorkerError as e:
             log.error(f"❌ Error calling LinkedIn API: {e}")
             return []
+        
+        return jobs[:min(limit, LINKEDIN_PAGE_SIZE)]
     
-    def _parse_node_output(self, output: str) -> List[LinkedInJobResult]:
-        """Parse the Node.js script output to extract job results."""
-        try:
-            # Look for results between markers
-            if 'LINKEDIN_RESULTS_START' in output and 'LINKEDIN_RESULTS_END' in output:
-                start_marker = 'LINKEDIN_RESULTS_START'
-                end_marker = 'LINKEDIN_RESULTS_END'
-                
-                start_idx = output.find(start_marker) + len(start_marker)
-                end_idx = output.find(end_marker)
-                
-                if start_idx > len(start_marker) and end_idx > start_idx:
-                    json_str = output[start_idx:end_idx].strip()
-                    
-                    try:
-                        jobs_data = json.loads(json_str)
-                        
-                        if isinstance(jobs_data, list):
-                            jobs = []
-                            for job_data in jobs_data:
-                                if isinstance(job_data, dict):
-                                    try:
-                                        job = LinkedInJobResult(
-                                            position=job_data.get('position', 'Unknown Position'),
-                                            company=job_data.get('company', 'Unknown Company'),
-                                            company_logo=job_data.get('companyLogo'),
-                                            location=job_data.get('location', 'Unknown Location'),
-                                            date=job_data.get('date'),
-                                            ago_time=job_data.get('agoTime'),
-                                            salary=job_data.get('salary') if job_data.get('salary') else None,
-                                            job_url=job_data.get('jobUrl', '')
-                                        )
-                                        jobs.append(job)
-                                    except Exception as e:
-                                        log.warning(f"⚠️ Failed to parse job data: {e}")
-                                        continue
-                            
-                            return jobs
-                        
-                    except json.JSONDecodeError as e:
-                        log.error(f"❌ Failed to parse JSON response: {e}")
-                        log.error(f"📄 Raw JSON string: {json_str}")
-            
-            # Check for errors
-            if 'LINKEDIN_ERROR_START' in output and 'LINKEDIN_ERROR_END' in output:
-                start_marker = 'LINKEDIN_ERROR_START'
-                end_marker = 'LINKEDIN_ERROR_END'
-                
-                start_idx = output.find(start_marker) + len(start_marker)
-                end_idx = output.find(end_marker)
-                
-                if start_idx > len(start_marker) and end_idx > start_idx:
-                    error_str = output[start_idx:end_idx].strip()
-                    try:
-                        error_data = json.loads(error_str)
-                        log.error(f"❌ LinkedIn API returned error: {error_data.get('error', 'Unknown error')}")
-                    except json.JSONDecodeError:
-                        log.error(f"❌ LinkedIn API error (unparseable): {error_str}")
-            
-            log.warning("⚠️ No valid job results found in Node.js output")
-            return []
-            
-        except Exception as e:
-            log.error(f"❌ Error parsing Node.js output: {e}")
-            return []
+    def _parse_jobs(self, jobs_data: Any) -> List[LinkedInJobResult]:
+        """
+        Convert the worker's job list into LinkedInJobResult objects. Raises
+        NodeWorkerError for answers that are not job lists, so they are not cached.
+        """
+        if not isinstance(jobs_data, list):
+            raise NodeWorkerError(f"LinkedIn worker returned {type(jobs_data).__name__} instead of a job list")
+        
+        jobs = []
+        for job_data in jobs_data:
+            if not isinstance(job_data, dict):
+                continue
+            try:
+                jobs.append(LinkedInJobResult(
+                    position=job_data.get('position', 'Unknown Position'),
+                    company=job_data.get('company', 'Unknown Company'),
+                    company_logo=job_data.get('companyLogo'),
+                    location=job_data.get('location', 'Unknown Location'),
+                    date=job_data.get('date'),
+                    ago_time=job_data.get('agoTime'),
+                    salary=job_data.get('salary') if job_data.get('salary') else None,
+                    job_url=job_data.get('jobUrl', '')
+                ))
+            except Exception as e:
+                log.warning(f"⚠️ Failed to parse job data: {e}")
+        if jobs_data and not jobs:
+            raise NodeWorkerError(f"None of the {len(jobs_data)} results from the LinkedIn worker could be parsed")
+        return jobs
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return self.pool.get_stats()
+    
+    async def stop(self) -> None:
+        await self.pool.stop()
 
 # Global instance
 _linkedin_service = None
@@ -250,4 +186,9 @@ def get_linkedin_jobs_service() -> LinkedInJobsService:
     global _linkedin_service
     if _linkedin_service is None:
         _linkedin_service = LinkedInJobsService()
-    return _linkedin_service 
\ No newline at end of file
+    return _linkedin_service
+
+async def shutdown_linkedin_jobs_service() -> None:
+    """Stop the search workers, if any were started"""
+    if _linkedin_service is not None:
+        await _linkedin_service.stop()
@@ -0,0 +1,63 @@
+/**
+ * LinkedIn search worker - long-lived process managed by app/linkedin_jobs_service.py
+ * Speaks the JSON-lines protocol of app/node_worker_pool.py:
+ *   stdin:  {"id": "7", "method": "search" | "ping", "params": {...}}
+ *   stdout: {"id": "7", "ok": true, "result": [...]} or {"id": "7", "ok": false, "error": "..."}
+ * The first line written is {"ready": true}. Requests are handled concurrently;
+ * stdout carries protocol lines only, everything else goes to stderr.
+ */
+'use strict';
+
+const readline = require('readline');
+
+// Keep library logging off the protocol channel
+console.log = console.error;
+console.info = console.error;
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+let linkedIn;
+try {
+    linkedIn = require('linkedin-jobs-api');
+} catch (error) {
+    send({ ready: false, error: `Cannot load linkedin-jobs-api: ${error.message}` });
+    process.exit(1);
+}
+
+const handlers = {
+    ping: async () => ({ pid: process.pid, uptime: process.uptime() }),
+    search: async (params) => linkedIn.query(params || {}),
+};
+
+async function handle(line) {
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        console.error('Ignoring malformed request:', error.message);
+        return;
+    }
+    const handler = handlers[request.method];
+    if (!handler) {
+        send({ id: request.id, ok: false, error: `Unknown method: ${request.method}` });
+        return;
+    }
+    try {
+        send({ id: request.id, ok: true, result: await handler(request.params) });
+    } catch (error) {
+        send({ id: request.id, ok: false, error: (error && error.message) || String(error) });
+    }
+}
+
+const input = readline.createInterface({ input: process.stdin, terminal: false });
+input.on('line', (line) => {
+    if (line.trim()) {
+        handle(line);
+    }
+});
+// The pool closes stdin to stop the worker
+input.on('close', () => process.exit(0));
+
+send({ ready: true });
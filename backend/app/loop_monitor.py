@@ -0,0 +1,142 @@
+"""
+Loop Monitor - event loop block detection and a bounded pool for blocking calls
+A watchdog thread notices when the event loop has not run its heartbeat for longer
+than LOOP_BLOCK_THRESHOLD_MS and logs the stack of whatever is holding the loop.
+Blocking client calls (Google STT/TTS, sync Playwright, FAISS, requests) go through
+run_blocking, which runs them on a bounded thread pool instead of the loop thread.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+LOOP_BLOCK_DETECTOR_ENABLED = os.getenv("LOOP_BLOCK_DETECTOR", "true").lower() == "true"
+LOOP_BLOCK_THRESHOLD_MS = int(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250"))
+BLOCKING_POOL_MAX_WORKERS = int(os.getenv("BLOCKING_POOL_MAX_WORKERS", "8"))
+
+T = TypeVar("T")
+
+# ============================================================================
+# BLOCKING CALL OFFLOAD
+# ============================================================================
+
+_blocking_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_blocking_pool() -> ThreadPoolExecutor:
+    global _blocking_pool
+    if _blocking_pool is None:
+        _blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_POOL_MAX_WORKERS, thread_name_prefix="blocking-call")
+    return _blocking_pool
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking function on the bounded thread pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_pool(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_pool() -> None:
+    global _blocking_pool
+    if _blocking_pool is not None:
+        _blocking_pool.shutdown(wait=False, cancel_futures=True)
+        _blocking_pool = None
+
+
+# ============================================================================
+# LOOP BLOCK DETECTOR
+# ============================================================================
+
+class LoopBlockDetector:
+    """
+    Heartbeat task on the loop plus a watchdog thread.
+
+    The heartbeat records when the loop last got to run it. If that is older than
+    the threshold, the watchdog logs the loop thread's current stack once per
+    block, and the block duration when the loop recovers.
+    """
+
+    def __init__(self, threshold_ms: int = LOOP_BLOCK_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 4
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.stats = {"blocks": 0, "max_block_ms": 0.0, "last_block_ms": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-block-detector", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop block detector started (threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _beat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self) -> None:
+        blocked_since: Optional[float] = None
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            # A beat is due every interval; anything beyond that is time the loop was held
+            lag = time.monotonic() - last_beat - self.interval
+            if lag > self.threshold:
+                if blocked_since != last_beat:
+                    blocked_since = last_beat
+                    self._report_block(lag)
+            elif blocked_since is not None:
+                self._record_recovery(self._last_beat - blocked_since - self.interval)
+                blocked_since = None
+
+    def _report_block(self, lag: float) -> None:
+        self.stats["blocks"] += 1
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "(stack unavailable)"
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms so far; loop thread stack:\n{stack}")
+
+    def _record_recovery(self, duration: float) -> None:
+        duration_ms = max(duration, 0) * 1000
+        self.stats["last_block_ms"] = round(duration_ms, 1)
+        self.stats["max_block_ms"] = round(max(self.stats["max_block_ms"], duration_ms), 1)
+        logger.warning(f"Event loop was blocked for about {duration_ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "running": self.running, "threshold_ms": self.threshold * 1000}
+
+
+# Global detector instance, started from the app lifespan
+loop_block_detector = LoopBlockDetector()
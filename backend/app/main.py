@@ -5,6 +5,7 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,13 @@ from app.agent import router as agent_router
 from app.cv_generator import router as cv_generator_router
 from app.challenge_generator import router as challenge_generator_router
 from app.flashcard_generator import router as flashcard_generator_router
-from app.orchestrator import router as orchestrator_router
+from app.orchestrator import router as orchestrator_router, init_langgraph_runtime, shutdown_langgraph_runtime, graceful_shutdown
+from app.auth_cache import last_used_recorder
+from app.loop_monitor import LOOP_BLOCK_DETECTOR_ENABLED, loop_block_detector, shutdown_blocking_pool
+from app.document_pipeline import document_pipeline
+from app.text_extraction import text_extractor
+from app.autofill_answer_cache import autofill_answer_cache
+from app.linkedin_jobs_service import shutdown_linkedin_jobs_service
 from app.billing import router as billing_router
 from app.cover_letter_generator import router as cover_letter_router
 from app.resume import router as resume_router
@@ -39,7 +46,31 @@ from app.extension_tokens import router as extension_tokens_router
 from app.tailored_resumes import router as tailored_resumes_router
 from app.cv_suggestions import router as cv_suggestions_router
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Log stack traces of anything holding the event loop longer than LOOP_BLOCK_THRESHOLD_MS
+    if LOOP_BLOCK_DETECTOR_ENABLED:
+        loop_block_detector.start()
+    # Compile the orchestrator graph and open the checkpointer pool once per process
+    await init_langgraph_runtime()
+    # Workers for background document extraction and embedding
+    text_extractor.start()
+    document_pipeline.start()
+    yield
+    await document_pipeline.stop()
+    await graceful_shutdown()
+    await shutdown_langgraph_runtime()
+    # Write pending extension token last_used timestamps
+    await last_used_recorder.shutdown()
+    # Finish background writes of new autofill answers
+    await autofill_answer_cache.wait_pending()
+    # Stop the LinkedIn search workers
+    await shutdown_linkedin_jobs_service()
+    await loop_block_detector.stop()
+    shutdown_blocking_pool()
+    text_extractor.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app_url = os.getenv("APP_URL", "https://jobhackerbot.com")
 # Configure CORS
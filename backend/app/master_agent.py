@@ -22,44 +22,9 @@ log = logging.getLogger(__name__)
 # 1. ENHANCED SYSTEM PROMPT CREATION (ADAPTED FOR LANGGRAPH)
 # ============================================================================
 
-def create_enhanced_system_prompt(user_name: str, user_context: Dict[str, Any]) -> str:
-    """
-    Create an enhanced system prompt with user context for LangGraph conversation node
-    Adapted from the original but optimized for node-based architecture
-    """
-    
-    context_parts = [
-        f"## 👤 USER: {user_name}",
-        "",
-        "### 📊 Profile Information:"
-    ]
-    
-    # Add user context information
-    if user_context.get("location"):
-        context_parts.append(f"📍 Location: {user_context['location']}")
-    
-    if user_context.get("current_role"):
-        context_parts.append(f"💼 Current Role: {user_context['current_role']}")
-    
-    if user_context.get("skills"):
-        skills_preview = ", ".join(user_context["skills"][:5])
-        context_parts.append(f"🛠️ Key Skills: {skills_preview}")
-    
-    if user_context.get("experience_count"):
-        context_parts.append(f"📋 Work Experience: {user_context['experience_count']} positions")
-    
-    if user_context.get("documents_count"):
-        context_parts.append(f"📄 Documents: {user_context['documents_count']} files uploaded")
-    
-    # Add current time context
-    if user_context.get("current_time"):
-        context_parts.append(f"🕐 Current Time: {user_context['current_time']}")
-    
-    context_text = "\n".join(context_parts)
-    
-    return f"""{context_text}
-
-## 🎯 YOUR CORE PURPOSE - LANGGRAPH CONVERSATION NODE
+# Static rules shared by every user and turn. They go first in the system prompt,
+# right after the tool definitions, so Anthropic can cache the whole prefix.
+STATIC_SYSTEM_PROMPT = """## 🎯 YOUR CORE PURPOSE - LANGGRAPH CONVERSATION NODE
 You are Job Hacker Bot, operating as the conversation node in a LangGraph workflow.
 Your role is to understand user requests and generate appropriate tool calls or responses.
 
@@ -242,6 +207,59 @@ Remember: You are the **conversation node** in a larger workflow:
 
 Work confidently knowing the other nodes handle the technical execution!"""
 
+def build_user_context_prompt(user_name: str, user_context: Dict[str, Any]) -> str:
+    """
+    Per-user part of the system prompt (profile summary and current time)
+    Kept small and placed after the static rules so it never breaks the cached prefix
+    """
+    
+    context_parts = [
+        f"## 👤 USER: {user_name}",
+        "",
+        "### 📊 Profile Information:"
+    ]
+    
+    # Add user context information
+    if user_context.get("location"):
+        context_parts.append(f"📍 Location: {user_context['location']}")
+    
+    if user_context.get("current_role"):
+        context_parts.append(f"💼 Current Role: {user_context['current_role']}")
+    
+    if user_context.get("skills"):
+        skills_preview = ", ".join(user_context["skills"][:5])
+        context_parts.append(f"🛠️ Key Skills: {skills_preview}")
+    
+    if user_context.get("experience_count"):
+        context_parts.append(f"📋 Work Experience: {user_context['experience_count']} positions")
+    
+    if user_context.get("documents_count"):
+        context_parts.append(f"📄 Documents: {user_context['documents_count']} files uploaded")
+    
+    # Add current time context
+    if user_context.get("current_time"):
+        context_parts.append(f"🕐 Current Time: {user_context['current_time']}")
+    
+    return "\n".join(context_parts)
+
+def create_enhanced_system_prompt(user_name: str, user_context: Dict[str, Any]) -> str:
+    """
+    Create an enhanced system prompt with user context for LangGraph conversation node
+    Adapted from the original but optimized for node-based architecture
+    """
+    return f"{build_user_context_prompt(user_name, user_context)}\n\n{STATIC_SYSTEM_PROMPT}"
+
+def create_cached_system_prompt(user_name: str, user_context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    System prompt as Anthropic content blocks with a cache breakpoint after the static rules.
+    Anthropic orders tools before the system prompt, so the breakpoint caches the
+    tool schemas and the rules; only the short user context block is sent uncached.
+    """
+    return [
+        {"type": "text", "text": STATIC_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": build_user_context_prompt(user_name, user_context)},
+    ]
+
 # ============================================================================
 # 2. LLM CONFIGURATION FOR LANGGRAPH (SIMPLIFIED)
 # ============================================================================
@@ -673,6 +691,8 @@ __all__ = [
     
     # System prompt and LLM setup
     'create_enhanced_system_prompt',
+    'create_cached_system_prompt',
+    'build_user_context_prompt',
     'create_llm_with_tools',
     'build_conversation_prompt_template',
     
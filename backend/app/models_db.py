@@ -12,6 +12,7 @@ from sqlalchemy import (
     Table,
     JSON,
     Index,
+    Float,
 )
 from sqlalchemy.orm import relationship, declarative_base, Mapped, mapped_column
 from sqlalchemy.ext.asyncio import AsyncAttrs
@@ -62,7 +63,7 @@ class User(Base):
     active = Column(Boolean, default=True)
     hashed_password = Column(String, nullable=True)
     preferences = Column(Text)
-    faiss_index_path = Column(String, nullable=True)
+    faiss_index_path = Column(String, nullable=True)  # Retired, no longer read or written
     subscribed_to_marketing = Column(Boolean, default=True, nullable=False)
     onboarding_completed = Column(Boolean, default=False, nullable=False)
     onboarding_completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -89,6 +90,10 @@ class Document(Base):
     type = Column(String)
     name = Column(String)
     content = Column(Text, nullable=True)
+    # Why background processing failed; such documents are not queued again
+    processing_error = Column(Text, nullable=True)
+    # Retired: chunks live in the user's pgvector collection. Only set on documents whose
+    # FAISS index has not been removed by scripts/migrate_faiss_to_pgvector.py yet.
     vector_store_path = Column(String, nullable=True)
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     date_updated = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
@@ -138,6 +143,17 @@ class ChatMessage(Base):
         Index('ix_chat_messages_user_created', 'user_id', 'created_at'),
     )
 
+class ConversationSummary(Base):
+    """Rolling summary of the messages of a page that no longer fit the history window"""
+    __tablename__ = "conversation_summaries"
+    page_id = Column(String, ForeignKey("pages.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    summary = Column(Text, nullable=False, default="")
+    summarized_until = Column(DateTime(timezone=True), nullable=True)  # created_at of the last summarized message
+    summarized_until_id = Column(String, nullable=True)  # id of the last summarized message, orders ties on created_at
+    summarized_message_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
 class Subscription(Base):
     __tablename__ = "subscriptions"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -248,6 +264,59 @@ class MarketingEmailTemplate(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now()) 
 
+class GraphRagChunk(Base):
+    """Embedded chunk of a user's Graph RAG index, with its graph metadata"""
+    __tablename__ = "graph_rag_chunks"
+    id = Column(String, primary_key=True)  # "<user_id>:<source_id>:<content_hash[:16]>:<chunk_index>"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    source_id = Column(String, nullable=False)  # document id, "user_profile" or a knowledge document id
+    content_hash = Column(String, nullable=False)  # hash of the source the chunk was built from
+    chunk_index = Column(Integer, nullable=False, default=0)
+    content = Column(Text, nullable=False)
+    cmetadata = Column(JSON, nullable=True)
+    embedding = Column(Vector(768))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_graph_rag_chunks_user_source', 'user_id', 'source_id'),
+    )
+
+class GraphRagMetadata(Base):
+    """LLM-extracted document metadata, cached by document content hash"""
+    __tablename__ = "graph_rag_metadata"
+    content_hash = Column(String, primary_key=True)
+    cmetadata = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class JobAnalysis(Base):
+    """LLM analysis of a job posting, shared by every user and feature that sees the posting"""
+    __tablename__ = "job_analyses"
+    content_hash = Column(String, primary_key=True)  # sha256 of the normalized job description
+    source_url = Column(String, nullable=True, index=True)  # normalized posting URL, when known
+    analysis = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class AutofillAnswer(Base):
+    """LLM-generated answer to an application form question, reused for the same user"""
+    __tablename__ = "autofill_answers"
+    id = Column(String, primary_key=True)  # sha256 of user, category, normalized question and job fingerprint
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    field_category = Column(String, nullable=False)
+    question = Column(Text, nullable=False)  # normalized label
+    job_fingerprint = Column(String, nullable=False, default="")  # "" for questions shared across postings
+    resume_version = Column(String, nullable=False)  # hash of the resume the answer was generated from
+    answer = Column(Text, nullable=False)
+    confidence = Column(Float, nullable=False)
+    embedding = Column(Vector(768), nullable=True)  # embedding of the normalized question
+    hit_count = Column(Integer, default=0)
+    last_used = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_autofill_answers_user_job', 'user_id', 'job_fingerprint'),
+    )
+
 class LangchainPgCollection(Base):
     __tablename__ = "langchain_pg_collection"
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -0,0 +1,297 @@
+"""
+Node Worker Pool - long-lived worker processes speaking JSON lines over stdin/stdout
+Instead of spawning a process per call, a bounded number of workers is started on
+demand and kept running. Each request carries an id and gets a per-request timeout;
+workers that crash are replaced, and a periodic ping replaces workers that stop
+responding.
+
+Protocol (one JSON object per line):
+    worker -> {"ready": true}                           once, after startup
+    pool   -> {"id": "7", "method": "search", "params": {...}}
+    worker -> {"id": "7", "ok": true, "result": ...}    or {"id": "7", "ok": false, "error": "..."}
+Every worker must answer {"method": "ping"}. Anything a worker prints that is not a
+protocol line is logged at debug level; stderr is for diagnostics.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+NODE_WORKER_START_TIMEOUT_SECONDS = int(os.getenv("NODE_WORKER_START_TIMEOUT_SECONDS", "15"))
+NODE_WORKER_HEALTH_INTERVAL_SECONDS = int(os.getenv("NODE_WORKER_HEALTH_INTERVAL_SECONDS", "30"))
+# Result lines can be large (a page of job postings)
+NODE_WORKER_MAX_LINE_BYTES = int(os.getenv("NODE_WORKER_MAX_LINE_BYTES", str(8 * 1024 * 1024)))
+
+
+class NodeWorkerError(Exception):
+    """The worker answered the request with an error"""
+
+
+class NodeWorkerTimeout(NodeWorkerError):
+    """No answer within the request timeout"""
+
+
+class NodeWorkerUnavailable(NodeWorkerError):
+    """The worker could not be started, or exited before answering"""
+
+
+class NodeWorker:
+    """One worker process and the requests waiting for its answers"""
+
+    def __init__(self, command: Sequence[str], cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None):
+        self.command = list(command)
+        self.cwd = cwd
+        self.env = env
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._ready: Optional[asyncio.Future] = None
+        self._readers: List[asyncio.Task] = []
+        self._closed = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self.process is not None and self.process.returncode is None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def start(self, timeout: float = NODE_WORKER_START_TIMEOUT_SECONDS) -> None:
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.cwd,
+                env=self.env,
+                limit=NODE_WORKER_MAX_LINE_BYTES,
+            )
+        except OSError as e:
+            self._closed = True
+            raise NodeWorkerUnavailable(f"Cannot start worker {self.command[0]}: {e}") from e
+
+        self._ready = asyncio.get_running_loop().create_future()
+        self._readers = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._read_stderr()),
+        ]
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except asyncio.TimeoutError:
+            await self.stop()
+            raise NodeWorkerUnavailable(f"Worker did not become ready within {timeout}s")
+        except BaseException:
+            await self.stop()
+            raise
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        if not self.alive:
+            raise NodeWorkerUnavailable("Worker is not running")
+        request_id = str(next(self._ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            line = json.dumps({"id": request_id, "method": method, "params": params or {}}) + "\n"
+            self.process.stdin.write(line.encode("utf-8"))
+            await self.process.stdin.drain()
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            # A late answer is dropped by the reader
+            raise NodeWorkerTimeout(f"No answer to {method} within {timeout}s")
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise NodeWorkerUnavailable(f"Worker exited: {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_stdout(self) -> None:
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                self._dispatch(line)
+        except Exception as e:
+            logger.error(f"Worker {self.pid} stdout reader failed: {e}")
+        finally:
+            self._closed = True
+            self._fail_all(NodeWorkerUnavailable(f"Worker {self.pid} exited"))
+
+    def _dispatch(self, line: bytes) -> None:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            logger.debug(f"Worker {self.pid}: {line[:500]!r}")
+            return
+
+        if "ready" in message and "id" not in message:
+            if self._ready is not None and not self._ready.done():
+                if message["ready"]:
+                    self._ready.set_result(True)
+                else:
+                    self._ready.set_exception(NodeWorkerUnavailable(message.get("error") or "Worker failed to start"))
+            return
+
+        future = self._pending.get(str(message.get("id")))
+        if future is None or future.done():
+            return
+        if message.get("ok"):
+            future.set_result(message.get("result"))
+        else:
+            future.set_exception(NodeWorkerError(message.get("error") or "Unknown worker error"))
+
+    async def _read_stderr(self) -> None:
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            logger.debug(f"Worker {self.pid} stderr: {line.decode('utf-8', errors='replace').rstrip()}")
+
+    def _fail_all(self, error: Exception) -> None:
+        if self._ready is not None and not self._ready.done():
+            self._ready.set_exception(error)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self._closed = True
+        if self.process is not None and self.process.returncode is None:
+            try:
+                # Closing stdin asks the worker to exit on its own
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except (asyncio.TimeoutError, OSError):
+                try:
+                    self.process.kill()
+                except ProcessLookupError:
+                    pass
+                await self.process.wait()
+        for reader in self._readers:
+            reader.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        self._readers = []
+        self._fail_all(NodeWorkerUnavailable("Worker stopped"))
+        if self._ready is not None and self._ready.done() and not self._ready.cancelled():
+            # Mark a startup failure as retrieved
+            self._ready.exception()
+
+
+class NodeWorkerPool:
+    """
+    Up to `size` workers, started when requests need them. A request goes to the
+    least busy worker; at most size * max_in_flight requests run at once and the
+    rest wait. A request whose worker died is retried once on a fresh worker.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        size: int = 2,
+        max_in_flight: int = 4,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        health_interval: float = NODE_WORKER_HEALTH_INTERVAL_SECONDS,
+    ):
+        self.command = list(command)
+        self.size = size
+        self.max_in_flight = max_in_flight
+        self.cwd = cwd
+        self.env = env
+        self.health_interval = health_interval
+        self._workers: List[NodeWorker] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "errors": 0, "timeouts": 0, "worker_starts": 0, "restarts": 0, "retries": 0}
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size * self.max_in_flight)
+            self._start_lock = asyncio.Lock()
+        self.stats["requests"] += 1
+        async with self._slots:
+            for attempt in range(2):
+                worker = await self._get_worker()
+                try:
+                    return await worker.request(method, params, timeout)
+                except NodeWorkerUnavailable:
+                    if attempt:
+                        self.stats["errors"] += 1
+                        raise
+                    self.stats["retries"] += 1
+                except NodeWorkerTimeout:
+                    self.stats["timeouts"] += 1
+                    raise
+                except NodeWorkerError:
+                    self.stats["errors"] += 1
+                    raise
+
+    async def _get_worker(self) -> NodeWorker:
+        async with self._start_lock:
+            for worker in [worker for worker in self._workers if not worker.alive]:
+                self._workers.remove(worker)
+                self.stats["restarts"] += 1
+                logger.warning(f"Worker {worker.pid} exited, starting a replacement when needed")
+                await worker.stop()
+
+            idle = min(self._workers, key=lambda worker: worker.in_flight, default=None)
+            if idle is not None and (idle.in_flight == 0 or len(self._workers) >= self.size):
+                return idle
+
+            worker = NodeWorker(self.command, cwd=self.cwd, env=self.env)
+            await worker.start()
+            self.stats["worker_starts"] += 1
+            self._workers.append(worker)
+            logger.info(f"Started worker {worker.pid} ({len(self._workers)}/{self.size})")
+            if self._health_task is None and self.health_interval > 0:
+                self._health_task = asyncio.create_task(self._health_loop())
+            return worker
+
+    async def health_check(self, timeout: float = 5.0) -> Dict[int, bool]:
+        """Pings every worker; workers that do not answer are stopped and replaced on demand"""
+        results = {}
+        for worker in list(self._workers):
+            try:
+                await worker.request("ping", timeout=timeout)
+                results[worker.pid] = True
+            except NodeWorkerError as e:
+                logger.warning(f"Worker {worker.pid} failed its health check: {e}")
+                results[worker.pid] = False
+                await worker.stop()
+        return results
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.error(f"Worker health check failed: {e}")
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*(worker.stop() for worker in workers), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": len([worker for worker in self._workers if worker.alive]),
+            "in_flight": sum(worker.in_flight for worker in self._workers),
+        }
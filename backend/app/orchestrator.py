@@ -9,6 +9,7 @@ import logging
 import asyncio
 import json
 import uuid
+from dataclasses import replace
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pathlib import Path
@@ -27,7 +28,7 @@ from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 from langchain_anthropic import ChatAnthropic
 from app.utils.retry_helper import retry_with_backoff
 from typing_extensions import TypedDict, Annotated
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, ToolMessage, SystemMessage
 
 # Existing imports
 from app.db import get_db, async_session_maker
@@ -37,6 +38,18 @@ from app.orchestrator_tools import create_all_tools
 from langchain_core.runnables import RunnablePassthrough
 from typing import Any
 from app.state_aware_tools import StateAwareToolNode, state_manager
+from app.tool_catalog import tool_catalog
+from app.session_context import SessionContext, session_context_registry
+from app.conversation_memory import load_packed_history
+from app.auth_cache import get_auth_cache_stats
+from app.loop_monitor import loop_block_detector
+from app.embedding_service import embedding_service
+from app.document_pipeline import document_pipeline
+from app.text_extraction import text_extractor
+from app.job_analysis import job_analysis_service
+from app.job_search_cache import job_search_cache
+from app.autofill_answer_cache import autofill_answer_cache
+from app.linkedin_jobs_service import get_linkedin_jobs_service
 
 
 # Configure logging
@@ -53,6 +66,22 @@ router = APIRouter()
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Shared checkpointer pool - one per process, reused by every WebSocket session
+CHECKPOINTER_POOL_MIN_SIZE = int(os.getenv("LANGGRAPH_CHECKPOINTER_POOL_MIN_SIZE", "1"))
+CHECKPOINTER_POOL_MAX_SIZE = int(os.getenv("LANGGRAPH_CHECKPOINTER_POOL_MAX_SIZE", "10"))
+
+# Conversation model used by conversation_node
+CONVERSATION_MODEL = "claude-3-7-sonnet-20250219"
+
+# Forward the conversation model's text deltas as message_chunk frames.
+# Clients can also opt in per message with {"stream": true}.
+STREAM_TOKENS_BY_DEFAULT = os.getenv("ORCHESTRATOR_STREAM_TOKENS", "false").lower() == "true"
+
+# Process-wide LangGraph runtime, created by init_langgraph_runtime()
+_langgraph_app = None
+_checkpointer_pool = None
+_langgraph_runtime_lock = asyncio.Lock()
+
 # ============================================================================
 # 2. ENHANCED STATE SCHEMA (NEW)
 # ============================================================================
@@ -143,52 +172,92 @@ def get_node_progress_message(node_name: str, node_output: Dict[str, Any]) -> st
     # Default message if node not recognized
     return f"Processing {node_name.replace('_', ' ')}"
 
+def get_chunk_text(message_chunk) -> str:
+    """Text delta of a streamed model chunk (tool call deltas are ignored)"""
+    content = getattr(message_chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # Anthropic streams content blocks: [{"type": "text", "text": "...", "index": 0}, ...]
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+async def stream_langgraph_updates(
+    langgraph_app,
+    langgraph_input: Dict[str, Any],
+    session_config: Dict,
+    websocket: WebSocket,
+    page_id: Optional[str] = None,
+    stream_tokens: bool = False
+):
+    """
+    Iterate over (node_name, node_output) updates of a graph run.
+    With stream_tokens, text deltas of the conversation node are sent to the
+    client as message_chunk frames while the model is still generating.
+    """
+    if not stream_tokens:
+        async for chunk in langgraph_app.astream(langgraph_input, config=session_config):
+            for node_name, node_output in chunk.items():
+                yield node_name, node_output
+        return
+
+    chunk_index = 0
+    async for mode, payload in langgraph_app.astream(
+        langgraph_input, config=session_config, stream_mode=["updates", "messages"]
+    ):
+        if mode == "messages":
+            message_chunk, metadata = payload
+            if metadata.get("langgraph_node") != "conversation":
+                continue
+            text = get_chunk_text(message_chunk)
+            if text:
+                await websocket.send_json({
+                    "type": "message_chunk",
+                    "content": text,
+                    "index": chunk_index,
+                    "page_id": page_id
+                })
+                chunk_index += 1
+        elif mode == "updates":
+            for node_name, node_output in payload.items():
+                yield node_name, node_output
+
 # ============================================================================
 # 4. LANGGRAPH NODES (NEW)
 # ============================================================================
 
+def create_conversation_llm() -> ChatAnthropic:
+    """LLM setup (existing logic from master_agent)"""
+    return ChatAnthropic(
+        model=CONVERSATION_MODEL, 
+        temperature=0.7,
+        max_tokens=4096,
+        timeout=60
+    )
+
 async def conversation_node(state: WebSocketState) -> WebSocketState:
     """
     Handles LLM conversation logic - replaces master_agent functionality
     Uses your existing master_agent logic but in node format
     """
-    from app.master_agent import build_user_context_for_agent, create_enhanced_system_prompt
-    from app.orchestrator_tools import create_all_tools
-    
     try:
         log.info(f"Processing conversation for user {state['user_id']}")
         
-        # Get user and context (using existing logic)
-        user = await get_user_by_id(state["user_id"])
+        # User, resume, document count and system prompt are cached per session
         db_session = await get_shared_session_from_state(state)
+        session_context = await get_session_context(state, db_session)
+        user = session_context.user
         
-        # Build user context (existing function from master_agent)
-        user_context = build_user_context_for_agent(
-            user=user,
-            resume_data=await get_resume_data_for_user(user.id, db_session),
-            documents_count=await get_documents_count_for_user(user.id, db_session)
-        )
-        
-        # Create tools (your existing function)
-        tools = await create_all_tools(user, db_session)
-        
-        # LLM setup (existing logic from master_agent)
-        llm = ChatAnthropic(
-            model="claude-3-7-sonnet-20250219", 
-            temperature=0.7,
-            max_tokens=4096,
-            timeout=60
-        )
-        
-        # Bind tools to model
-        model_with_tools = llm.bind_tools(tools)
+        # Tools are cached per session and rebuilt only when the user's data changes
+        tools = await tool_catalog.get_tools(user, db_session)
         
-        # Generate response using your existing system prompt logic
-        system_prompt = create_enhanced_system_prompt(user.name, user_context)
+        # Tool schemas are serialized once per process and shared by all sessions
+        model_with_tools = tool_catalog.get_bound_model(CONVERSATION_MODEL, create_conversation_llm, tools)
         
-        # Create messages with system context
+        # Create messages with system context (static prefix is marked for prompt caching)
         conversation_messages = [
-            {"role": "system", "content": system_prompt}
+            SystemMessage(content=session_context.system_prompt)
         ] + [msg for msg in state["messages"]]
         
         # Generate response with retry logic for overload errors
@@ -213,6 +282,8 @@ async def conversation_node(state: WebSocketState) -> WebSocketState:
                 "confidence_score": 0.0
             }
         
+        prompt_cache_metrics.record_usage(response)
+        
         # Calculate confidence score
         confidence = calculate_confidence_score(response)
         
@@ -251,11 +322,11 @@ async def tool_execution_node(state: WebSocketState) -> WebSocketState:
         state_manager.set_state(state)
         
         # Get user and shared session
-        user = await get_user_by_id(state["user_id"])
         db_session = await get_shared_session_from_state(state)
+        user = (await get_session_context(state, db_session)).user
         
-        # Create tools (they can now access state via state_manager)
-        tools = await create_all_tools(user, db_session)
+        # Reuse the session's tools (they can now access state via state_manager)
+        tools = await tool_catalog.get_tools(user, db_session)
         
         # Create StateAwareToolNode with state provider
         tool_node = StateAwareToolNode(
@@ -458,41 +529,52 @@ def route_next_action(state: WebSocketState) -> str:
 # 4. LANGGRAPH SETUP (NEW)
 # ============================================================================
 
-async def create_websocket_langgraph_app(user: User, db: AsyncSession):
+def build_websocket_langgraph_workflow() -> StateGraph:
     """
-    Creates LangGraph StateGraph replacing AgentExecutor
+    Defines the StateGraph replacing AgentExecutor
     Implements the three-node architecture you requested
     """
-    try:
-        log.info(f"Creating LangGraph app for user {user.id}")
-        
-        # Create StateGraph with enhanced state
-        workflow = StateGraph(WebSocketState)
-        
-        # Add your three core nodes + response formatting
-        workflow.add_node("conversation", conversation_node)
-        workflow.add_node("tool_execution", tool_execution_node)
-        workflow.add_node("data_persistence", data_persistence_node) 
-        workflow.add_node("response_formatting", response_formatting_node)
-        
-        # Define the flow according to your requirements
-        workflow.add_edge(START, "conversation")
-        
-        # Add conditional routing based on conversation output
-        workflow.add_conditional_edges(
-            "conversation",
-            route_next_action,
-            {
-                "tool_execution": "tool_execution",
-                "data_persistence": "data_persistence",
-                "response_formatting": "response_formatting"
-            }
-        )
-        
-        # Tools -> Data Persistence -> Response
-        workflow.add_edge("tool_execution", "data_persistence")
-        workflow.add_edge("data_persistence", "response_formatting")
-        workflow.add_edge("response_formatting", END)
+    # Create StateGraph with enhanced state
+    workflow = StateGraph(WebSocketState)
+    
+    # Add your three core nodes + response formatting
+    workflow.add_node("conversation", conversation_node)
+    workflow.add_node("tool_execution", tool_execution_node)
+    workflow.add_node("data_persistence", data_persistence_node) 
+    workflow.add_node("response_formatting", response_formatting_node)
+    
+    # Define the flow according to your requirements
+    workflow.add_edge(START, "conversation")
+    
+    # Add conditional routing based on conversation output
+    workflow.add_conditional_edges(
+        "conversation",
+        route_next_action,
+        {
+            "tool_execution": "tool_execution",
+            "data_persistence": "data_persistence",
+            "response_formatting": "response_formatting"
+        }
+    )
+    
+    # Tools -> Data Persistence -> Response
+    workflow.add_edge("tool_execution", "data_persistence")
+    workflow.add_edge("data_persistence", "response_formatting")
+    workflow.add_edge("response_formatting", END)
+    
+    return workflow
+
+async def init_langgraph_runtime():
+    """
+    Creates the process-wide checkpointer pool and compiled graph.
+    Called once from the FastAPI lifespan; every WebSocket connection reuses the result.
+    The graph is user-agnostic - per-user context travels in the input state and config.
+    """
+    global _langgraph_app, _checkpointer_pool
+    
+    async with _langgraph_runtime_lock:
+        if _langgraph_app is not None:
+            return _langgraph_app
         
         # Set up checkpointer for session persistence
         checkpointer = None
@@ -507,28 +589,65 @@ async def create_websocket_langgraph_app(user: User, db: AsyncSession):
                 
                 pool = AsyncConnectionPool(
                     conninfo=os.getenv("DATABASE_URL"),
-                    max_size=10,
-                    kwargs=connection_kwargs
+                    min_size=CHECKPOINTER_POOL_MIN_SIZE,
+                    max_size=CHECKPOINTER_POOL_MAX_SIZE,
+                    kwargs=connection_kwargs,
+                    open=False
                 )
+                await pool.open()
                 
                 checkpointer = AsyncPostgresSaver(pool)
+                # Schema checks run once per process instead of on every connect
                 await checkpointer.setup()
-                log.info("PostgreSQL checkpointer configured")
+                _checkpointer_pool = pool
+                log.info(f"PostgreSQL checkpointer configured (pool max_size={CHECKPOINTER_POOL_MAX_SIZE})")
         except Exception as e:
             log.warning(f"Could not set up PostgreSQL checkpointer: {e}")
         
-        # Rest of your existing function stays the same
-        compiled_app = workflow.compile(
+        _langgraph_app = build_websocket_langgraph_workflow().compile(
             checkpointer=checkpointer,
             interrupt_before=[],
             interrupt_after=[]
         )
-        return compiled_app
+        log.info("LangGraph app compiled and shared across WebSocket sessions")
+        return _langgraph_app
+
+async def shutdown_langgraph_runtime():
+    """Closes the shared checkpointer pool and drops the compiled graph"""
+    global _langgraph_app, _checkpointer_pool
+    
+    async with _langgraph_runtime_lock:
+        if _checkpointer_pool is not None:
+            try:
+                await _checkpointer_pool.close()
+                log.info("PostgreSQL checkpointer pool closed")
+            except Exception as e:
+                log.error(f"Error closing checkpointer pool: {e}")
+        _checkpointer_pool = None
+        _langgraph_app = None
+
+async def create_websocket_langgraph_app(user: User, db: AsyncSession):
+    """
+    Returns the shared compiled LangGraph app
+    Initializes it lazily if the application lifespan has not done so yet
+    """
+    try:
+        if _langgraph_app is not None:
+            return _langgraph_app
+        
+        log.info(f"LangGraph app not initialized yet, creating it for user {user.id}")
+        return await init_langgraph_runtime()
         
     except Exception as e:
         log.error(f"Error creating LangGraph app: {e}", exc_info=True)
         raise
 
+def get_checkpointer_pool_stats() -> Optional[Dict[str, int]]:
+    """Connection statistics of the shared checkpointer pool, if configured"""
+    if _checkpointer_pool is None:
+        return None
+    return _checkpointer_pool.get_stats()
+
 # ============================================================================
 # 5. WEBSOCKET HANDLER (MODIFIED)
 # ============================================================================
@@ -819,53 +938,12 @@ async def orchestrator_websocket(
 # ============================================================================
 
 async def load_chat_history(user_id: str, page_id: str, db: AsyncSession, limit: int = 50) -> List:
-    """Load chat history for a specific page"""
-    from sqlalchemy import and_, select
-    from langchain_core.messages import HumanMessage, AIMessage
-    
-    result = await db.execute(
-        select(ChatMessage)
-        .where(
-            and_(
-                ChatMessage.user_id == user_id,
-                ChatMessage.page_id == page_id,
-                ChatMessage.deleted_at.is_(None)
-            )
-        )
-        .order_by(ChatMessage.created_at.asc())
-        .limit(limit)
-    )
-    
-    messages = result.scalars().all()
-    
-    # Convert to LangChain message format, filtering out empty messages
-    chat_history = []
-    for msg in messages:
-        # Skip messages with empty or null content
-        if not msg.message or msg.message.strip() == "":
-            log.warning(f"Skipping empty message {msg.id} for user {user_id}")
-            continue
-            
-        # Clean the message content
-        content = msg.message.strip()
-        
-        # Handle special message formats (e.g., file attachments)
-        if content.startswith("File Attached:"):
-            # Extract the actual message content after the file attachment notice
-            parts = content.split("\n\nMessage:", 1)
-            if len(parts) > 1 and parts[1].strip():
-                content = parts[1].strip()
-            else:
-                # If there's no message content with the file, skip this message
-                log.info(f"Skipping file attachment message without text content: {msg.id}")
-                continue
-        
-        if msg.is_user_message:
-            chat_history.append(HumanMessage(content=content))
-        else:
-            chat_history.append(AIMessage(content=content))
-    
-    return chat_history
+    """
+    Load chat history for a specific page
+    Returns the rolling summary of older messages plus the newest messages (at most
+    limit) that fit the history token budget
+    """
+    return await load_packed_history(user_id, page_id, db, max_messages=limit)
 
 async def handle_message_langgraph(
     message_data: Dict, 
@@ -975,94 +1053,97 @@ async def handle_message_langgraph(
                 "stage": "conversation_started"
             })
             
-            async for chunk in langgraph_app.astream(langgraph_input, config=session_config):
+            stream_tokens = message_data.get("stream", STREAM_TOKENS_BY_DEFAULT)
+            async for node_name, node_output in stream_langgraph_updates(
+                langgraph_app, langgraph_input, session_config, websocket,
+                page_id=page_id, stream_tokens=stream_tokens
+            ):
                 # Process each node's output
-                for node_name, node_output in chunk.items():
-                    log.info(f"Node {node_name} completed")
-                    
-                    # Send progress update AFTER node completes
-                    progress_message = get_node_progress_message(node_name, node_output)
-                    if progress_message:
-                        await websocket.send_json({
-                            "type": "progress_update",
-                            "node": node_name,
-                            "message": progress_message,
-                            "stage": node_output.get("processing_stage", node_name)
-                        })
+                log.info(f"Node {node_name} completed")
+                
+                # Send progress update AFTER node completes
+                progress_message = get_node_progress_message(node_name, node_output)
+                if progress_message:
+                    await websocket.send_json({
+                        "type": "progress_update",
+                        "node": node_name,
+                        "message": progress_message,
+                        "stage": node_output.get("processing_stage", node_name)
+                    })
+                
+                # Send initial message for next node if applicable
+                if node_name == "conversation" and node_output.get("pending_tools"):
+                    await websocket.send_json({
+                        "type": "progress_update",
+                        "node": "tool_execution",
+                        "message": "Preparing to execute selected tools...",
+                        "stage": "tool_execution_started"
+                    })
+                elif node_name == "tool_execution":
+                    await websocket.send_json({
+                        "type": "progress_update",
+                        "node": "data_persistence",
+                        "message": "Saving your data securely...",
+                        "stage": "data_persistence_started"
+                    })
+                elif node_name == "data_persistence":
+                    await websocket.send_json({
+                        "type": "progress_update",
+                        "node": "response_formatting",
+                        "message": "Formatting your response...",
+                        "stage": "response_formatting_started"
+                    })
+                
+                # Send final response when response_formatting completes
+                if node_name == "response_formatting" and node_output.get("frontend_response"):
+                    frontend_response = node_output["frontend_response"]
+                    await websocket.send_json(frontend_response)
+                    log.info(f"Response sent to user {user.id}")
                     
-                    # Send initial message for next node if applicable
-                    if node_name == "conversation" and node_output.get("pending_tools"):
-                        await websocket.send_json({
-                            "type": "progress_update",
-                            "node": "tool_execution",
-                            "message": "Preparing to execute selected tools...",
-                            "stage": "tool_execution_started"
-                        })
-                    elif node_name == "tool_execution":
+                    # Send complete message for extension pages to signal end of generation
+                    if is_extension_page:
                         await websocket.send_json({
-                            "type": "progress_update",
-                            "node": "data_persistence",
-                            "message": "Saving your data securely...",
-                            "stage": "data_persistence_started"
-                        })
-                    elif node_name == "data_persistence":
-                        await websocket.send_json({
-                            "type": "progress_update",
-                            "node": "response_formatting",
-                            "message": "Formatting your response...",
-                            "stage": "response_formatting_started"
+                            "type": "complete",
+                            "message": "Generation complete"
                         })
+                        log.info(f"Sent complete signal for extension page {page_id}")
                     
-                    # Send final response when response_formatting completes
-                    if node_name == "response_formatting" and node_output.get("frontend_response"):
-                        frontend_response = node_output["frontend_response"]
-                        await websocket.send_json(frontend_response)
-                        log.info(f"Response sent to user {user.id}")
-                        
-                        # Send complete message for extension pages to signal end of generation
-                        if is_extension_page:
-                            await websocket.send_json({
-                                "type": "complete",
-                                "message": "Generation complete"
-                            })
-                            log.info(f"Sent complete signal for extension page {page_id}")
-                        
-                        # Save the final assistant response to the database (skip for extension pages)
-                        if frontend_response.get("type") == "message" and frontend_response.get("message") and not is_extension_page:
-                            try:
-                                # Check if this exact message already exists to avoid duplicates
-                                existing = await db.execute(
-                                    select(ChatMessage)
-                                    .where(
-                                        and_(
-                                            ChatMessage.user_id == user.id,
-                                            ChatMessage.page_id == page_id,
-                                            ChatMessage.message == frontend_response["message"],
-                                            ChatMessage.is_user_message == False,
-                                            ChatMessage.deleted_at.is_(None)
-                                        )
+                    # Save the final assistant response to the database (skip for extension pages)
+                    if frontend_response.get("type") == "message" and frontend_response.get("message") and not is_extension_page:
+                        try:
+                            # Check if this exact message already exists to avoid duplicates
+                            existing = await db.execute(
+                                select(ChatMessage)
+                                .where(
+                                    and_(
+                                        ChatMessage.user_id == user.id,
+                                        ChatMessage.page_id == page_id,
+                                        ChatMessage.message == frontend_response["message"],
+                                        ChatMessage.is_user_message == False,
+                                        ChatMessage.deleted_at.is_(None)
                                     )
-                                    .limit(1)
                                 )
-                                
-                                if not existing.scalar_one_or_none():
-                                    assistant_message = ChatMessage(
-                                        id=str(uuid.uuid4()),
-                                        user_id=user.id,
-                                        page_id=page_id,
-                                        message=frontend_response["message"],
-                                        is_user_message=False
-                                    )
-                                    db.add(assistant_message)
-                                    await db.commit()
-                                    log.info(f"Saved assistant message for page {page_id}")
-                                else:
-                                    log.info(f"Assistant message already exists, skipping duplicate save")
-                            except Exception as save_error:
-                                log.error(f"Failed to save assistant message: {save_error}")
-                                if db.is_active:
-                                    await db.rollback()
-                        
+                                .limit(1)
+                            )
+                            
+                            if not existing.scalar_one_or_none():
+                                assistant_message = ChatMessage(
+                                    id=str(uuid.uuid4()),
+                                    user_id=user.id,
+                                    page_id=page_id,
+                                    message=frontend_response["message"],
+                                    is_user_message=False
+                                )
+                                db.add(assistant_message)
+                                await db.commit()
+                                log.info(f"Saved assistant message for page {page_id}")
+                            else:
+                                log.info(f"Assistant message already exists, skipping duplicate save")
+                        except Exception as save_error:
+                            log.error(f"Failed to save assistant message: {save_error}")
+                            if db.is_active:
+                                await db.rollback()
+                    
         except Exception as e:
             log.error(f"LangGraph execution error: {e}", exc_info=True)
             await websocket.send_json({
@@ -1563,6 +1644,44 @@ async def get_documents_count_for_user(user_id: str, db_session: AsyncSession) -
         log.error(f"Error getting document count for user {user_id}: {e}")
         return 0
 
+async def get_session_context(state: WebSocketState, db_session: AsyncSession) -> SessionContext:
+    """Per-session user context, loaded on the first turn and after resume/profile/document changes"""
+    from app.master_agent import build_user_context_for_agent, create_cached_system_prompt
+    
+    user_id = state["user_id"]
+    
+    async def load() -> SessionContext:
+        user = await get_user_by_id(user_id)
+        resume_data = await get_resume_data_for_user(user_id, db_session)
+        documents_count = await get_documents_count_for_user(user_id, db_session)
+        user_context = build_user_context_for_agent(
+            user=user,
+            resume_data=resume_data,
+            documents_count=documents_count
+        )
+        return SessionContext(
+            user=user,
+            resume_data=resume_data,
+            documents_count=documents_count,
+            user_context=user_context,
+            system_prompt=create_cached_system_prompt(user.name, user_context)
+        )
+    
+    def refresh_prompt(context: SessionContext) -> SessionContext:
+        # The prompt shows the current time to the minute; re-render only when it changes
+        current_time = datetime.now().strftime('%A, %B %d, %Y at %I:%M %p')
+        if context.user_context.get("current_time") == current_time:
+            return context
+        user_context = {**context.user_context, "current_time": current_time}
+        return replace(
+            context,
+            user_context=user_context,
+            system_prompt=create_cached_system_prompt(context.user.name, user_context)
+        )
+    
+    # Keyed by user id, which is also the WebSocket session's db_session_id and the user event key
+    return await session_context_registry.get_context(user_id, load, refresh_prompt)
+
 # ============================================================================
 # 8. SESSION MANAGEMENT HELPERS (NEW)
 # ============================================================================
@@ -1601,6 +1720,7 @@ async def cleanup_session(session_id: str) -> None:
             log.error(f"Error closing session {session_id}: {e}")
         finally:
             del _active_sessions[session_id]
+            session_context_registry.invalidate(session_id)
 
 # ============================================================================
 # 9. ERROR HANDLING AND RECOVERY (NEW)
@@ -1687,6 +1807,46 @@ class LangGraphMetrics:
 # Global metrics instance
 langgraph_metrics = LangGraphMetrics()
 
+class PromptCacheMetrics:
+    """Anthropic prompt cache usage of the conversation model"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+        self.uncached_input_tokens = 0
+    
+    def record_usage(self, response: AIMessage):
+        """Record the input token breakdown reported for a model response"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        details = usage.get("input_token_details") or {}
+        cache_read = details.get("cache_read") or 0
+        cache_creation = details.get("cache_creation") or 0
+        
+        self.requests += 1
+        if cache_read:
+            self.cache_hits += 1
+        self.cache_read_tokens += cache_read
+        self.cache_creation_tokens += cache_creation
+        # usage_metadata input_tokens already includes cached tokens
+        self.uncached_input_tokens += max(0, (usage.get("input_tokens") or 0) - cache_read - cache_creation)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prompt cache statistics"""
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.requests - self.cache_hits,
+            "hit_rate": self.cache_hits / self.requests if self.requests else 0.0,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens,
+            "uncached_input_tokens": self.uncached_input_tokens
+        }
+
+# Global prompt cache metrics instance
+prompt_cache_metrics = PromptCacheMetrics()
+
 # ============================================================================
 # 11. CONFIGURATION AND SETUP (PRESERVED)
 # ============================================================================
@@ -1802,6 +1962,9 @@ __all__ = [
     # LangGraph components (new)
     'WebSocketState',
     'create_websocket_langgraph_app',
+    'build_websocket_langgraph_workflow',
+    'init_langgraph_runtime',
+    'shutdown_langgraph_runtime',
     'conversation_node',
     'tool_execution_node', 
     'data_persistence_node',
@@ -2093,6 +2256,19 @@ async def langgraph_health_check():
             "dependencies": deps,
             "performance": stats,
             "active_sessions": len(_active_sessions),
+            "checkpointer_pool": get_checkpointer_pool_stats(),
+            "tool_catalog": tool_catalog.get_stats(),
+            "session_context": session_context_registry.get_stats(),
+            "prompt_cache": prompt_cache_metrics.get_stats(),
+            "auth_cache": get_auth_cache_stats(),
+            "event_loop": loop_block_detector.get_stats(),
+            "embeddings": embedding_service.get_stats(),
+            "document_pipeline": document_pipeline.get_stats(),
+            "text_extraction": text_extractor.get_stats(),
+            "job_analysis": job_analysis_service.get_stats(),
+            "autofill_answers": autofill_answer_cache.get_stats(),
+            "linkedin_workers": get_linkedin_jobs_service().get_stats(),
+            "job_search_cache": job_search_cache.get_stats(),
             "timestamp": datetime.now().isoformat()
         }
         
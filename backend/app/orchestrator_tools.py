@@ -34,6 +34,10 @@ from app.utils.retry_helper import retry_with_backoff
 from app.state_types import WebSocketState
 from app.summary_enhancer import summary_enhancer, quick_refiner
 from app.email_tools_langgraph import EmailToolsLangGraph
+from app.state_aware_tools import SERIALIZATION_KEY_METADATA
+from app.user_events import publish_user_event, RESUME_UPDATED, PROFILE_UPDATED
+from app.text_extraction import text_extractor
+from app.job_analysis import job_analysis_service
 
 log = logging.getLogger(__name__)
 
@@ -416,6 +420,7 @@ class ResumeToolsLangGraph:
                 db_resume.data = refined_data_dict
                 attributes.flag_modified(db_resume, "data")
                 await shared_session.commit()
+                publish_user_event(self.user_id, RESUME_UPDATED)
                 
                 # Update LangGraph state with tool execution info
                 if state:
@@ -854,6 +859,8 @@ Provide comprehensive suggestions across ALL sections for maximum CV improvement
             attributes.flag_modified(db_resume, "data")
             await shared_session.commit()
             
+            publish_user_event(self.user_id, RESUME_UPDATED)
+            
             # Update LangGraph state with execution info
             if state:
                 executed_tools = state.get("executed_tools", [])
@@ -902,66 +909,33 @@ Provide comprehensive suggestions across ALL sections for maximum CV improvement
             try:
                 log.info(f"CV refinement from URL with shared session: {job_url}")
                 
-                # Step 1: Scrape job details from the URL using async browser
-                scraped_content = await self._async_browser_navigate(job_url)
-                
-                if not scraped_content:
-                    return "❌ Sorry, I couldn't extract job details from that URL. The website might be blocking access."
-                
-                # Parse job details from scraped content using LLM
-                llm = ChatAnthropic(model="claude-3-7-sonnet-20250219", temperature=0.3, max_tokens=1024)
-                
-                extraction_prompt = f"""
-                Extract the following information from this job posting:
-                - Job Title
-                - Company Name  
-                - Job Description (main responsibilities)
-                - Requirements (skills, qualifications)
-                
-                Content:
-                {scraped_content[:4000]}
-                
-                Return EXACTLY in this format (use 'Not specified' if information is missing):
-                Job Title: [title]
-                Company: [company]
-                Description: [description]
-                Requirements: [requirements]
-                """
-                
-                extracted_info = await llm.ainvoke(extraction_prompt)
-                job_info = extracted_info.content
-                
-                # Parse the extracted information
-                lines = job_info.split('\n')
-                job_title = "Target Position"
-                company_name = "Target Company"
-                job_description = ""
-                requirements = ""
-                
-                for line in lines:
-                    if line.startswith("Job Title:"):
-                        extracted = line.replace("Job Title:", "").strip()
-                        if extracted and extracted != "[title]" and extracted != "Not specified":
-                            job_title = extracted
-                    elif line.startswith("Company:"):
-                        extracted = line.replace("Company:", "").strip()
-                        if extracted and extracted != "[company]" and extracted != "Not specified":
-                            company_name = extracted
-                    elif line.startswith("Description:"):
-                        extracted = line.replace("Description:", "").strip()
-                        if extracted and extracted != "[description]":
-                            job_description = extracted
-                    elif line.startswith("Requirements:"):
-                        extracted = line.replace("Requirements:", "").strip()
-                        if extracted and extracted != "[requirements]":
-                            requirements = extracted
+                # Step 1: Reuse the analysis of this posting if any feature has seen it,
+                # otherwise scrape the URL with the async browser and analyze it once
+                scraped_content = ""
+                analysis = await job_analysis_service.lookup(source_url=job_url)
+                if analysis is None:
+                    scraped_content = await self._async_browser_navigate(job_url)
+                    
+                    if not scraped_content:
+                        return "❌ Sorry, I couldn't extract job details from that URL. The website might be blocking access."
+                    
+                    analysis = await job_analysis_service.analyze(scraped_content[:4000], source_url=job_url, fallback={})
+                
+                job_title = analysis.get("job_title") or "Target Position"
+                company_name = analysis.get("company") or "Target Company"
+                description_parts = [analysis.get("summary") or ""]
+                description_parts += [f"- {item}" for item in analysis.get("key_responsibilities") or []]
+                job_description = "\n".join(part for part in description_parts if part)
+                requirements = ", ".join(
+                    (analysis.get("required_skills") or []) + (analysis.get("qualifications") or [])
+                )
                 
                 # Combine description and requirements
                 if requirements:
                     job_description = f"{job_description}\n\nKey Requirements:\n{requirements}"
                 
                 # If we still don't have much job description, use the scraped content directly
-                if len(job_description) < 100:
+                if len(job_description) < 100 and scraped_content:
                     log.warning("Limited job details extracted, using raw content")
                     job_description = f"Job posting content:\n{scraped_content[:2000]}"
                 
@@ -1138,6 +1112,7 @@ Provide comprehensive suggestions across ALL sections for maximum CV improvement
                 db_resume.data = refined_data_dict
                 attributes.flag_modified(db_resume, "data")
                 await shared_session.commit()
+                publish_user_event(self.user_id, RESUME_UPDATED)
                 
                 log.info("Resume saved to database with fixed structure")
                 
@@ -1333,6 +1308,8 @@ Provide comprehensive suggestions across ALL sections for maximum CV improvement
             attributes.flag_modified(db_resume, "data")
             await shared_session.commit()
             
+            publish_user_event(self.user_id, RESUME_UPDATED)
+            
             # Update LangGraph state
             if state:
                 executed_tools = state.get("executed_tools", [])
@@ -2129,36 +2106,12 @@ class DocumentToolsLangGraph:
                         # Read and process the file
                         log.info(f"Found file in uploads: {possible_file}")
                         
-                        # Extract content based on file type
-                        content = ""
-                        if possible_file.suffix.lower() == '.pdf':
-                            try:
-                                import PyPDF2
-                                with open(possible_file, 'rb') as file:
-                                    pdf_reader = PyPDF2.PdfReader(file)
-                                    for page in pdf_reader.pages:
-                                        page_text = page.extract_text()
-                                        if page_text:
-                                            content += page_text + "\n"
-                            except Exception as pdf_error:
-                                log.error(f"Error reading PDF: {pdf_error}")
-                                # Try alternative PDF reader
-                                try:
-                                    import pdfplumber
-                                    with pdfplumber.open(possible_file) as pdf:
-                                        for page in pdf.pages:
-                                            page_text = page.extract_text()
-                                            if page_text:
-                                                content += page_text + "\n"
-                                except:
-                                    return f"Error reading PDF file '{extracted_filename}'. Please try uploading it again."
-                        else:
-                            try:
-                                with open(possible_file, 'r', encoding='utf-8') as file:
-                                    content = file.read()
-                            except Exception as read_error:
-                                log.error(f"Error reading file: {read_error}")
-                                return f"Error reading file '{extracted_filename}'. Please try uploading it again."
+                        # Extract content in the shared extraction pool (memoized by file hash)
+                        try:
+                            content = await text_extractor.extract(possible_file)
+                        except Exception as read_error:
+                            log.error(f"Error reading file: {read_error}")
+                            return f"Error reading file '{extracted_filename}'. Please try uploading it again."
                         
                         if content:
                             # Save to database for future use
@@ -2826,6 +2779,8 @@ class ProfileToolsLangGraph:
                 attributes.flag_modified(db_resume, "data")
             
             await shared_session.commit()
+            publish_user_event(self.user_id, PROFILE_UPDATED)
+            publish_user_event(self.user_id, RESUME_UPDATED)
             
             if not updated_fields:
                 return "ℹ️ No profile updates were provided. Please specify which fields you'd like to update."
@@ -2955,6 +2910,7 @@ class ProfileToolsLangGraph:
             db_resume.data = resume_data
             attributes.flag_modified(db_resume, "data")
             await shared_session.commit()
+            publish_user_event(self.user_id, RESUME_UPDATED)
             
             # Update LangGraph state with tool execution info
             if state:
@@ -3732,6 +3688,17 @@ class WebTools(WebToolsLangGraph):
 # 13. ENHANCED TOOL FACTORY (FINAL INTEGRATION)
 # ============================================================================
 
+# Serialization key for StateAwareToolNode. Resume tools take resume_modification_lock,
+# and every tool class holding the shared AsyncSession (not safe for concurrent use)
+# reads or writes resume data through it, so they all run under this key.
+RESUME_SERIALIZATION_KEY = "resume"
+
+def with_serialization_key(tools: List, key: str) -> List:
+    """Declare a serialization key on tools so their calls never run concurrently"""
+    for tool in tools:
+        tool.metadata = {**(tool.metadata or {}), SERIALIZATION_KEY_METADATA: key}
+    return tools
+
 async def create_all_tools(user: User, db_session=None) -> List:
     """
     Factory function to create all LangGraph-enhanced tools
@@ -3755,14 +3722,15 @@ async def create_all_tools(user: User, db_session=None) -> List:
         email_tools = EmailToolsLangGraph(user, db_session)
         
         # Collect all tools with LangGraph state injection
-        tools.extend(resume_tools.get_tools())           # 3 enhanced tools
-        tools.extend(cover_letter_tools.get_tools())     # 2 enhanced tools
+        # Tools bound to the shared session are serialized; job search and web tools fan out
+        tools.extend(with_serialization_key(resume_tools.get_tools(), RESUME_SERIALIZATION_KEY))        # 3 enhanced tools
+        tools.extend(with_serialization_key(cover_letter_tools.get_tools(), RESUME_SERIALIZATION_KEY))  # 2 enhanced tools
         tools.extend(job_tools.get_tools())              # 1 enhanced tool
-        tools.extend(document_tools.get_tools())         # 3 enhanced tools
-        tools.extend(profile_tools.get_tools())          # 1 enhanced tool (more can be added)
-        tools.extend(career_tools.get_tools())           # 1 enhanced tool (more can be added)
+        tools.extend(with_serialization_key(document_tools.get_tools(), RESUME_SERIALIZATION_KEY))      # 3 enhanced tools
+        tools.extend(with_serialization_key(profile_tools.get_tools(), RESUME_SERIALIZATION_KEY))       # 1 enhanced tool (more can be added)
+        tools.extend(with_serialization_key(career_tools.get_tools(), RESUME_SERIALIZATION_KEY))        # 1 enhanced tool (more can be added)
         tools.extend(web_tools.get_tools())              # 1 enhanced tool
-        tools.extend(email_tools.get_tools())            # 2 email tools
+        tools.extend(with_serialization_key(email_tools.get_tools(), RESUME_SERIALIZATION_KEY))         # 2 email tools
         
         log.info(f"✅ Created {len(tools)} LangGraph-enhanced tools with shared session management")
         
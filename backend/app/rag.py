@@ -4,10 +4,11 @@ from sqlalchemy.future import select
 from app.db import get_db
 from app.models_db import Document, User
 from langchain.chains import RetrievalQA
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
+from langchain_google_genai import ChatGoogleGenerativeAI
 from app.dependencies import get_current_active_user
-from app.graph_rag import EnhancedGraphRAG
+from app.graph_rag import EnhancedGraphRAG, LLM_CONCURRENCY_LIMIT
+from app.vector_store import search_document_chunks
+import asyncio
 import os
 from langchain.docstore.document import Document as LCDocument
 from typing import List, Optional
@@ -55,14 +56,11 @@ async def rag_assist(
             raise HTTPException(status_code=404, detail="No resume found. Please upload your CV first or use the modern resume generation tools.")
     
     try:
-        # Load FAISS index
-        embedding = GoogleGenerativeAIEmbeddings(model="models/embedding-004")
-        vectorstore = FAISS.load_local(doc.vector_store_path, embedding, allow_dangerous_deserialization=True)
-        # Retrieve relevant chunks
-        relevant_docs = vectorstore.similarity_search(job_description, k=5)
-        context = "\n".join([d.page_content for d in relevant_docs])
+        # Retrieve relevant chunks of the resume from the user's pgvector collection
+        relevant_chunks = await search_document_chunks(doc, job_description, db, k=5)
+        context = "\n".join(relevant_chunks) if relevant_chunks else (doc.content or "No content available")
     except Exception as e:
-        logger.warning(f"FAISS loading failed: {e}")
+        logger.warning(f"Vector search failed: {e}")
         # Fallback to using the document content directly
         context = doc.content or "No content available"
     
@@ -70,21 +68,26 @@ async def rag_assist(
     
     if task == "cover_letter":
         prompt = f"You are an expert job applicant. Using the following CV info:\n{context}\nWrite a personalized cover letter for this job:\n{job_description}"
-        result = llm.invoke(prompt)
+        result = await llm.ainvoke(prompt)
         return {"cover_letter": result.content}
     elif task == "regenerate_cv":
         prompt = f"You are an expert resume writer. Using the following CV info:\n{context}\nRegenerate and tailor the CV for this job:\n{job_description}"
-        result = llm.invoke(prompt)
+        result = await llm.ainvoke(prompt)
         return {"cv": result.content}
     elif task == "apply":
         if not form_questions:
             raise HTTPException(status_code=400, detail="form_questions required for apply task")
-        answers = []
-        for q in form_questions:
+        # Questions are independent; answer them concurrently, in question order
+        semaphore = asyncio.Semaphore(LLM_CONCURRENCY_LIMIT)
+
+        async def answer_question(q: str) -> dict:
             prompt = f"Based on this CV:\n{context}\nAnswer this job application question:\n{q}\nJob description:\n{job_description}"
-            answer = llm.invoke(prompt)
-            answers.append({"question": q, "answer": answer.content})
-        return {"answers": answers}
+            async with semaphore:
+                answer = await llm.ainvoke(prompt)
+            return {"question": q, "answer": answer.content}
+
+        answers = await asyncio.gather(*(answer_question(q) for q in form_questions))
+        return {"answers": list(answers)}
     else:
         raise HTTPException(status_code=400, detail="Invalid task")
 
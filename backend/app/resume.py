@@ -11,6 +11,7 @@ import re
 from app.db import get_db
 from app.models_db import User, Resume, GeneratedCoverLetter
 from app.dependencies import get_current_active_user
+from app.user_events import publish_user_event, RESUME_UPDATED
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -269,6 +270,7 @@ async def update_full_resume(
     
     try:
         await db.commit()
+        publish_user_event(current_user.id, RESUME_UPDATED)
         logger.info(f"Successfully committed resume update for user {current_user.id}")
     except Exception as commit_error:
         logger.error(f"Commit failed for user {current_user.id}: {commit_error}")
@@ -392,6 +394,7 @@ async def update_resume_data(
     try:
         await db.commit()
         await db.refresh(db_resume)
+        publish_user_event(current_user.id, RESUME_UPDATED)
     except Exception as e:
         await db.rollback()
         logger.error(f"Error updating resume for user {current_user.id}: {e}")
@@ -0,0 +1,114 @@
+"""
+Session Context - per-session user context for the conversation node
+Holds the User, parsed ResumeData, document count and rendered system prompt so
+they are loaded once per WebSocket session instead of on every turn. Entries are
+dropped when the user's resume, profile or documents change.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.models_db import User
+from app.resume import ResumeData
+from app.user_events import subscribe, DOCUMENTS_CHANGED, RESUME_UPDATED, PROFILE_UPDATED
+
+log = logging.getLogger(__name__)
+
+SESSION_CONTEXT_MAX_SESSIONS = int(os.getenv("SESSION_CONTEXT_MAX_SESSIONS", "512"))
+# Safety net for changes made outside this process; events cover the common paths
+SESSION_CONTEXT_TTL_SECONDS = int(os.getenv("SESSION_CONTEXT_TTL_SECONDS", "900"))
+
+
+@dataclass
+class SessionContext:
+    user: User
+    resume_data: Optional[ResumeData]
+    documents_count: int
+    user_context: Dict[str, Any]
+    system_prompt: List[Dict[str, Any]]  # Anthropic content blocks with a cache breakpoint
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SessionContextRegistry:
+    """
+    Per-session cache of everything the conversation node needs besides the messages.
+
+    The loader passed to get_context does the database work and prompt rendering;
+    it only runs on the first turn of a session, after an invalidation event, or
+    when the entry expires. The prompt embeds the current time at minute
+    precision, so it is re-rendered (without touching the database) when that
+    text changes.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_CONTEXT_MAX_SESSIONS, ttl_seconds: int = SESSION_CONTEXT_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "prompt_renders": 0}
+
+    def _get_valid_entry(self, session_id: str) -> Optional[SessionContext]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._entries.pop(session_id, None)
+            return None
+        self._entries.move_to_end(session_id)
+        return entry
+
+    async def get_context(
+        self,
+        session_id: str,
+        loader: Callable[[], Awaitable[SessionContext]],
+        refresh_prompt: Optional[Callable[[SessionContext], SessionContext]] = None,
+    ) -> SessionContext:
+        """Return the session's context, loading it only when missing or stale"""
+        entry = self._get_valid_entry(session_id)
+        if entry is None:
+            lock = self._locks.setdefault(session_id, asyncio.Lock())
+            async with lock:
+                entry = self._get_valid_entry(session_id)
+                if entry is None:
+                    self.stats["misses"] += 1
+                    entry = await loader()
+                    self._entries[session_id] = entry
+                    while len(self._entries) > self.max_sessions:
+                        evicted_session_id, _ = self._entries.popitem(last=False)
+                        self._locks.pop(evicted_session_id, None)
+                    return entry
+
+        self.stats["hits"] += 1
+        if refresh_prompt is not None:
+            refreshed = refresh_prompt(entry)
+            if refreshed is not entry:
+                self.stats["prompt_renders"] += 1
+                self._entries[session_id] = refreshed
+                entry = refreshed
+        return entry
+
+    def peek(self, session_id: str) -> Optional[SessionContext]:
+        """Cached context of a session, if any, without loading it"""
+        return self._get_valid_entry(session_id)
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session's context so it is reloaded on the next turn"""
+        if self._entries.pop(session_id, None) is not None:
+            self.stats["invalidations"] += 1
+            log.info(f"Session context invalidated for {session_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_sessions": len(self._entries)}
+
+
+# Global registry instance. Sessions are keyed by db_session_id, which is the user id.
+session_context_registry = SessionContextRegistry()
+
+subscribe(RESUME_UPDATED, session_context_registry.invalidate)
+subscribe(PROFILE_UPDATED, session_context_registry.invalidate)
+subscribe(DOCUMENTS_CHANGED, session_context_registry.invalidate)
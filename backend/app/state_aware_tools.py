@@ -3,7 +3,9 @@ State-Aware Tool System for LangGraph
 Wraps tools to automatically inject state while maintaining LangChain compatibility
 """
 
+import asyncio
 import logging
+import os
 from typing import Dict, Any, List, Optional
 from langchain_core.messages import ToolMessage, AIMessage
 from langchain_core.tools import StructuredTool
@@ -11,22 +13,31 @@ from app.state_types import WebSocketState
 
 log = logging.getLogger(__name__)
 
+# Maximum number of tool calls from one model turn that run at the same time
+TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "4"))
+
+# Tool metadata key naming the serialization group of a tool.
+# Calls to tools with the same key never run concurrently.
+SERIALIZATION_KEY_METADATA = "serialization_key"
+
 class StateAwareToolNode:
     """
     Custom ToolNode that maintains state context for tools
     Transparently passes state to tools that need it
     """
     
-    def __init__(self, tools: List[StructuredTool], state_provider=None):
+    def __init__(self, tools: List[StructuredTool], state_provider=None, max_concurrency: int = TOOL_CONCURRENCY_LIMIT):
         """
         Initialize with tools and optional state provider
         
         Args:
             tools: List of StructuredTool instances
             state_provider: Callable that returns current state
+            max_concurrency: Maximum number of tool calls executed at once
         """
         self.tools = {tool.name: tool for tool in tools}
         self.state_provider = state_provider
+        self.max_concurrency = max(1, max_concurrency)
         self._current_state = None
         log.info(f"StateAwareToolNode initialized with {len(self.tools)} tools")
     
@@ -39,6 +50,11 @@ class StateAwareToolNode:
         """
         Execute tools with state injection
         Compatible with LangGraph's expected interface
+        
+        Independent tool calls run concurrently (bounded by max_concurrency).
+        Calls whose tools declare the same serialization key run one after
+        another in the order the model emitted them. The returned ToolMessages
+        always follow the order of the tool calls.
         """
         messages = input_dict.get("messages", [])
         
@@ -57,85 +73,99 @@ class StateAwareToolNode:
             log.debug("No tool calls found in messages")
             return {"messages": []}
         
-        result_messages = []
+        tool_calls = list(last_message.tool_calls)
+        result_messages: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Calls sharing a serialization key form one sequential chain; every other call is its own chain
+        chains: Dict[Any, List[int]] = {}
+        for index, tool_call in enumerate(tool_calls):
+            key = self._get_serialization_key(tool_call.get("name"))
+            chains.setdefault(key if key is not None else ("independent", index), []).append(index)
+        
+        async def run_chain(indices: List[int]):
+            for index in indices:
+                async with semaphore:
+                    result_messages[index] = await self._execute_tool_call(tool_calls[index])
+        
+        if len(chains) > 1:
+            log.info(f"Executing {len(tool_calls)} tool calls in {len(chains)} concurrent chains")
+        
+        await asyncio.gather(*(run_chain(indices) for indices in chains.values()))
+        
+        return {"messages": result_messages}
+    
+    def _get_serialization_key(self, tool_name: Optional[str]) -> Optional[str]:
+        """Serialization key declared in the tool's metadata, if any"""
+        tool = self.tools.get(tool_name)
+        metadata = getattr(tool, "metadata", None) or {}
+        return metadata.get(SERIALIZATION_KEY_METADATA)
+    
+    async def _execute_tool_call(self, tool_call: Dict[str, Any]) -> ToolMessage:
+        """Execute a single tool call, always returning a ToolMessage (errors included)"""
+        tool_name = tool_call.get("name")
+        tool_args = tool_call.get("args", {})
+        tool_id = tool_call.get("id", f"{tool_name}_call")
+        
+        log.info(f"Executing tool: {tool_name} with args: {list(tool_args.keys())}")
+        
+        if tool_name not in self.tools:
+            error_msg = f"Tool {tool_name} not found"
+            log.error(error_msg)
+            return ToolMessage(
+                content=error_msg,
+                tool_call_id=tool_id,
+                name=tool_name
+            )
         
-        for tool_call in last_message.tool_calls:
-            tool_name = tool_call.get("name")
-            tool_args = tool_call.get("args", {})
-            tool_id = tool_call.get("id", f"{tool_name}_call")
+        tool = self.tools[tool_name]
+        
+        try:
+            # Get the actual function from the tool
+            if hasattr(tool, 'func'):
+                func = tool.func
+            elif hasattr(tool, 'coroutine'):
+                func = tool.coroutine
+            else:
+                func = tool
             
-            log.info(f"Executing tool: {tool_name} with args: {list(tool_args.keys())}")
+            # Execute the tool
+            if asyncio.iscoroutinefunction(func):
+                # It's an async function, use ainvoke
+                result = await tool.ainvoke(tool_args)
+            else:
+                # It's a sync function, check if tool has ainvoke
+                if hasattr(tool, 'ainvoke'):
+                    result = await tool.ainvoke(tool_args)
+                else:
+                    # This shouldn't happen with StructuredTool
+                    log.error(f"Tool {tool_name} doesn't support async invocation")
+                    raise ValueError(f"Tool {tool_name} must support async invocation")
             
-            if tool_name not in self.tools:
-                error_msg = f"Tool {tool_name} not found"
-                log.error(error_msg)
-                result_messages.append(
-                    ToolMessage(
-                        content=error_msg,
-                        tool_call_id=tool_id,
-                        name=tool_name
-                    )
-                )
-                continue
+            # CRITICAL: If result is still a coroutine, await it
+            if asyncio.iscoroutine(result):
+                log.warning(f"Tool {tool_name} returned unawaited coroutine, awaiting now...")
+                result = await result
             
-            tool = self.tools[tool_name]
+            # Convert result to string
+            result_str = str(result) if result is not None else "Tool executed successfully"
             
-            try:
-                # IMPORTANT: Check if the tool is async and await it properly
-                import asyncio
-                import inspect
-                
-                # Get the actual function from the tool
-                if hasattr(tool, 'func'):
-                    func = tool.func
-                elif hasattr(tool, 'coroutine'):
-                    func = tool.coroutine
-                else:
-                    func = tool
-                
-                # Execute the tool
-                if asyncio.iscoroutinefunction(func):
-                    # It's an async function, use ainvoke
-                    result = await tool.ainvoke(tool_args)
-                else:
-                    # It's a sync function, check if tool has ainvoke
-                    if hasattr(tool, 'ainvoke'):
-                        result = await tool.ainvoke(tool_args)
-                    else:
-                        # This shouldn't happen with StructuredTool
-                        log.error(f"Tool {tool_name} doesn't support async invocation")
-                        raise ValueError(f"Tool {tool_name} must support async invocation")
-                
-                # CRITICAL: If result is still a coroutine, await it
-                if asyncio.iscoroutine(result):
-                    log.warning(f"Tool {tool_name} returned unawaited coroutine, awaiting now...")
-                    result = await result
-                
-                # Convert result to string
-                result_str = str(result) if result is not None else "Tool executed successfully"
-                
-                log.info(f"Tool {tool_name} executed successfully, result length: {len(result_str)}")
-                
-                result_messages.append(
-                    ToolMessage(
-                        content=result_str,
-                        tool_call_id=tool_id,
-                        name=tool_name
-                    )
-                )
-                
-            except Exception as e:
-                error_msg = f"Error executing {tool_name}: {str(e)}"
-                log.error(error_msg, exc_info=True)
-                result_messages.append(
-                    ToolMessage(
-                        content=error_msg,
-                        tool_call_id=tool_id,
-                        name=tool_name
-                    )
-                )
-        
-        return {"messages": result_messages}
+            log.info(f"Tool {tool_name} executed successfully, result length: {len(result_str)}")
+            
+            return ToolMessage(
+                content=result_str,
+                tool_call_id=tool_id,
+                name=tool_name
+            )
+            
+        except Exception as e:
+            error_msg = f"Error executing {tool_name}: {str(e)}"
+            log.error(error_msg, exc_info=True)
+            return ToolMessage(
+                content=error_msg,
+                tool_call_id=tool_id,
+                name=tool_name
+            )
 
 def create_state_aware_tool(tool_func, name: str, description: str, state_getter):
     """
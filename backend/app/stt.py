@@ -21,6 +21,7 @@ except ImportError:
 from app.db import get_db
 from app.dependencies import get_current_active_user
 from app.models_db import User
+from app.loop_monitor import run_blocking
 
 router = APIRouter()
 
@@ -70,7 +71,8 @@ async def speech_to_text(
             language_code="en-US",
         )
 
-        response = stt_client.recognize(config=config, audio=audio)
+        # The gRPC call blocks for the whole recognition; keep it off the event loop
+        response = await run_blocking(stt_client.recognize, config=config, audio=audio)
 
         if not response.results or not response.results[0].alternatives:
             logger.warning("Speech-to-text transcription resulted in no content.")
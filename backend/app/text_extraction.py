@@ -0,0 +1,226 @@
+"""
+Text Extraction - one place that turns uploaded PDF, Word and text files into text
+Parsing runs in a process pool so CPU-bound PDF decoding neither blocks the event
+loop nor serializes on the GIL. Large PDFs are split into page ranges that are
+extracted in parallel. Files are memory-mapped instead of read into bytes, and
+results are memoized by the SHA-256 of the file, so the same upload is never
+parsed twice by this process. Workers are started with forkserver (spawn where it
+is not available): forking the multi-threaded server could copy a lock held by
+another thread into the child and deadlock it.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.loop_monitor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pages handed to one worker; PDFs with more pages are split across workers
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "256"))
+EXTRACTION_START_METHOD = os.getenv(
+    "EXTRACTION_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+TEXT_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+WORD_EXTENSIONS = ('.docx', '.doc')
+
+
+# ============================================================================
+# WORKER FUNCTIONS (run in the process pool, must stay module level)
+# ============================================================================
+
+def _map_file(file_path: str):
+    f = open(file_path, "rb")
+    try:
+        return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        f.close()
+        raise
+
+
+def _pdf_page_count(file_path: str) -> int:
+    from pypdf import PdfReader
+    f, mapped = _map_file(file_path)
+    with f, mapped:
+        return len(PdfReader(mapped).pages)
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop); pypdf reads straight from the mapped file"""
+    from pypdf import PdfReader
+    f, mapped = _map_file(file_path)
+    with f, mapped:
+        reader = PdfReader(mapped)
+        return [reader.pages[i].extract_text() or "" for i in range(start, min(stop, len(reader.pages)))]
+
+
+def _extract_docx(file_path: str) -> str:
+    import docx
+    document = docx.Document(file_path)
+    return "\n".join(paragraph.text for paragraph in document.paragraphs)
+
+
+def _read_text_file(file_path: str) -> str:
+    for encoding in TEXT_ENCODINGS:
+        try:
+            with open(file_path, "r", encoding=encoding) as f:
+                return f.read()
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Unable to decode text file with common encodings")
+
+
+def file_sha256(file_path: Path) -> str:
+    """SHA-256 of a file, hashed from a memory map"""
+    if os.path.getsize(file_path) == 0:
+        return hashlib.sha256(b"").hexdigest()
+    f, mapped = _map_file(str(file_path))
+    with f, mapped:
+        return hashlib.sha256(mapped).hexdigest()
+
+
+def page_ranges(page_count: int, pages_per_task: int = PDF_PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def join_pages(pages: List[str]) -> str:
+    return "\n".join(text for text in pages if text).strip()
+
+
+def extract_text_sync(file_path: Path, filename: Optional[str] = None) -> str:
+    """In-process extraction for synchronous callers; async code should use text_extractor"""
+    name = (filename or Path(file_path).name).lower()
+    if name.endswith(".pdf"):
+        return join_pages(_extract_pdf_pages(str(file_path), 0, _pdf_page_count(str(file_path))))
+    if name.endswith(WORD_EXTENSIONS):
+        return _extract_docx(str(file_path))
+    return _read_text_file(str(file_path))
+
+
+# ============================================================================
+# EXTRACTOR
+# ============================================================================
+
+class TextExtractor:
+    """Process-pool text extraction with a SHA-256 keyed result cache"""
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS, cache_size: int = EXTRACTION_CACHE_SIZE):
+        self.workers = max(1, workers)
+        self.cache_size = cache_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"extractions": 0, "cache_hits": 0, "pdf_pages": 0, "pool_tasks": 0, "errors": 0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(EXTRACTION_START_METHOD),
+                )
+            return self._pool
+
+    def start(self) -> None:
+        """Creates the pool up front; workers themselves start with the first extraction"""
+        self._get_pool()
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    async def _run(self, func, *args):
+        self.stats["pool_tasks"] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), func, *args)
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; start a fresh one for the next call
+            logger.error("Text extraction pool broke, recreating it")
+            self.shutdown()
+            raise
+
+    async def _extract_pdf(self, file_path: str) -> str:
+        page_count = await self._run(_pdf_page_count, file_path)
+        self.stats["pdf_pages"] += page_count
+        chunks = await asyncio.gather(*(
+            self._run(_extract_pdf_pages, file_path, start, stop)
+            for start, stop in page_ranges(page_count)
+        ))
+        return join_pages([page for chunk in chunks for page in chunk])
+
+    async def _extract_uncached(self, file_path: Path, name: str) -> str:
+        if name.endswith(".pdf"):
+            return await self._extract_pdf(str(file_path))
+        if name.endswith(WORD_EXTENSIONS):
+            return await self._run(_extract_docx, str(file_path))
+        # Plain text needs no parsing; a thread is enough
+        return await run_blocking(_read_text_file, str(file_path))
+
+    async def extract(self, file_path: Path, filename: Optional[str] = None) -> str:
+        """Text of an uploaded file; the same content is only ever parsed once"""
+        file_path = Path(file_path)
+        name = (filename or file_path.name).lower()
+        # The parser depends on the file type, so it is part of the key
+        digest = f"{await run_blocking(file_sha256, file_path)}:{Path(name).suffix}"
+
+        if digest in self._cache:
+            self._cache.move_to_end(digest)
+            self.stats["cache_hits"] += 1
+            return self._cache[digest]
+
+        # Concurrent requests for the same file share one extraction
+        task = self._in_flight.get(digest)
+        if task is not None:
+            self.stats["cache_hits"] += 1
+        else:
+            # Detached from the caller, so a cancelled request does not cancel the others waiting on it
+            task = asyncio.create_task(self._extract_and_cache(file_path, name, digest))
+            self._in_flight[digest] = task
+            task.add_done_callback(self._extraction_done)
+        return await asyncio.shield(task)
+
+    async def _extract_and_cache(self, file_path: Path, name: str, digest: str) -> str:
+        try:
+            text = await self._extract_uncached(file_path, name)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._in_flight.pop(digest, None)
+
+        self.stats["extractions"] += 1
+        self._cache[digest] = text
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    @staticmethod
+    def _extraction_done(task: asyncio.Task) -> None:
+        # Mark a failure as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached": len(self._cache), "workers": self.workers}
+
+
+# Global extractor, its pool is shut down from the app lifespan
+text_extractor = TextExtractor()
@@ -0,0 +1,116 @@
+"""
+Tool Catalog - cached tool instances and bound tool specs for the orchestrator
+Tool classes are built once per user session and the model's tool binding
+(JSON schema serialization) is computed once per process, instead of twice per turn.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models_db import User
+from app.user_events import subscribe, DOCUMENTS_CHANGED, PROFILE_UPDATED
+
+log = logging.getLogger(__name__)
+
+TOOL_CATALOG_MAX_SESSIONS = int(os.getenv("TOOL_CATALOG_MAX_SESSIONS", "512"))
+TOOL_CATALOG_TTL_SECONDS = int(os.getenv("TOOL_CATALOG_TTL_SECONDS", "1800"))
+
+
+@dataclass
+class _CatalogEntry:
+    tools: List[Any]
+    db_session: Any
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ToolCatalog:
+    """
+    Per-session tool cache plus process-wide bound models.
+
+    Tool instances close over the user and the shared db session, so they are
+    cached per user and rebuilt when the session changes, the entry expires, or
+    the user's documents/profile change. The schemas sent to the model do not
+    depend on the user, so the bound model is shared by every session.
+    """
+
+    def __init__(self, max_sessions: int = TOOL_CATALOG_MAX_SESSIONS, ttl_seconds: int = TOOL_CATALOG_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _CatalogEntry]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._bound_models: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _get_valid_entry(self, user_id: str, db_session) -> Optional[_CatalogEntry]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry.db_session is not db_session or time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._entries.pop(user_id, None)
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    async def get_tools(self, user: User, db_session=None) -> List:
+        """Return the user's tools, building them only on first use or after invalidation"""
+        entry = self._get_valid_entry(user.id, db_session)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry.tools
+
+        lock = self._locks.setdefault(user.id, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have built the tools while we waited
+            entry = self._get_valid_entry(user.id, db_session)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry.tools
+
+            from app.orchestrator_tools import create_all_tools
+
+            self.stats["misses"] += 1
+            tools = await create_all_tools(user, db_session)
+            if tools:
+                self._entries[user.id] = _CatalogEntry(tools=tools, db_session=db_session)
+                while len(self._entries) > self.max_sessions:
+                    evicted_user_id, _ = self._entries.popitem(last=False)
+                    self._locks.pop(evicted_user_id, None)
+            return tools
+
+    def get_bound_model(self, model_key: str, llm_factory: Callable[[], Any], tools: List) -> Any:
+        """
+        Return llm.bind_tools(tools), serializing the tool schemas once per process.
+        model_key must identify the model configuration produced by llm_factory.
+        """
+        key = (model_key, tuple(getattr(tool, "name", str(tool)) for tool in tools))
+        bound_model = self._bound_models.get(key)
+        if bound_model is None:
+            bound_model = llm_factory().bind_tools(tools)
+            self._bound_models[key] = bound_model
+            log.info(f"Bound {len(tools)} tools for model {model_key}")
+        return bound_model
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop the cached tools of a user so they are rebuilt on the next turn"""
+        if self._entries.pop(user_id, None) is not None:
+            self.stats["invalidations"] += 1
+            log.info(f"Tool catalog invalidated for user {user_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cached_sessions": len(self._entries),
+            "bound_models": len(self._bound_models),
+        }
+
+
+# Global catalog instance
+tool_catalog = ToolCatalog()
+
+subscribe(DOCUMENTS_CHANGED, tool_catalog.invalidate_user)
+subscribe(PROFILE_UPDATED, tool_catalog.invalidate_user)
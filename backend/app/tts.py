@@ -22,6 +22,7 @@ except ImportError:
 from app.db import get_db
 from app.dependencies import get_current_active_user
 from app.models_db import User
+from app.loop_monitor import run_blocking
 
 router = APIRouter()
 
@@ -70,7 +71,8 @@ async def text_to_speech(
         audio_config = texttospeech.AudioConfig(
             audio_encoding=texttospeech.AudioEncoding.MP3
         )
-        response = tts_client.synthesize_speech(
+        response = await run_blocking(
+            tts_client.synthesize_speech,
             input=synthesis_input, voice=voice, audio_config=audio_config
         )
         return Response(content=response.audio_content, media_type="audio/mpeg")
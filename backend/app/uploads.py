@@ -9,6 +9,7 @@ from app.db import get_db
 from app.models_db import Document, User
 from app.dependencies import get_current_active_user
 from app.vector_store import add_document_to_vector_store
+from app.user_events import publish_user_event, DOCUMENTS_CHANGED
 
 router = APIRouter()
 
@@ -56,13 +57,13 @@ async def upload_file(
             name=file.filename,
             type=file.content_type,
             content=text_content.strip(),  # Store extracted text
-            vector_store_path=str(file_path)
         )
         db.add(db_document)
         await db.commit()
         await db.refresh(db_document)
 
         await add_document_to_vector_store(db_document, db)
+        publish_user_event(current_user.id, DOCUMENTS_CHANGED)
 
         return {"filename": file.filename, "path": str(file_path)}
     except Exception as e:
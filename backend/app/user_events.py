@@ -0,0 +1,33 @@
+"""
+User Events - lightweight in-process notifications about user data changes
+Caches that hold per-user state subscribe here and drop stale entries when
+documents, the resume or the profile change.
+"""
+
+import logging
+from typing import Callable, Dict, List
+
+log = logging.getLogger(__name__)
+
+# Event names
+DOCUMENTS_CHANGED = "documents_changed"
+RESUME_UPDATED = "resume_updated"
+PROFILE_UPDATED = "profile_updated"
+
+_subscribers: Dict[str, List[Callable[[str], None]]] = {}
+
+
+def subscribe(event: str, handler: Callable[[str], None]) -> None:
+    """Register a handler called with the user id whenever the event is published"""
+    handlers = _subscribers.setdefault(event, [])
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def publish_user_event(user_id: str, event: str) -> None:
+    """Notify all subscribers of an event for a user. Handler errors are logged, never raised."""
+    for handler in _subscribers.get(event, []):
+        try:
+            handler(user_id)
+        except Exception as e:
+            log.error(f"User event handler {getattr(handler, '__name__', handler)} failed for {event}: {e}")
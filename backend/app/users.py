@@ -8,6 +8,7 @@ from app.models import User as UserSchema, Experience, Education
 # FIX: Import pydantic's ValidationError in addition to BaseModel
 from pydantic import BaseModel, ValidationError
 from app.dependencies import get_current_active_user
+from app.user_events import publish_user_event, PROFILE_UPDATED
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 # NOTE: The import below is unused in this file but is kept to maintain file integrity
@@ -134,6 +135,7 @@ async def update_me(
     try:
         await db.commit()
         await db.refresh(db_user)
+        publish_user_event(db_user.id, PROFILE_UPDATED)
         return db_user
     except Exception as e:
         logger.error(f"Error updating user: {e}")
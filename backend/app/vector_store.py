@@ -1,16 +1,20 @@
 import asyncio
+import hashlib
+from dataclasses import dataclass
 from datetime import datetime
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_community.vectorstores.pgvector import PGVector
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain.text_splitter import CharacterTextSplitter
+from app.embedding_service import embedding_service, EMBEDDING_DIMENSION
+from app.chunking import CHUNKER_VERSION, chunk_text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, or_
 from sqlalchemy.future import select
 
-from app.models_db import Document, User
+from app.models_db import Document, User, LangchainPgCollection, LangchainPgEmbedding
 import os
+import shutil
 
 logger = logging.getLogger(__name__)
 
@@ -34,16 +38,165 @@ else:
     CONNECTION_STRING = None
     logger.warning("Database connection details for PGVector are not fully configured.")
 
-EMBEDDINGS = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
+EMBEDDINGS = embedding_service
 # The dimension for the embedding model
-VECTOR_DIMENSION = 768
+VECTOR_DIMENSION = EMBEDDING_DIMENSION
+
+# Key in the collection metadata holding {document_id: version} of the last sync
+SYNC_STATE_KEY = "document_sync"
+
+
+def _collection_name(user_id: str) -> str:
+    return f"user_{user_id.replace('-', '_')}"
+
+
+def _document_version(document: Document) -> str:
+    """
+    Version marker used to decide whether a document needs re-chunking.
+    Falls back to a content hash when the row has no update timestamp.
+    """
+    if document.date_updated:
+        version = document.date_updated.isoformat()
+    else:
+        version = hashlib.sha256((document.content or "").encode("utf-8")).hexdigest()
+    return f"{CHUNKER_VERSION}:{version}"
+
+
+def _document_chunks(document: Document) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Splits a document into deterministic, section-aware chunks.
+    Returns (chunk_id, text, metadata) tuples. The chunk id is derived from the
+    document id and the chunk's content hash, so unchanged chunks keep their id
+    across edits and never need to be embedded again.
+    """
+    # Every chunk carries the document type and name for better retrieval
+    header = f"[{document.type.upper()} DOCUMENT - {document.name}]"
+    return [
+        (chunk.chunk_id, chunk.text, {
+            "document_id": document.id,
+            "content_hash": chunk.content_hash,
+            "section_type": chunk.section_type,
+        })
+        for chunk in chunk_text(document.content, document.id, header=header)
+    ]
+
+
+@dataclass
+class VectorSyncResult:
+    """Summary of a single incremental sync run."""
+    embedded: int = 0
+    deleted: int = 0
+    unchanged_documents: int = 0
+    skipped: bool = False
+
+
+async def _sync_documents(
+    vector_store: PGVector,
+    collection_name: str,
+    documents: List[Document],
+    db: AsyncSession,
+    prune_missing: bool = True,
+) -> VectorSyncResult:
+    """
+    Brings a PGVector collection in line with the given documents.
+
+    The per-document versions that were last embedded are kept in the collection's
+    metadata. Documents whose version is unchanged are skipped without chunking;
+    changed documents are re-chunked and only chunks with unseen content hashes are
+    embedded. Rows belonging to removed documents or superseded chunks are deleted.
+    With prune_missing=False, documents not passed in are left untouched.
+    """
+    result = VectorSyncResult()
+
+    collection_result = await db.execute(
+        select(LangchainPgCollection).where(LangchainPgCollection.name == collection_name)
+    )
+    collection = collection_result.scalar_one_or_none()
+    if collection is None:
+        logger.warning(f"Collection {collection_name} not found, skipping sync.")
+        result.skipped = True
+        return result
+
+    synced_versions: Dict[str, str] = (collection.cmetadata or {}).get(SYNC_STATE_KEY, {})
+    current_versions = {doc.id: _document_version(doc) for doc in documents if doc.content}
+
+    # Fast path: nothing was added, changed or removed since the last sync
+    if prune_missing:
+        up_to_date = synced_versions == current_versions
+    else:
+        up_to_date = all(synced_versions.get(doc_id) == version for doc_id, version in current_versions.items())
+    if up_to_date:
+        result.skipped = True
+        result.unchanged_documents = len(current_versions)
+        return result
+
+    rows = await db.execute(
+        select(
+            LangchainPgEmbedding.uuid,
+            LangchainPgEmbedding.custom_id,
+            LangchainPgEmbedding.cmetadata,
+        ).where(LangchainPgEmbedding.collection_id == collection.uuid)
+    )
+
+    stale_rows = []
+    existing_by_document: Dict[str, Dict[str, Any]] = {}
+    for row_uuid, custom_id, metadata in rows.all():
+        metadata = metadata or {}
+        document_id = metadata.get("document_id")
+        if document_id is None:
+            # Rows without metadata were written by the old full re-embedding sync.
+            # Anything else (e.g. saved memories) is not owned by the sync.
+            if not metadata:
+                stale_rows.append(row_uuid)
+            continue
+        if document_id not in current_versions:
+            if prune_missing:
+                stale_rows.append(row_uuid)
+            continue
+        existing_by_document.setdefault(document_id, {})[custom_id] = row_uuid
+
+    new_ids, new_texts, new_metadatas = [], [], []
+    for doc in documents:
+        if not doc.content:
+            continue
+        if synced_versions.get(doc.id) == current_versions[doc.id]:
+            result.unchanged_documents += 1
+            continue
+
+        existing_chunks = existing_by_document.get(doc.id, {})
+        wanted_ids = set()
+        for chunk_id, text, metadata in _document_chunks(doc):
+            wanted_ids.add(chunk_id)
+            if chunk_id not in existing_chunks:
+                new_ids.append(chunk_id)
+                new_texts.append(text)
+                new_metadatas.append(metadata)
+
+        stale_rows.extend(
+            row_uuid for chunk_id, row_uuid in existing_chunks.items() if chunk_id not in wanted_ids
+        )
+
+    # Embed first so a failed embedding call leaves the sync state untouched and retryable
+    if new_texts:
+        await vector_store.aadd_texts(new_texts, metadatas=new_metadatas, ids=new_ids)
+        result.embedded = len(new_texts)
+
+    if stale_rows:
+        await db.execute(delete(LangchainPgEmbedding).where(LangchainPgEmbedding.uuid.in_(stale_rows)))
+        result.deleted = len(stale_rows)
+
+    new_versions = current_versions if prune_missing else {**synced_versions, **current_versions}
+    collection.cmetadata = {**(collection.cmetadata or {}), SYNC_STATE_KEY: new_versions}
+    await db.commit()
+
+    return result
 
 
 async def get_user_vector_store(user_id: str, db: AsyncSession) -> Optional[PGVector]:
     """
     Gets a PGVector store for a user, ensuring it is synchronized with their documents.
-    This function will clear any old entries for the user and re-populate the store
-    with their current documents from the database.
+    The sync is incremental: only new or changed chunks are embedded and stale
+    chunks are removed. When no document changed, no embedding call is made.
     """
     if not CONNECTION_STRING:
         logger.error("Cannot create vector store: DATABASE_URL is not configured.")
@@ -56,47 +209,31 @@ async def get_user_vector_store(user_id: str, db: AsyncSession) -> Optional[PGVe
         )
         documents = doc_result.scalars().all()
 
+        collection_name = _collection_name(user_id)
+        vector_store = PGVector(
+            connection_string=CONNECTION_STRING,
+            embedding_function=EMBEDDINGS,
+            collection_name=collection_name,
+        )
+
+        sync_result = await _sync_documents(vector_store, collection_name, documents, db)
+
         if not documents:
             logger.warning(f"No documents found for user {user_id}. Vector store will be empty.")
             # Still return a store object so it can be added to later.
-            return PGVector(
-                connection_string=CONNECTION_STRING,
-                embedding_function=EMBEDDINGS,
-                collection_name=f"user_{user_id.replace('-', '_')}",
-            )
+            return vector_store
 
-        # Process documents into a format LangChain can use
-        texts_for_embedding = []
-        for doc in documents:
-            if doc.content:
-                # Add context to the document content for better retrieval
-                doc_context = f"[{doc.type.upper()} DOCUMENT - {doc.name}]\n{doc.content}"
-                texts_for_embedding.append(doc_context)
-        
-        if not texts_for_embedding:
+        if not any(doc.content for doc in documents):
             logger.info(f"No content found in documents for user {user_id}.")
             return None
 
-        # Split documents into chunks for embedding
-        text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        docs_for_vector_store = text_splitter.create_documents(texts_for_embedding)
-        
-        collection_name = f"user_{user_id.replace('-', '_')}"
-
-        # Create the vector store.
-        # This will use our Alembic-managed tables.
-        # pre_delete_collection=True ensures that all old entries for this user are cleared
-        # before adding the new ones, keeping the store perfectly in sync.
-        # DEFINITIVE FIX: Use the ASYNCHRONOUS version of the method (`afrom_documents`) and AWAIT it.
-        vector_store = await PGVector.afrom_documents(
-            embedding=EMBEDDINGS,
-            documents=docs_for_vector_store,
-            collection_name=collection_name,
-            connection_string=CONNECTION_STRING,
-            pre_delete_collection=True,
-        )
-        
-        logger.info(f"Successfully synchronized vector store for user {user_id} with {len(docs_for_vector_store)} chunks.")
+        if sync_result.skipped:
+            logger.info(f"Vector store for user {user_id} is up to date ({sync_result.unchanged_documents} documents).")
+        else:
+            logger.info(
+                f"Synchronized vector store for user {user_id}: {sync_result.embedded} chunks embedded, "
+                f"{sync_result.deleted} removed, {sync_result.unchanged_documents} documents unchanged."
+            )
         return vector_store
         
     except Exception as e:
@@ -113,21 +250,22 @@ async def add_document_to_vector_store(document: Document, db: AsyncSession) ->
 
     try:
         # Initialize a vector store object pointed at the user's collection
+        collection_name = _collection_name(document.user_id)
         vector_store = PGVector(
             connection_string=CONNECTION_STRING,
             embedding_function=EMBEDDINGS,
-            collection_name=f"user_{document.user_id.replace('-', '_')}",
+            collection_name=collection_name,
         )
 
-        # Process and chunk the single new document
+        # Only the chunks of this document that are not embedded yet are added
         if document.content:
-            doc_context = f"[{document.type.upper()} DOCUMENT - {document.name}]\n{document.content}"
-            text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-            docs_for_vector_store = text_splitter.create_documents([doc_context])
-
-            # Add the new chunks to the existing collection in the database
-            await vector_store.aadd_documents(docs_for_vector_store)
-            logger.info(f"Successfully added document {document.id} to vector store for user {document.user_id}.")
+            sync_result = await _sync_documents(
+                vector_store, collection_name, [document], db, prune_missing=False
+            )
+            logger.info(
+                f"Successfully added document {document.id} to vector store for user {document.user_id} "
+                f"({sync_result.embedded} chunks embedded)."
+            )
         
         return vector_store
 
@@ -135,6 +273,119 @@ async def add_document_to_vector_store(document: Document, db: AsyncSession) ->
         logger.error(f"Failed to add document {document.id} to vector store: {e}")
         return None
 
+async def remove_documents_from_vector_store(user_id: str, document_ids: List[str], db: AsyncSession) -> int:
+    """
+    Deletes the chunks of the given documents from the user's collection and
+    forgets their sync versions. Does not commit; callers commit together with
+    the document deletion.
+    """
+    if not document_ids:
+        return 0
+    collection_result = await db.execute(
+        select(LangchainPgCollection).where(LangchainPgCollection.name == _collection_name(user_id))
+    )
+    collection = collection_result.scalar_one_or_none()
+    if collection is None:
+        return 0
+
+    # Chunk ids are "<document_id>:<content hash>"
+    result = await db.execute(
+        delete(LangchainPgEmbedding).where(
+            LangchainPgEmbedding.collection_id == collection.uuid,
+            or_(*(LangchainPgEmbedding.custom_id.like(f"{document_id}:%") for document_id in document_ids)),
+        )
+    )
+    synced_versions = dict((collection.cmetadata or {}).get(SYNC_STATE_KEY, {}))
+    for document_id in document_ids:
+        synced_versions.pop(document_id, None)
+    collection.cmetadata = {**(collection.cmetadata or {}), SYNC_STATE_KEY: synced_versions}
+    return result.rowcount or 0
+
+
+async def search_document_chunks(document: Document, query: str, db: AsyncSession, k: int = 5) -> List[str]:
+    """
+    Similarity search restricted to one document through a metadata filter on the
+    user's collection. The document is synced first, which costs nothing when it
+    is already embedded.
+    """
+    vector_store = await add_document_to_vector_store(document, db)
+    if vector_store is None:
+        return []
+    results = await vector_store.asimilarity_search(query, k=k, filter={"document_id": document.id})
+    return [doc.page_content for doc in results]
+
+
+def is_legacy_faiss_dir(path: Optional[str]) -> bool:
+    """True for the per-document FAISS directories written by the old upload path"""
+    return bool(path) and os.path.isdir(path) and os.path.basename(os.path.normpath(path)).startswith("faiss_")
+
+
+def remove_legacy_faiss_index(path: Optional[str]) -> bool:
+    """Deletes a legacy FAISS directory. Anything else (e.g. an uploaded file path) is left alone."""
+    if not is_legacy_faiss_dir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+
+@dataclass
+class FaissMigrationResult:
+    documents: int = 0
+    embedded: int = 0
+    files_removed: int = 0
+    failed: int = 0
+
+
+async def migrate_user_faiss_indexes(user_id: str, db: AsyncSession, delete_files: bool = False) -> FaissMigrationResult:
+    """
+    Moves a user's documents that still reference a FAISS index into the pgvector
+    collection. With delete_files, the FAISS directories are removed and
+    Document.vector_store_path is cleared; otherwise a later run can clean them up.
+
+    Chunks are rebuilt from Document.content with the pgvector chunker rather than
+    unpickled from the FAISS files, so the migrated rows have the same ids as
+    rows written by the regular sync and no pickle is ever loaded.
+    """
+    result = FaissMigrationResult()
+    doc_result = await db.execute(
+        select(Document).where(Document.user_id == user_id, Document.vector_store_path.isnot(None))
+    )
+    documents = doc_result.scalars().all()
+    if not documents:
+        return result
+
+    vector_store = PGVector(
+        connection_string=CONNECTION_STRING,
+        embedding_function=EMBEDDINGS,
+        collection_name=_collection_name(user_id),
+    )
+    sync_result = await _sync_documents(
+        vector_store, _collection_name(user_id), [doc for doc in documents if doc.content], db, prune_missing=False
+    )
+    result.embedded = sync_result.embedded
+
+    for doc in documents:
+        result.documents += 1
+        if not doc.content:
+            # Nothing to index; the FAISS files are all that is left of these documents
+            logger.warning(f"Document {doc.id} has no stored content; keeping {doc.vector_store_path}")
+            result.failed += 1
+            continue
+        path = doc.vector_store_path
+        if not is_legacy_faiss_dir(path):
+            # Missing directory, or an upload file path stored in the retired column
+            doc.vector_store_path = None
+        elif delete_files:
+            try:
+                remove_legacy_faiss_index(path)
+                doc.vector_store_path = None
+                result.files_removed += 1
+            except OSError as e:
+                logger.error(f"Could not delete FAISS index {path}: {e}")
+    await db.commit()
+    return result
+
+
 async def search_documents_with_context(
     user_id: str, 
     query: str, 
@@ -153,7 +404,7 @@ async def search_documents_with_context(
         vector_store = PGVector(
             connection_string=CONNECTION_STRING,
             embedding_function=EMBEDDINGS,
-            collection_name=f"user_{user_id.replace('-', '_')}",
+            collection_name=_collection_name(user_id),
         )
         
         # Perform the similarity search
@@ -0,0 +1,102 @@
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.text_splitter import CharacterTextSplitter
+from app.chunking import chunk_text
+
+SKILLS = ["Python", "Java", "TypeScript", "React", "FastAPI", "PostgreSQL", "Docker", "Kubernetes", "AWS", "GCP", "Redis", "Kafka"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Full-Stack Developer", "Team Lead"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+HEADINGS = {
+    "summary": ["SUMMARY", "Professional Summary", "PROFILE"],
+    "experience": ["EXPERIENCE", "Work Experience", "EMPLOYMENT HISTORY"],
+    "skills": ["SKILLS", "Technical Skills:", "CORE COMPETENCIES"],
+    "projects": ["PROJECTS", "Selected Projects"],
+    "education": ["EDUCATION", "Academic Background"],
+}
+
+
+def make_sample_cv(rng: random.Random, jobs: int) -> str:
+    """A synthetic CV with a realistic layout and a varying number of positions"""
+    lines = [f"Candidate {rng.randint(1, 9999)}", "candidate@example.com | +1 555 0100 | Remote", ""]
+    lines += [rng.choice(HEADINGS["summary"]), " ".join(
+        f"Engineer with {rng.randint(2, 15)} years of {rng.choice(SKILLS)} experience." for _ in range(4)
+    ), ""]
+    lines.append(rng.choice(HEADINGS["experience"]))
+    for _ in range(jobs):
+        lines.append(f"{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | 20{rng.randint(10, 24)} - Present")
+        lines += [f"• Built {rng.choice(SKILLS)} services handling {rng.randint(1, 900)}k requests a day" for _ in range(4)]
+        lines.append("")
+    lines += [rng.choice(HEADINGS["skills"]), ", ".join(rng.sample(SKILLS, 8)), ""]
+    lines.append(rng.choice(HEADINGS["projects"]))
+    for number in range(3):
+        lines += [f"Project {number} - {rng.choice(SKILLS)} platform", "Tech Stack: " + ", ".join(rng.sample(SKILLS, 4)), ""]
+    lines += [rng.choice(HEADINGS["education"]), "B.Sc. Computer Science | State University | 2015"]
+    return "\n".join(lines)
+
+
+def sample_corpus(size: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [make_sample_cv(rng, jobs=rng.randint(1, 12)) for _ in range(size)]
+
+
+def load_corpus(directory: Path) -> list:
+    return [path.read_text(encoding="utf-8", errors="ignore") for path in sorted(directory.glob("*.txt"))]
+
+
+LEGACY_SPLITTER = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+
+
+def legacy_graph_rag_sections(content: str) -> list:
+    """The per-call regex scan Graph RAG used before the shared chunker"""
+    section_patterns = [
+        r'\n\s*(?:EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT)\s*\n',
+        r'\n\s*(?:EDUCATION|ACADEMIC BACKGROUND)\s*\n',
+        r'\n\s*(?:SKILLS|TECHNICAL SKILLS|COMPETENCIES)\s*\n',
+        r'\n\s*(?:PROJECTS|PROJECT EXPERIENCE)\s*\n',
+        r'\n\s*(?:CERTIFICATIONS|CERTIFICATES)\s*\n',
+        r'\n\s*(?:SUMMARY|PROFILE|OBJECTIVE)\s*\n'
+    ]
+    for pattern in section_patterns:
+        if re.search(pattern, content, re.IGNORECASE):
+            sections = re.split(pattern, content, flags=re.IGNORECASE)
+            return [section.strip() for section in sections if section.strip()]
+    return [para.strip() for para in content.split('\n\n') if len(para.strip()) > 50]
+
+
+def run_benchmark(corpus: list, repeat: int = 5) -> dict:
+    """Best-of-repeat time per CV in microseconds and the chunk count for each splitter"""
+    splitters = {
+        "section_chunker": lambda text: chunk_text(text, "doc"),
+        "character_splitter": LEGACY_SPLITTER.split_text,
+        "legacy_graph_rag": legacy_graph_rag_sections,
+    }
+    results = {}
+    for name, split in splitters.items():
+        best = min(timeit.repeat(lambda: [split(text) for text in corpus], number=1, repeat=repeat))
+        results[name] = {
+            "us_per_cv": best / len(corpus) * 1e6,
+            "chunks": sum(len(split(text)) for text in corpus),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the section-aware chunker")
+    parser.add_argument("--corpus", type=Path, help="Directory of .txt CVs (default: synthetic sample CVs)")
+    parser.add_argument("--size", type=int, default=200, help="Number of synthetic CVs")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else sample_corpus(args.size)
+    print(f"{len(corpus)} CVs, {sum(map(len, corpus)) / len(corpus):.0f} characters on average")
+    for name, result in run_benchmark(corpus, args.repeat).items():
+        print(f"{name:20s} {result['us_per_cv']:9.1f} us/CV  {result['chunks']:6d} chunks")
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+load_dotenv()
+
+from sqlalchemy import select
+from app.db import async_session_maker
+from app.models_db import Document
+from app.vector_store import CONNECTION_STRING, FaissMigrationResult, migrate_user_faiss_indexes
+
+# Configuration
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def migrate_faiss_indexes(user_ids=None, delete_files=False, concurrency=4):
+    """
+    Moves every document that still references a per-document FAISS index into the
+    user's pgvector collection. Safe to re-run: already migrated documents are not
+    embedded again, and a later run with --delete-files removes the directories.
+    """
+    logger.info("--- Starting FAISS to pgvector migration ---")
+    if not CONNECTION_STRING:
+        raise ValueError("Database connection details for PGVector are not configured.")
+
+    if not user_ids:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Document.user_id).where(Document.vector_store_path.isnot(None)).distinct()
+            )
+            user_ids = [row[0] for row in result.all()]
+    logger.info(f"{len(user_ids)} users have documents with a FAISS index path")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    totals = FaissMigrationResult()
+
+    async def migrate_user(user_id):
+        async with semaphore:
+            try:
+                # One session per user; sessions are not shared between tasks
+                async with async_session_maker() as session:
+                    result = await migrate_user_faiss_indexes(user_id, session, delete_files=delete_files)
+                logger.info(
+                    f"User {user_id}: {result.documents} documents, {result.embedded} chunks embedded, "
+                    f"{result.files_removed} FAISS directories removed, {result.failed} without content"
+                )
+                return result
+            except Exception as e:
+                logger.error(f"Migration failed for user {user_id}: {e}")
+                return FaissMigrationResult(failed=1)
+
+    for result in await asyncio.gather(*(migrate_user(user_id) for user_id in user_ids)):
+        totals.documents += result.documents
+        totals.embedded += result.embedded
+        totals.files_removed += result.files_removed
+        totals.failed += result.failed
+
+    logger.info(
+        f"--- Migration finished: {totals.documents} documents, {totals.embedded} chunks embedded, "
+        f"{totals.files_removed} FAISS directories removed, {totals.failed} failures ---"
+    )
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move per-document FAISS indexes into pgvector")
+    parser.add_argument("--user", action="append", dest="user_ids", help="Only migrate this user id (repeatable)")
+    parser.add_argument("--delete-files", action="store_true", help="Remove migrated FAISS directories")
+    parser.add_argument("--concurrency", type=int, default=4, help="Users migrated at the same time")
+    args = parser.parse_args()
+
+    asyncio.run(migrate_faiss_indexes(args.user_ids, args.delete_files, args.concurrency))
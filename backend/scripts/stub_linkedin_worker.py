@@ -0,0 +1,66 @@
+"""
+Stub LinkedIn search worker speaking the protocol of app/node_worker_pool.py
+Returns generated postings without network access or Node.js. Point the service at
+it for offline development or tests:
+
+    LINKEDIN_WORKER_COMMAND="python scripts/stub_linkedin_worker.py"
+
+Special keywords exercise the failure paths: "error" answers with an error, "slow"
+waits STUB_WORKER_DELAY seconds (default 5) before answering and "crash" exits.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def make_jobs(params: dict) -> list:
+    keyword = params.get("keyword", "")
+    location = params.get("location", "Remote")
+    limit = int(params.get("limit") or 10)
+    page = int(params.get("page") or 0)
+    return [
+        {
+            "position": f"{keyword.title()} {page * limit + number + 1}",
+            "company": f"Stub Company {number + 1}",
+            "companyLogo": None,
+            "location": location,
+            "date": "2025-09-01",
+            "agoTime": "1 day ago",
+            "salary": "",
+            "jobUrl": f"https://www.linkedin.com/jobs/view/{page * limit + number + 1}",
+        }
+        for number in range(limit)
+    ]
+
+
+def handle(request: dict) -> dict:
+    method = request.get("method")
+    params = request.get("params") or {}
+    if method == "ping":
+        return {"id": request.get("id"), "ok": True, "result": {"pid": os.getpid()}}
+    if method != "search":
+        return {"id": request.get("id"), "ok": False, "error": f"Unknown method: {method}"}
+
+    keyword = params.get("keyword", "")
+    if keyword == "crash":
+        sys.exit(1)
+    if keyword == "error":
+        return {"id": request.get("id"), "ok": False, "error": "LinkedIn returned 429"}
+    if keyword == "slow":
+        time.sleep(float(os.getenv("STUB_WORKER_DELAY", "5")))
+    # Library chatter on stdout must not break the protocol
+    print("Fetching jobs...", flush=True)
+    return {"id": request.get("id"), "ok": True, "result": make_jobs(params)}
+
+
+def main() -> None:
+    print(json.dumps({"ready": True}), flush=True)
+    for line in sys.stdin:
+        if line.strip():
+            print(json.dumps(handle(json.loads(line))), flush=True)
+
+
+if __name__ == "__main__":
+    main()
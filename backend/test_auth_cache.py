@@ -0,0 +1,130 @@
+import time
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from jose import jwt
+
+from app import auth_cache
+from app.clerk import ClerkUser
+from app.models_db import User
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in (auth_cache._clerk_tokens, auth_cache._extension_tokens, auth_cache._users):
+        cache.clear()
+    auth_cache._external_ids.clear()
+    yield
+
+
+def make_token(exp):
+    return jwt.encode({"sub": "user_clerk_1", "exp": exp}, "secret", algorithm="HS256")
+
+
+@pytest.mark.asyncio
+async def test_clerk_token_verified_once_until_exp():
+    token = make_token(int(time.time()) + 120)
+    clerk_user = ClerkUser(sub="user_clerk_1")
+
+    with patch("app.auth_cache.verify_token", AsyncMock(return_value=clerk_user)) as verify:
+        first = await auth_cache.verify_token_cached(token)
+        second = await auth_cache.verify_token_cached(token)
+
+    assert first is second is clerk_user
+    verify.assert_awaited_once_with(token)
+    (_, expires_at), = auth_cache._clerk_tokens._entries.values()
+    assert expires_at <= time.time() + 120
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_not_cached():
+    token = make_token(int(time.time()) - 5)
+
+    with patch("app.auth_cache.verify_token", AsyncMock(return_value=ClerkUser(sub="x"))) as verify:
+        await auth_cache.verify_token_cached(token)
+        await auth_cache.verify_token_cached(token)
+
+    assert verify.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_is_cached_and_merged_without_query():
+    user = User(id="u1", external_id="user_clerk_1", email="a@b.c", name="Ada", active=True)
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = user
+    db = AsyncMock()
+    db.execute.return_value = result
+    db.merge.side_effect = lambda obj, load: obj
+
+    first = await auth_cache.get_user_by_external_id_cached("user_clerk_1", db)
+    second = await auth_cache.get_user_by_external_id_cached("user_clerk_1", db)
+
+    assert first is user
+    db.execute.assert_awaited_once()
+    assert db.merge.await_args.kwargs == {"load": False}
+    assert (second.id, second.email, second.name) == ("u1", "a@b.c", "Ada")
+
+
+def test_flushed_user_changes_invalidate_cache():
+    user = User(id="u1", external_id="user_clerk_1", name="Ada")
+    auth_cache.cache_user(user)
+
+    auth_cache._invalidate_flushed_users(SimpleNamespace(dirty={user}, deleted=set()), None)
+
+    assert auth_cache._users.get("user_clerk_1") is None
+
+
+@pytest.mark.asyncio
+async def test_core_update_of_user_invalidates_cache():
+    from sqlalchemy import update
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: User.__table__.create(sync_conn))
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with maker() as db:
+            db.add(User(id="u1", external_id="user_clerk_1", email="a@b.c", name="Ada", onboarding_completed=False))
+            await db.commit()
+
+        async with maker() as db:
+            user = await auth_cache.get_user_by_external_id_cached("user_clerk_1", db)
+            assert user.onboarding_completed is False
+            hits = auth_cache._users.hits
+            # What /onboarding/complete does
+            await db.execute(update(User).where(User.id == user.id).values(onboarding_completed=True))
+            await db.commit()
+
+        async with maker() as db:
+            user = await auth_cache.get_user_by_external_id_cached("user_clerk_1", db)
+            assert user.onboarding_completed is True
+        assert auth_cache._users.hits == hits
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_last_used_writes_are_batched():
+    recorder = auth_cache.LastUsedRecorder(flush_interval=3600)
+    session = AsyncMock()
+    session_maker = MagicMock()
+    session_maker.return_value.__aenter__.return_value = session
+
+    used_at = datetime.utcnow()
+    recorder.record("token-1", used_at - timedelta(seconds=5))
+    recorder.record("token-1", used_at)
+    recorder.record("token-2", used_at)
+
+    with patch("app.auth_cache.async_session_maker", session_maker):
+        await recorder.shutdown()
+
+    session.execute.assert_awaited_once()
+    rows = session.execute.await_args.args[1]
+    assert sorted(rows, key=lambda r: r["id"]) == [
+        {"id": "token-1", "last_used": used_at},
+        {"id": "token-2", "last_used": used_at},
+    ]
+    session.commit.assert_awaited_once()
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.autofill_answer_cache import (
+    AnswerQuery,
+    AutofillAnswerCache,
+    is_job_specific,
+    job_fingerprint,
+    normalize_question,
+    question_entities,
+    question_terms,
+    resume_version,
+)
+from app.chrome_extension_api import FormField, FormFillerService, JobContext
+from app.models_db import AutofillAnswer, Base
+
+
+class BagOfWordsEmbeddings:
+    """Deterministic stand-in for the embedding service"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed_queries(self, texts):
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            vector = np.zeros(768, dtype=np.float32)
+            for word in text.split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 768] += 1.0
+            vectors.append(vector.tolist())
+        return vectors
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[AutofillAnswer.__table__]))
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    with patch("app.autofill_answer_cache.async_session_maker", maker):
+        yield maker
+    await engine.dispose()
+
+
+@pytest.fixture
+def cache():
+    return AutofillAnswerCache(similarity_threshold=0.75, embeddings=BagOfWordsEmbeddings())
+
+
+AUTH = AnswerQuery("auth", "legal.workAuth", "Are you legally authorized to work in Germany?")
+WHY_ACME = AnswerQuery("why", "questions.motivation", "Why do you want to work here?",
+                       job_fingerprint=job_fingerprint("Backend Engineer", "Acme"))
+
+
+def test_question_normalization_and_job_specific_questions():
+    assert normalize_question("  Are you *authorized* to work?: ") == "are you authorized to work"
+    assert is_job_specific("Why do you want to join our team?")
+    assert not is_job_specific("Years of experience with Python")
+    assert job_fingerprint("Backend Engineer", "ACME ") == job_fingerprint("backend engineer", "Acme")
+    assert job_fingerprint("", "", "") is None
+
+
+def test_cached_answer_must_fit_the_form():
+    query = AnswerQuery("country", "personal.country", "Country", options=["Germany", "France"])
+    assert query.accepts("germany")
+    assert not query.accepts("United States")
+    assert not AnswerQuery("q", "questions.other", "Describe", max_chars=10).accepts("far too long an answer")
+
+
+@pytest.mark.asyncio
+async def test_stored_answer_is_reused_exactly(session_maker, cache):
+    await cache.store("user-1", "v1", [(AUTH, "Yes", 0.7)])
+
+    hits = await cache.lookup("user-1", "v1", [AnswerQuery("f9", "legal.workAuth", "are you legally AUTHORIZED to work in Germany")])
+
+    assert hits == {"f9": ("Yes", 0.7)}
+    assert cache.stats["exact_hits"] == 1
+    async with session_maker() as db:
+        row = (await db.execute(select(AutofillAnswer))).scalar_one()
+    assert row.hit_count == 1 and row.last_used is not None
+
+
+@pytest.mark.asyncio
+async def test_similar_question_reuses_answer_with_lower_confidence(session_maker, cache):
+    await cache.store("user-1", "v1", [(AUTH, "Yes", 0.7)])
+
+    hits = await cache.lookup("user-1", "v1", [
+        AnswerQuery("a", "legal.workAuth", "Are you legally authorised to work in Germany?"),
+        # Same wording, different category: never mixed up
+        AnswerQuery("b", "legal.sponsorship", "Are you legally authorized to work in Germany?"),
+        AnswerQuery("c", "legal.workAuth", "What is your notice period?"),
+    ])
+
+    assert set(hits) == {"a"}
+    assert hits["a"][0] == "Yes" and 0.5 < hits["a"][1] < 0.7
+    assert cache.stats["semantic_hits"] == 1
+
+
+def test_question_entities_ignore_phrasing_but_keep_specifics():
+    assert question_terms("authorised to work") == question_terms("authorized to work")
+    assert question_entities(normalize_question("Total years of professional experience with Python?")) == \
+        question_entities(normalize_question("How many years have you worked with Python")) == {"python"}
+    assert question_entities("years of experience with python") != question_entities("years of experience with java")
+    assert question_entities("authorized to work in the us") != question_entities("authorized to work in canada")
+    assert question_entities("5 years of experience") != question_entities("3 years of experience")
+    assert question_entities("do you require sponsorship") != question_entities("do you not require sponsorship")
+
+
+@pytest.mark.asyncio
+async def test_questions_about_different_entities_do_not_share_answers(session_maker, cache):
+    python = AnswerQuery("py", "questions.other", "Years of experience with Python")
+    us = AnswerQuery("us", "legal.workAuth", "Are you authorized to work in the US?")
+    await cache.store("user-1", "v1", [(python, "5", 0.7), (us, "Yes", 0.7)])
+
+    hits = await cache.lookup("user-1", "v1", [
+        AnswerQuery("java", "questions.other", "Years of experience with Java"),
+        AnswerQuery("canada", "legal.workAuth", "Are you authorized to work in Canada?"),
+        AnswerQuery("py2", "questions.other", "Total years of professional experience with Python"),
+    ])
+
+    assert set(hits) == {"py2"}
+    assert hits["py2"][0] == "5"
+
+
+@pytest.mark.asyncio
+async def test_job_specific_answers_stay_with_their_posting(session_maker, cache):
+    await cache.store("user-1", "v1", [(WHY_ACME, "I love Acme's payments platform", 0.7)])
+
+    other_posting = AnswerQuery("why", "questions.motivation", "Why do you want to work here?",
+                                job_fingerprint=job_fingerprint("Backend Engineer", "Globex"))
+    assert await cache.lookup("user-1", "v1", [other_posting]) == {}
+    assert await cache.lookup("user-1", "v1", [WHY_ACME]) == {"why": ("I love Acme's payments platform", 0.7)}
+    assert await cache.lookup("user-2", "v1", [WHY_ACME]) == {}
+
+
+@pytest.mark.asyncio
+async def test_resume_change_hides_and_clears_answers(session_maker, cache):
+    await cache.store("user-1", "v1", [(AUTH, "Yes", 0.7)])
+    assert await cache.lookup("user-1", "v2", [AUTH]) == {}
+
+    cache.invalidate_user("user-1")
+    await cache.wait_pending()
+
+    assert await cache.lookup("user-1", "v1", [AUTH]) == {}
+    assert cache.stats["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_and_uncacheable_answers_are_not_stored(session_maker, cache):
+    no_posting = AnswerQuery("why", "questions.motivation", "Why this role?", job_fingerprint=None)
+    cache.store_later("user-1", "v1", [(AUTH, "", 0.0), (AUTH, "[MISSING]", 0.0), (no_posting, "Because", 0.7)])
+    await cache.wait_pending()
+
+    assert cache.stats["stored"] == 0
+    assert cache._pending == set()
+
+
+@pytest.mark.asyncio
+async def test_repeat_form_is_answered_without_llm(session_maker, cache):
+    resume = {"personalInfo": {"name": "Jane Doe", "location": "Berlin, Germany"}, "skills": ["Python"]}
+
+    def make_filler(job_context):
+        db = MagicMock()
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = []
+        db.execute = AsyncMock(return_value=result)
+        filler = FormFillerService(SimpleNamespace(id="user-1", name="Jane Doe", address=None, preferences={}), db, job_context)
+        filler.resume_data = resume
+
+        async def ainvoke(messages):
+            ids = [json.loads(line.split(":", 1)[1]) for line in messages[1].content.splitlines() if "Field id:" in line]
+            return SimpleNamespace(content=json.dumps({field_id: f"answer for {field_id}" for field_id in ids}))
+
+        filler.batch_llm = SimpleNamespace(ainvoke=AsyncMock(side_effect=ainvoke))
+        return filler
+
+    fields = [
+        FormField(id="auth", name="auth", type="text", category="legal.workAuth", label="Are you authorized to work in Germany?"),
+        FormField(id="why", name="why", type="textarea", category="questions.motivation", label="Why do you want to work here?"),
+    ]
+    acme = JobContext(title="Backend Engineer", company="Acme")
+
+    with patch("app.chrome_extension_api.autofill_answer_cache", cache), \
+         patch("app.chrome_extension_api.job_analysis_service"):
+        first = make_filler(acme)
+        await first.fill_fields(fields)
+        await cache.wait_pending()
+
+        second = make_filler(acme)
+        assert await second.fill_fields(fields) == {"auth": ("answer for auth", 0.7), "why": ("answer for why", 0.7)}
+        assert second.batch_llm.ainvoke.await_count == 0
+
+        # A new posting reuses the general answer but asks the LLM about the motivation
+        third = make_filler(JobContext(title="Data Engineer", company="Globex"))
+        await third.fill_fields(fields)
+        prompt = third.batch_llm.ainvoke.await_args.args[0][1].content
+        assert '"why"' in prompt and '"auth"' not in prompt
+
+    assert resume_version(resume) == resume_version(json.loads(json.dumps(resume)))
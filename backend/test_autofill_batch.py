@@ -0,0 +1,190 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.chrome_extension_api import FormField, FormFillerService, JobContext
+
+RESUME = {
+    "personalInfo": {"name": "Jane Doe", "email": "jane@example.com", "location": "Berlin, Germany"},
+    "experience": [{"position": "Engineer", "company": "Acme", "jobTitle": "Engineer"}],
+    "skills": ["Python", "FastAPI"],
+}
+
+
+@pytest.fixture(autouse=True)
+def no_answer_cache():
+    cache = SimpleNamespace(lookup=AsyncMock(return_value={}), store_later=MagicMock())
+    with patch("app.chrome_extension_api.autofill_answer_cache", cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def usage_db():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+    session = MagicMock()
+    session.return_value.__aenter__ = AsyncMock(return_value=db)
+    session.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch("app.chrome_extension_api.async_session_maker", session):
+        yield db
+
+
+def make_field(field_id, category, label):
+    return FormField(id=field_id, name=field_id, type="text", category=category, label=label)
+
+
+def make_filler(saved=(), reply=None, delay=0.0, job_context=None):
+    db = MagicMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(saved)
+    db.execute = AsyncMock(return_value=result)
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+
+    user = SimpleNamespace(id="user-1", name="Jane Doe", preferences={})
+    filler = FormFillerService(user, db, job_context)
+    filler.resume_data = RESUME
+
+    async def ainvoke(messages):
+        await asyncio.sleep(delay)
+        if reply is not None:
+            return SimpleNamespace(content=reply)
+        # Answer every field id listed in the prompt
+        ids = [json.loads(line.split(":", 1)[1]) for line in messages[1].content.splitlines() if "Field id:" in line]
+        return SimpleNamespace(content=json.dumps({field_id: f"answer for {field_id}" for field_id in ids}))
+
+    filler.batch_llm = SimpleNamespace(ainvoke=AsyncMock(side_effect=ainvoke))
+    return filler
+
+
+FIELDS = [
+    make_field("email", "personal.email", "Email"),
+    make_field("first", "personal.firstName", "First Name"),
+    make_field("city", "personal.city", "City"),
+    make_field("why", "questions.motivation", "Why do you want to work here?"),
+    make_field("auth", "legal.workAuth", "Are you authorized to work?"),
+]
+
+
+@pytest.mark.asyncio
+async def test_llm_fields_share_one_call(usage_db):
+    filler = make_filler()
+
+    values = await filler.fill_fields(FIELDS)
+
+    assert values["email"] == ("jane@example.com", 1.0)
+    for field_id in ("first", "city", "why", "auth"):
+        assert values[field_id] == (f"answer for {field_id}", 0.7)
+    assert filler.batch_llm.ainvoke.await_count == 1
+    # One query for all saved responses, no usage update without a saved response
+    assert filler.db.execute.await_count == 1
+    usage_db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_saved_responses_are_loaded_once_and_counted_in_one_update(usage_db):
+    saved = [
+        SimpleNamespace(id="r1", field_category="personal.city", field_value="Munich"),
+        SimpleNamespace(id="r2", field_category="legal.workAuth", field_value="Yes"),
+    ]
+    filler = make_filler(saved=saved)
+
+    values = await filler.fill_fields(FIELDS)
+
+    assert values["city"] == ("Munich", 1.0)
+    assert values["auth"] == ("Yes", 1.0)
+    prompt = filler.batch_llm.ainvoke.await_args.args[0][1].content
+    assert '"city"' not in prompt and '"first"' in prompt
+    # One saved response query, and a single usage UPDATE in its own session, committed once
+    assert filler.db.execute.await_count == 1
+    usage_db.execute.assert_awaited_once()
+    usage_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_large_forms_are_split_into_concurrent_batches():
+    fields = [make_field(f"q{i}", "questions.other", f"Question {i}") for i in range(7)]
+    filler = make_filler(delay=0.05)
+
+    with patch("app.chrome_extension_api.AUTOFILL_LLM_BATCH_SIZE", 3):
+        started = asyncio.get_running_loop().time()
+        values = await filler.fill_fields(fields)
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert filler.batch_llm.ainvoke.await_count == 3
+    assert elapsed < 0.12
+    assert all(values[field.id] == (f"answer for {field.id}", 0.7) for field in fields)
+
+
+@pytest.mark.asyncio
+async def test_refusals_and_unparseable_replies():
+    filler = make_filler(reply=json.dumps({"first": "I don't have that", "city": "Berlin"}))
+    values = await filler.fill_fields(FIELDS[1:3] + FIELDS[3:4])
+
+    assert values["first"] == ("", 0.0)
+    assert values["city"] == ("Berlin", 0.7)
+    assert values["why"] == ("", 0.0)
+
+    filler = make_filler(reply="Sorry, something went wrong")
+    values = await filler.fill_fields(FIELDS[1:3])
+    assert values == {"first": ("[MISSING]", 0.0), "city": ("[MISSING]", 0.0)}
+
+
+@pytest.mark.asyncio
+async def test_job_analysis_is_requested_once_per_form():
+    filler = make_filler(job_context=JobContext(title="Backend Engineer", description="We need Python"))
+
+    with patch("app.chrome_extension_api.job_analysis_service") as service:
+        service.analyze = AsyncMock(return_value={"required_skills": ["Python"]})
+        with patch("app.chrome_extension_api.AUTOFILL_LLM_BATCH_SIZE", 2):
+            await filler.fill_fields(FIELDS)
+
+    service.analyze.assert_awaited_once()
+    prompt = filler.batch_llm.ainvoke.await_args.args[0][1].content
+    assert "Key Requirements: Python" in prompt
+
+
+@pytest.mark.asyncio
+async def test_truncated_replies_keep_parsed_answers_and_retry_the_rest():
+    filler = make_filler()
+    answer_all = filler.batch_llm.ainvoke.side_effect
+
+    async def ainvoke(messages):
+        if filler.batch_llm.ainvoke.await_count == 1:
+            # Cut off at max_tokens in the middle of the third answer
+            return SimpleNamespace(content='{"first": "Jane", "city": "Berlin", "why": "I have long admired')
+        return await answer_all(messages)
+
+    filler.batch_llm.ainvoke.side_effect = ainvoke
+    values = await filler.fill_fields(FIELDS[1:])
+
+    assert values["first"] == ("Jane", 0.7)
+    assert values["city"] == ("Berlin", 0.7)
+    assert values["why"] == ("answer for why", 0.7)
+    assert values["auth"] == ("answer for auth", 0.7)
+    # The two unanswered fields were asked again, one per call
+    retried = [call.args[0][1].content for call in filler.batch_llm.ainvoke.await_args_list[1:]]
+    assert len(retried) == 2
+    assert all('"first"' not in prompt and '"city"' not in prompt for prompt in retried)
+
+
+@pytest.mark.asyncio
+async def test_long_answers_get_smaller_batches():
+    fields = [
+        FormField(id=f"essay{i}", name=f"essay{i}", type="textarea", category="questions.other",
+                  label=f"Essay {i} (max 3000 characters)")
+        for i in range(4)
+    ] + [make_field(f"q{i}", "personal.other", f"Question {i}") for i in range(6)]
+    filler = make_filler()
+
+    with patch("app.chrome_extension_api.AUTOFILL_BATCH_MAX_TOKENS", 4096):
+        values = await filler.fill_fields(fields)
+
+    prompts = [call.args[0][1].content for call in filler.batch_llm.ainvoke.await_args_list]
+    # Two 3000 character answers fit in half of the output limit, the short ones fill up the last batch
+    assert [prompt.count("Field id:") for prompt in prompts] == [2, 2, 6]
+    assert all(values[field.id] == (f"answer for {field.id}", 0.7) for field in fields)
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi.testclient import TestClient
+
+from app import chrome_extension_api
+from app.chrome_extension_api import AutofillRequest, FormField, FormFillerService, router
+from app.models_db import Base, SavedApplicationResponse
+
+RESUME = {
+    "personalInfo": {"name": "Jane Doe", "email": "jane@example.com", "phone": "+49 30 1234"},
+    "skills": ["Python", "FastAPI"],
+}
+
+
+@pytest.fixture(autouse=True)
+def no_answer_cache():
+    cache = SimpleNamespace(lookup=AsyncMock(return_value={}), store_later=MagicMock())
+    with patch("app.chrome_extension_api.autofill_answer_cache", cache):
+        yield cache
+
+
+def make_field(field_id, category, label, field_type="text"):
+    return FormField(id=field_id, name=field_id, type=field_type, category=category, label=label)
+
+
+FIELDS = [
+    make_field("why", "questions.motivation", "Why do you want to work here?"),
+    make_field("first", "personal.firstName", "First Name"),
+    make_field("email", "personal.email", "Email"),
+    make_field("salary", "professional.salary", "Salary"),
+    make_field("phone", "personal.phone", "Phone"),
+    make_field("pw", "account.password", "Password", field_type="password"),
+]
+
+
+def make_db(saved=()):
+    db = MagicMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(saved)
+    db.execute = AsyncMock(return_value=result)
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+async def answer_all(messages, delay=0.05):
+    await asyncio.sleep(delay)
+    ids = [json.loads(line.split(":", 1)[1]) for line in messages[1].content.splitlines() if "Field id:" in line]
+    return SimpleNamespace(content=json.dumps({field_id: f"answer for {field_id}" for field_id in ids}))
+
+
+def make_filler(db=None, llm=None):
+    filler = FormFillerService(SimpleNamespace(id="user-1", name="Jane Doe", address=None, preferences={}), db or make_db())
+    filler.resume_data = RESUME
+    filler.batch_llm = llm or SimpleNamespace(ainvoke=AsyncMock(side_effect=answer_all))
+    return filler
+
+
+@pytest.mark.asyncio
+async def test_resume_fields_are_yielded_before_llm_answers():
+    filler = make_filler()
+
+    order = [field_id async for field_id, _, _ in filler.iter_field_values(FIELDS[:5], batch_size=1)]
+
+    assert order[:2] == ["email", "phone"]
+    assert set(order[2:]) == {"why", "first", "salary"}
+    assert filler.batch_llm.ainvoke.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_llm_batches_are_yielded_as_they_complete():
+    async def slow_for_why(messages):
+        return await answer_all(messages, delay=0.2 if '"why"' in messages[1].content else 0.01)
+
+    filler = make_filler(llm=SimpleNamespace(ainvoke=AsyncMock(side_effect=slow_for_why)))
+
+    order = [field_id async for field_id, _, _ in filler.iter_field_values(FIELDS[:2], batch_size=1)]
+
+    assert order == ["first", "why"]
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_early_cancels_llm_and_records_usage():
+    db = make_db(saved=[SimpleNamespace(id="r1", field_category="personal.email", field_value="saved@example.com")])
+    filler = make_filler(db=db, llm=SimpleNamespace(ainvoke=AsyncMock(side_effect=lambda m: answer_all(m, delay=10))))
+    usage_db = make_db()
+    session = MagicMock()
+    session.return_value.__aenter__ = AsyncMock(return_value=usage_db)
+    session.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("app.chrome_extension_api.async_session_maker", session):
+        stream = filler.iter_field_values(FIELDS[:3])
+        assert await stream.__anext__() == ("email", "saved@example.com", 1.0)
+        await asyncio.wait_for(stream.aclose(), timeout=1)
+
+    usage_db.commit.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stream_does_not_use_request_session_after_returning():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[SavedApplicationResponse.__table__]))
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with maker() as db:
+        db.add(SavedApplicationResponse(id="r1", user_id="user-1", field_category="personal.email",
+                                        field_label="Email", field_value="saved@example.com", is_default=True, usage_count=0))
+        await db.commit()
+
+    user = SimpleNamespace(id="user-1", name="Jane Doe", address=None, preferences={})
+    request = AutofillRequest(formStructure={"fields": [field.model_dump() for field in FIELDS[1:3]], "metadata": {}})
+
+    async def load_resume(self):
+        self.resume_data = RESUME
+        return True
+
+    try:
+        with patch.object(FormFillerService, "load_resume", load_resume), \
+             patch.object(chrome_extension_api, "ChatAnthropic", return_value=SimpleNamespace(ainvoke=answer_all)), \
+             patch("app.chrome_extension_api.async_session_maker", maker):
+            request_db = maker()
+            response = await chrome_extension_api.autofill_form_stream(request, current_user=user, db=request_db)
+            # FastAPI 0.115-0.117 close yield dependencies before the body is streamed
+            await request_db.close()
+            request_db.execute = AsyncMock(side_effect=AssertionError("request session used while streaming"))
+
+            body = "".join([chunk async for chunk in response.body_iterator])
+
+        assert '"fieldId": "email", "value": "saved@example.com"' in body
+        assert "event: done" in body and "event: error" not in body
+        async with maker() as db:
+            saved = (await db.execute(select(SavedApplicationResponse))).scalar_one()
+        assert saved.usage_count == 1
+    finally:
+        await engine.dispose()
+
+
+def test_stream_endpoint_emits_server_sent_events():
+    app = FastAPI()
+    app.include_router(router)
+    user = SimpleNamespace(id="user-1", name="Jane Doe", address=None, preferences={})
+    app.dependency_overrides[chrome_extension_api.get_user_from_token_or_clerk] = lambda: user
+    app.dependency_overrides[chrome_extension_api.get_db] = lambda: make_db()
+
+    async def load_resume(self):
+        self.resume_data = RESUME
+        return True
+
+    async def fail_for_salary(messages):
+        if '"salary"' in messages[1].content:
+            raise RuntimeError("overloaded")
+        return await answer_all(messages)
+
+    body = {
+        "formStructure": {
+            "fields": [field.model_dump() for field in FIELDS],
+            "metadata": {},
+        }
+    }
+    with patch.object(FormFillerService, "load_resume", load_resume), \
+         patch.object(chrome_extension_api, "ChatAnthropic", return_value=SimpleNamespace(ainvoke=fail_for_salary)), \
+         patch.object(chrome_extension_api, "AUTOFILL_STREAM_BATCH_SIZE", 1):
+        response = TestClient(app).post("/api/chrome-extension/autofill/stream", json=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: ")))
+        for lines in (block.split("\n") for block in response.text.strip().split("\n\n"))
+    ]
+    assert events[0] == ("field", {"fieldId": "email", "value": "jane@example.com", "confidence": 1.0})
+    assert events[1] == ("field", {"fieldId": "phone", "value": "+49 30 1234", "confidence": 1.0})
+    assert ("missing", {"fieldId": "salary", "message": "Please provide Salary"}) in events
+    assert ("field", {"fieldId": "why", "value": "answer for why", "confidence": 0.7}) in events
+    assert all(data.get("fieldId") != "pw" for _, data in events)
+    assert events[-1] == ("done", {"filled": 4, "missing": 1})
+
+
+def test_stream_endpoint_rejects_missing_resume_before_streaming():
+    app = FastAPI()
+    app.include_router(router)
+    user = SimpleNamespace(id="user-1", name="Jane Doe", address=None, preferences={})
+    app.dependency_overrides[chrome_extension_api.get_user_from_token_or_clerk] = lambda: user
+    app.dependency_overrides[chrome_extension_api.get_db] = lambda: make_db()
+
+    with patch.object(FormFillerService, "load_resume", AsyncMock(return_value=False)):
+        response = TestClient(app).post(
+            "/api/chrome-extension/autofill/stream",
+            json={"formStructure": {"fields": [], "metadata": {}}},
+        )
+
+    assert response.status_code == 404
@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+from app.chunking import chunk_text, split_sections
+
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+from benchmark_chunker import run_benchmark, sample_corpus  # noqa: E402
+
+CV = """Jane Doe
+jane@example.com | Berlin
+
+Professional Summary
+Backend engineer with eight years of Python experience.
+
+WORK EXPERIENCE
+Senior Engineer | Acme | 2020 - Present
+• Led the payments platform
+
+Engineer | Globex | 2016 - 2020
+• Built data pipelines
+
+Technical Skills:
+Python, FastAPI, PostgreSQL
+
+EDUCATION
+B.Sc. Computer Science
+"""
+
+
+def test_sections_are_detected_in_order():
+    sections = split_sections(CV)
+
+    assert [section for section, _ in sections] == ["general", "summary", "experience", "skills", "education"]
+    assert sections[0][1].startswith("Jane Doe")
+    assert sections[2][1].startswith("WORK EXPERIENCE")
+    assert "Globex" in sections[2][1]
+
+
+def test_heading_words_inside_sentences_are_not_headings():
+    text = "Skills in Python and experience with FastAPI.\nMy education was in Berlin."
+    assert split_sections(text) == [("general", text)]
+
+
+def test_heading_on_first_line():
+    assert [section for section, _ in split_sections("SKILLS\nPython")] == ["skills"]
+
+
+def test_chunks_are_deterministic_and_carry_sections():
+    first = chunk_text(CV, "doc-1", header="[RESUME DOCUMENT - cv.pdf]")
+    second = chunk_text(CV, "doc-1", header="[RESUME DOCUMENT - cv.pdf]")
+
+    assert first == second
+    assert [chunk.index for chunk in first] == list(range(len(first)))
+    assert all(chunk.chunk_id.startswith("doc-1:") for chunk in first)
+    assert all(chunk.text.startswith("[RESUME DOCUMENT - cv.pdf]\n") for chunk in first)
+    assert {chunk.section_type for chunk in first} == {"general", "summary", "experience", "skills", "education"}
+
+
+def test_editing_one_section_keeps_other_chunk_ids():
+    before = {chunk.section_type: chunk.chunk_id for chunk in chunk_text(CV, "doc-1")}
+    after = {chunk.section_type: chunk.chunk_id for chunk in chunk_text(CV.replace("FastAPI", "Django"), "doc-1")}
+
+    assert before["skills"] != after["skills"]
+    assert all(before[section] == after[section] for section in before if section != "skills")
+
+
+def test_long_sections_are_split_within_limit():
+    text = "EXPERIENCE\n" + "\n\n".join(f"Role {i}: " + "built services " * 20 for i in range(20))
+    chunks = chunk_text(text, "doc-1", max_chars=500)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.text) <= 500 for chunk in chunks)
+    assert all(chunk.section_type == "experience" for chunk in chunks)
+
+
+def test_oversized_word_is_hard_split():
+    word = "".join(chr(ord("a") + i % 26) for i in range(2500))
+    chunks = chunk_text(word, "doc-1", max_chars=1000)
+    assert [len(chunk.text) for chunk in chunks] == [1000, 1000, 500]
+
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("", "doc-1") == []
+    assert chunk_text(None, "doc-1") == []
+
+
+def test_benchmark_runs_on_sample_corpus():
+    results = run_benchmark(sample_corpus(10), repeat=1)
+
+    assert set(results) == {"section_chunker", "character_splitter", "legacy_graph_rag"}
+    assert results["section_chunker"]["chunks"] > 0
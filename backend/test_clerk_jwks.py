@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.clerk import JWKSCache
+
+RSA_JWK = {
+    "kty": "RSA",
+    "alg": "RS256",
+    "use": "sig",
+    "n": "sXchDaQebHnPiGvyDOAT4saGEUetSyo9MKLOoWFsueri23bOdgWp4Dy1WlUzewbgBHod5pcM9H95GQRV3JDXboIRROSBigeC5yjU1hGzHHyXss8UDprecbAYxknTcQkhslANGRUZmdTOQ5qTRsLAt6BTYuyvVRdhS8exSZEy_c4gs_7svlJJQ4H9_NxsiIoLwAEk7-Q3UXERGYw_75IDrGA84-lA_-Ct4eTlXHBIY2EaV7t7LjJaynVJCpkv4LKjTTAumiGUIuQhrNhZLuF_RJLqHpM2kgWFLU7-VTdL1VbC2tejvcI2BlMkEpk1BzBZI0KQB0GaDWFLN-aEAw3vRw",
+    "e": "AQAB",
+}
+
+
+def make_jwks(*kids):
+    return [{**RSA_JWK, "kid": kid} for kid in kids]
+
+
+@pytest.mark.asyncio
+async def test_keys_are_parsed_once_and_looked_up_by_kid():
+    cache = JWKSCache(ttl_seconds=3600, unknown_kid_cooldown=0)
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        cache._keys = {"k1": object()}
+        cache._fetched_at = cache._last_attempt = asyncio.get_running_loop().time()
+
+    with patch.object(cache, "_fetch", AsyncMock(side_effect=fetch)) as fetch_mock:
+        keys = await asyncio.gather(*(cache.get_key("k1") for _ in range(5)))
+
+    # Single-flight: five concurrent cold lookups share one fetch
+    fetch_mock.assert_awaited_once()
+    assert all(key is keys[0] for key in keys)
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_refetch_for_rotated_keys():
+    cache = JWKSCache(ttl_seconds=3600, unknown_kid_cooldown=0)
+    responses = [make_jwks("old"), make_jwks("old", "new")]
+
+    class Response:
+        def __init__(self, keys):
+            self.keys = keys
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"keys": self.keys}
+
+    client = AsyncMock()
+    client.get.side_effect = lambda url: Response(responses.pop(0))
+    client.__aenter__.return_value = client
+
+    with patch("app.clerk.CLERK_ISSUER_URL", "https://clerk.example.com"), \
+         patch("app.clerk.httpx.AsyncClient", return_value=client):
+        assert await cache.get_key("old") is not None
+        assert await cache.get_key("new") is not None
+        assert await cache.get_key("old") is not None
+
+    assert client.get.await_count == 2
+    assert cache.stats["unknown_kid_refreshes"] == 1
+    assert cache.get_stats()["keys"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_keys_are_served_while_refreshing_in_background():
+    cache = JWKSCache(ttl_seconds=0, unknown_kid_cooldown=3600)
+    stale_key = object()
+    cache._keys = {"k1": stale_key}
+    cache._last_attempt = asyncio.get_running_loop().time()
+    refreshed = asyncio.Event()
+
+    async def fetch():
+        refreshed.set()
+
+    with patch.object(cache, "_fetch", AsyncMock(side_effect=fetch)):
+        key = await cache.get_key("k1")
+        await asyncio.wait_for(refreshed.wait(), 1)
+
+    assert key is stale_key
+    assert cache.stats["background_refreshes"] == 1
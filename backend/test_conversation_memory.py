@@ -0,0 +1,112 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.conversation_memory import (
+    HistoryEntry,
+    SUMMARY_PREFIX,
+    clip_message_content,
+    load_packed_history,
+    pack_history,
+    update_rolling_summary,
+)
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_entries(*contents):
+    return [
+        HistoryEntry(
+            created_at=START + timedelta(minutes=i),
+            message=(HumanMessage if i % 2 == 0 else AIMessage)(content=content),
+        )
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_clip_keeps_head_and_tail_of_large_messages():
+    content = "A" * 10000 + "Z" * 10000
+    clipped = clip_message_content(content, max_tokens=100)
+
+    assert clipped.startswith("A" * 200)
+    assert clipped.endswith("Z" * 100)
+    assert "characters omitted" in clipped
+    assert clip_message_content("short") == "short"
+
+
+def test_pack_history_keeps_newest_messages_within_budget():
+    entries = make_entries("a" * 400, "b" * 400, "c" * 400, "d" * 40)
+
+    kept, aged_out = pack_history(entries, token_budget=150)
+
+    assert [m.content[0] for m in kept] == ["c", "d"]
+    assert aged_out == entries[:2]
+    assert isinstance(kept[0], HumanMessage) and isinstance(kept[1], AIMessage)
+
+
+def test_pack_history_never_drops_or_clips_the_newest_message():
+    entries = make_entries("old", "x" * 50000)
+
+    kept, aged_out = pack_history(entries, token_budget=10)
+
+    assert kept[-1].content == "x" * 50000
+    assert aged_out == entries[:1]
+
+
+@pytest.mark.asyncio
+async def test_load_packed_history_prepends_summary_and_schedules_aged_messages():
+    summary = SimpleNamespace(summary="User wants backend roles in Berlin.", summarized_until=START,
+                              summarized_until_id="m0")
+    rows = [
+        SimpleNamespace(id=f"m{i}", user_id="u1", message=text, is_user_message=i % 2 == 0,
+                        created_at=START + timedelta(minutes=i + 1))
+        for i, text in enumerate(["first " * 200, "second " * 200, "latest question"])
+    ]
+    summary_result = MagicMock()
+    summary_result.scalar_one_or_none.return_value = summary
+    rows_result = MagicMock()
+    rows_result.scalars.return_value.all.return_value = list(reversed(rows))
+    db = AsyncMock()
+    db.execute.side_effect = [summary_result, rows_result]
+
+    with patch("app.conversation_memory.schedule_summary_update") as schedule:
+        history = await load_packed_history("u1", "page-1", db, token_budget=420)
+
+    assert history[0].content.startswith(SUMMARY_PREFIX)
+    assert "Berlin" in history[0].content
+    assert [m.content for m in history[1:]] == [rows[1].message.strip(), "latest question"]
+    user_id, page_id, aged_out = schedule.call_args.args
+    assert (user_id, page_id) == ("u1", "page-1")
+    assert [entry.created_at for entry in aged_out] == [rows[0].created_at]
+    # Later reads skip what was summarized, including messages sharing the watermark's timestamp
+    query = str(db.execute.await_args_list[1].args[0].compile(compile_kwargs={"literal_binds": True}))
+    assert "chat_messages.id > 'm0'" in query
+
+
+@pytest.mark.asyncio
+async def test_messages_sharing_the_watermark_timestamp_are_still_summarized():
+    summary = SimpleNamespace(summary="Earlier.", summarized_until=START, summarized_until_id="m1",
+                              summarized_message_count=3)
+    entries = [
+        HistoryEntry(created_at=START, message=HumanMessage(content=f"message {i}"), message_id=f"m{i}")
+        for i in range(3)
+    ] + [HistoryEntry(created_at=START + timedelta(seconds=1), message=AIMessage(content="reply"), message_id="m0")]
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = summary
+    db = AsyncMock()
+    db.execute.return_value = result
+    session = MagicMock()
+    session.return_value.__aenter__ = AsyncMock(return_value=db)
+    session.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("app.conversation_memory.async_session_maker", session), \
+         patch("app.conversation_memory.summarize_incrementally", AsyncMock(return_value="Updated.")) as summarize:
+        await update_rolling_summary("u1", "page-1", entries)
+
+    assert [m.content for m in summarize.await_args.args[1]] == ["message 2", "reply"]
+    assert (summary.summarized_until, summary.summarized_until_id) == (START + timedelta(seconds=1), "m0")
+    assert summary.summarized_message_count == 5
+    db.commit.assert_awaited_once()
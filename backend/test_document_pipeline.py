@@ -0,0 +1,162 @@
+import asyncio
+import io
+import time
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import UploadFile
+
+from app.document_pipeline import (
+    COMPLETED,
+    FAILED,
+    DocumentJob,
+    DocumentPipeline,
+    find_upload,
+    save_upload_file,
+)
+
+
+class FakeSession:
+    def __init__(self, documents):
+        self.documents = documents
+        self.commit = AsyncMock()
+
+    async def get(self, model, document_id):
+        return self.documents.get(document_id)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_upload_is_streamed_in_chunks(tmp_path):
+    data = b"x" * 2500
+    upload = UploadFile(file=io.BytesIO(data), filename="notes.txt")
+    reads = []
+    original_read = upload.read
+
+    async def read(size=-1):
+        reads.append(size)
+        return await original_read(size)
+
+    upload.read = read
+    size = await save_upload_file(upload, tmp_path / "notes.txt", chunk_size=1000)
+
+    assert size == 2500
+    assert (tmp_path / "notes.txt").read_bytes() == data
+    assert reads == [1000, 1000, 1000, 1000]
+
+
+def test_find_upload_matches_document_prefix(tmp_path):
+    user_dir = tmp_path / "user-1"
+    user_dir.mkdir()
+    (user_dir / "doc-1_cv.pdf").write_bytes(b"%PDF")
+    (user_dir / "doc-2_letter.txt").write_text("hi")
+
+    assert find_upload(tmp_path, "user-1", "doc-1") == user_dir / "doc-1_cv.pdf"
+    assert find_upload(tmp_path, "user-1", "doc-3") is None
+
+
+@pytest.mark.asyncio
+async def test_job_extracts_stores_and_embeds(tmp_path):
+    path = tmp_path / "doc-1_cv.txt"
+    path.write_text("Senior Python developer")
+    document = SimpleNamespace(id="doc-1", user_id="user-1", content=None)
+    session = FakeSession({"doc-1": document})
+    add_to_store = AsyncMock()
+    publish = MagicMock()
+    pipeline = DocumentPipeline(workers=1)
+
+    with patch("app.document_pipeline.async_session_maker", return_value=session), \
+            patch("app.vector_store.add_document_to_vector_store", add_to_store), \
+            patch("app.document_pipeline.publish_user_event", publish):
+        pipeline.submit(DocumentJob("doc-1", "user-1", path, "cv.txt"))
+        job = await pipeline.wait("doc-1", timeout=5)
+        await pipeline.stop()
+
+    assert job.status == COMPLETED
+    assert document.content == "Senior Python developer"
+    session.commit.assert_awaited_once()
+    add_to_store.assert_awaited_once_with(document, session)
+    publish.assert_called_once()
+    assert pipeline.get_stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deleted_document_marks_job_failed(tmp_path):
+    path = tmp_path / "doc-1_cv.txt"
+    path.write_text("text")
+    pipeline = DocumentPipeline(workers=1)
+
+    with patch("app.document_pipeline.async_session_maker", return_value=FakeSession({})):
+        pipeline.submit(DocumentJob("doc-1", "user-1", path, "cv.txt"))
+        job = await pipeline.wait("doc-1", timeout=5)
+        await pipeline.stop()
+
+    assert job.status == FAILED
+    assert "deleted" in job.error
+    assert pipeline.get_stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failure_is_recorded_and_not_queued_again(tmp_path):
+    from app.documents import get_document_status
+
+    path = tmp_path / "doc-1_cv.txt"
+    path.write_text("text")
+    document = SimpleNamespace(id="doc-1", user_id="user-1", content=None, processing_error=None)
+    pipeline = DocumentPipeline(workers=1)
+
+    with patch("app.document_pipeline.async_session_maker", return_value=FakeSession({"doc-1": document})), \
+            patch("app.document_pipeline.text_extractor.extract", AsyncMock(side_effect=ValueError("Encrypted PDF"))):
+        pipeline.submit(DocumentJob("doc-1", "user-1", path, "cv.txt"))
+        await pipeline.wait("doc-1", timeout=5)
+        await pipeline.stop()
+    assert document.processing_error == "Encrypted PDF"
+
+    # After the job is pruned, polling reports the recorded failure instead of resubmitting
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = document
+    db = SimpleNamespace(execute=AsyncMock(return_value=result))
+    with patch("app.documents.document_pipeline") as documents_pipeline, \
+            patch("app.documents.find_upload", return_value=path):
+        documents_pipeline.get_job.return_value = None
+        status = await get_document_status("doc-1", db=db, db_user=SimpleNamespace(id="user-1"))
+
+    assert status == {"document_id": "doc-1", "status": FAILED, "error": "Encrypted PDF"}
+    documents_pipeline.submit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_before_processing(tmp_path):
+    path = tmp_path / "doc-1_cv.txt"
+    path.write_text("text")
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_embed(document, db):
+        started.set()
+        await release.wait()
+
+    document = SimpleNamespace(id="doc-1", user_id="user-1", content=None)
+    pipeline = DocumentPipeline(workers=1)
+    with patch("app.document_pipeline.async_session_maker", return_value=FakeSession({"doc-1": document})), \
+            patch("app.vector_store.add_document_to_vector_store", slow_embed), \
+            patch("app.document_pipeline.publish_user_event"):
+        begin = time.perf_counter()
+        job = pipeline.submit(DocumentJob("doc-1", "user-1", path, "cv.txt"))
+        assert time.perf_counter() - begin < 0.05
+        assert not job.done
+
+        await asyncio.wait_for(started.wait(), 5)
+        assert job.status == "embedding"
+        release.set()
+        await pipeline.wait("doc-1", timeout=5)
+        await pipeline.stop()
+
+    assert job.status == COMPLETED
@@ -0,0 +1,114 @@
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.embedding_service import EmbeddingService, TokenBucket, is_retryable
+
+
+def make_client(fail_times=0, error="429 Resource has been exhausted"):
+    client = MagicMock()
+    state = {"failures": 0}
+
+    async def aembed_documents(texts, task_type=None, batch_size=None):
+        if state["failures"] < fail_times:
+            state["failures"] += 1
+            raise RuntimeError(error)
+        await asyncio.sleep(0)
+        return [[float(len(text)), 1.0 if task_type == "RETRIEVAL_QUERY" else 0.0] for text in texts]
+
+    client.aembed_documents = AsyncMock(side_effect=aembed_documents)
+    client.embed_documents = MagicMock(
+        side_effect=lambda texts, task_type=None, batch_size=None: [[float(len(text)), 0.0] for text in texts]
+    )
+    return client
+
+
+def make_service(client, **kwargs):
+    options = {"batch_window_ms": 5, "requests_per_minute": 60000, "burst": 100}
+    options.update(kwargs)
+    return EmbeddingService(client=client, **options)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_are_coalesced_into_one_batch():
+    client = make_client()
+    service = make_service(client)
+
+    results = await asyncio.gather(
+        service.aembed_documents(["resume chunk", "skills"]),
+        service.aembed_documents(["resume chunk", "projects"]),
+        service.aembed_query("python jobs"),
+    )
+
+    assert results[0] == [[12.0, 0.0], [6.0, 0.0]]
+    assert results[1][0] == [12.0, 0.0]
+    assert results[2] == [11.0, 1.0]
+    # One request per task type; the duplicated chunk is sent once
+    assert client.aembed_documents.await_count == 2
+    document_call = [call for call in client.aembed_documents.await_args_list if call.kwargs["task_type"] == "RETRIEVAL_DOCUMENT"][0]
+    assert document_call.args[0] == ["resume chunk", "skills", "projects"]
+    assert service.stats["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_vectors_are_never_embedded_twice():
+    client = make_client()
+    service = make_service(client)
+
+    await service.aembed_documents(["same chunk"])
+    await service.aembed_documents(["same chunk"])
+    assert service.embed_documents(["same chunk"]) == [[10.0, 0.0]]
+
+    assert client.aembed_documents.await_count == 1
+    client.embed_documents.assert_not_called()
+    assert service.stats["cache_hits"] == 2
+
+
+def test_cached_vectors_are_stored_compactly():
+    service = make_service(make_client())
+    service._cache_set("key", [0.25] * 768)
+
+    assert service._cache["key"].dtype == np.float32
+    assert service._cache["key"].nbytes == 768 * 4
+    assert service._cache_get("key") == [0.25] * 768
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_at_max_batch_size():
+    client = make_client()
+    service = make_service(client, max_batch_size=3)
+
+    vectors = await service.aembed_documents([f"text {i}" for i in range(7)])
+
+    assert len(vectors) == 7
+    assert [len(call.args[0]) for call in client.aembed_documents.await_args_list] == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_errors_are_retried_and_other_errors_are_not(monkeypatch):
+    monkeypatch.setattr("app.embedding_service.backoff_delay", lambda attempt: 0)
+
+    client = make_client(fail_times=2)
+    service = make_service(client)
+    assert await service.aembed_query("hello") == [5.0, 1.0]
+    assert service.stats["retries"] == 2
+
+    client = make_client(fail_times=1, error="400 invalid argument")
+    service = make_service(client)
+    with pytest.raises(RuntimeError):
+        await service.aembed_query("hello")
+    # A failed text can be requested again
+    assert await service.aembed_query("hello") == [5.0, 1.0]
+
+
+def test_token_bucket_spaces_out_bursts():
+    bucket = TokenBucket(rate_per_second=10, capacity=2)
+    waits = [bucket._reserve() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+    assert is_retryable(RuntimeError("429 Resource has been exhausted"))
+    assert not is_retryable(ValueError("invalid api key"))
@@ -0,0 +1,87 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.vector_store import (
+    VectorSyncResult,
+    migrate_user_faiss_indexes,
+    remove_legacy_faiss_index,
+    search_document_chunks,
+)
+
+
+def make_db(documents):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = documents
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+def test_only_faiss_directories_are_removed(tmp_path):
+    faiss_dir = tmp_path / "faiss_doc-1"
+    faiss_dir.mkdir()
+    (faiss_dir / "index.faiss").write_bytes(b"")
+    upload = tmp_path / "doc-2_cv.pdf"
+    upload.write_bytes(b"%PDF")
+
+    assert remove_legacy_faiss_index(str(faiss_dir))
+    assert not faiss_dir.exists()
+    assert not remove_legacy_faiss_index(str(upload))
+    assert upload.exists()
+    assert not remove_legacy_faiss_index(None)
+
+
+@pytest.mark.asyncio
+async def test_migration_syncs_content_and_removes_indexes(tmp_path):
+    faiss_dir = tmp_path / "faiss_doc-1"
+    faiss_dir.mkdir()
+    documents = [
+        SimpleNamespace(id="doc-1", content="Python developer", vector_store_path=str(faiss_dir)),
+        SimpleNamespace(id="doc-2", content="Cover letter", vector_store_path=str(tmp_path / "doc-2_cv.pdf")),
+        SimpleNamespace(id="doc-3", content=None, vector_store_path=str(tmp_path / "faiss_doc-3")),
+    ]
+    db = make_db(documents)
+    sync = AsyncMock(return_value=VectorSyncResult(embedded=4))
+
+    with patch("app.vector_store.PGVector"), patch("app.vector_store._sync_documents", sync):
+        result = await migrate_user_faiss_indexes("user-1", db, delete_files=True)
+
+    synced = sync.await_args.args[2]
+    assert [doc.id for doc in synced] == ["doc-1", "doc-2"]
+    assert sync.await_args.kwargs["prune_missing"] is False
+    assert (result.documents, result.embedded, result.files_removed, result.failed) == (3, 4, 1, 1)
+    assert not faiss_dir.exists()
+    assert documents[0].vector_store_path is None
+    assert documents[1].vector_store_path is None
+    # Without content there is nothing to rebuild from; the reference is kept
+    assert documents[2].vector_store_path is not None
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_migration_keeps_index_paths_without_delete_flag(tmp_path):
+    faiss_dir = tmp_path / "faiss_doc-1"
+    faiss_dir.mkdir()
+    document = SimpleNamespace(id="doc-1", content="Python developer", vector_store_path=str(faiss_dir))
+
+    with patch("app.vector_store.PGVector"), \
+         patch("app.vector_store._sync_documents", AsyncMock(return_value=VectorSyncResult())):
+        result = await migrate_user_faiss_indexes("user-1", make_db([document]))
+
+    assert result.files_removed == 0
+    assert faiss_dir.exists()
+    assert document.vector_store_path == str(faiss_dir)
+
+
+@pytest.mark.asyncio
+async def test_document_search_filters_on_document_id():
+    vector_store = MagicMock()
+    vector_store.asimilarity_search = AsyncMock(return_value=[SimpleNamespace(page_content="chunk")])
+    document = SimpleNamespace(id="doc-1")
+
+    with patch("app.vector_store.add_document_to_vector_store", AsyncMock(return_value=vector_store)):
+        chunks = await search_document_chunks(document, "python", AsyncMock(), k=3)
+
+    assert chunks == ["chunk"]
+    vector_store.asimilarity_search.assert_awaited_once_with("python", k=3, filter={"document_id": "doc-1"})
@@ -0,0 +1,137 @@
+import asyncio
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.documents import Document as LCDocument
+
+from app.graph_rag import EnhancedGraphRAG
+from app.graph_rag_index import GraphRagIndex
+from app.rag import rag_assist
+
+
+class SlowLLM:
+    """Records how many calls overlap"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return SimpleNamespace(content=f"reply {self.calls}")
+
+
+def make_graph_rag(llm):
+    embeddings = AsyncMock()
+    embeddings.aembed_documents.side_effect = lambda texts, **kwargs: [[1.0, 0.0] for _ in texts]
+    docs = [
+        LCDocument(page_content="Python developer", metadata={"skills": ["Python"], "section_type": "experience"}),
+        LCDocument(page_content="Django projects", metadata={"skills": ["Python"], "section_type": "projects"}),
+    ]
+
+    graph_rag = EnhancedGraphRAG.__new__(EnhancedGraphRAG)
+    graph_rag.user_id = "user-1"
+    graph_rag.db = MagicMock()
+    graph_rag.llm = llm
+    graph_rag.embeddings = embeddings
+    graph_rag.vector_store = GraphRagIndex(docs, np.array([[1.0, 0.0], [0.8, 0.6]]), embeddings)
+    graph_rag.graph_retriever = graph_rag.vector_store.graph(graph_rag._define_graph_edges())
+    graph_rag._analyze_job_description = AsyncMock(return_value={"job_title": "Engineer", "required_skills": ["python"]})
+    graph_rag._track_search_behavior = AsyncMock()
+    return graph_rag
+
+
+@pytest.mark.asyncio
+async def test_contextualized_information_fans_out_generations():
+    llm = SlowLLM()
+    graph_rag = make_graph_rag(llm)
+    questions = [f"Question {i}?" for i in range(6)]
+
+    with patch("app.graph_rag.LLM_CONCURRENCY_LIMIT", 3):
+        context = await graph_rag.get_job_application_context("Python engineer", questions)
+
+    # One embedding request for all 3 + 6 retrieval queries
+    assert graph_rag.embeddings.aembed_documents.await_count == 1
+    assert len(graph_rag.embeddings.aembed_documents.await_args.args[0]) == 9
+    assert graph_rag._track_search_behavior.await_count == 9
+
+    assert llm.calls == 8
+    assert llm.max_running == 3
+    assert [answer["question"] for answer in context["form_answers"]] == questions
+    assert all(answer["answer"].startswith("reply") for answer in context["form_answers"])
+    assert context["cover_letter"] and context["optimized_resume"]
+    assert context["job_analysis"]["job_title"] == "Engineer"
+    assert context["relevant_experience"][0] == "Python developer"
+
+
+@pytest.mark.asyncio
+async def test_partial_results_are_yielded_as_they_finish():
+    graph_rag = make_graph_rag(SlowLLM(delay=0))
+
+    async def slow_cover_letter(*args):
+        await asyncio.sleep(0.05)
+        return "letter"
+
+    graph_rag._generate_smart_cover_letter = slow_cover_letter
+
+    events = [event["type"] async for event in graph_rag.iter_contextualized_information("job", ["Why us?"])]
+
+    assert events[:2] == ["job_analysis", "relevant_experience"]
+    assert events[-1] == "cover_letter"
+    assert sorted(events[2:4]) == ["form_answer", "optimized_resume"]
+
+
+@pytest.mark.asyncio
+async def test_rag_assist_answers_questions_concurrently_in_order():
+    llm = SlowLLM()
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(
+        scalars=MagicMock(return_value=MagicMock(first=MagicMock(return_value=SimpleNamespace(
+            id="doc-1", content="CV text"
+        ))))
+    ))
+
+    with patch("app.rag.ChatGoogleGenerativeAI", return_value=llm), \
+         patch("app.rag.search_document_chunks", AsyncMock(return_value=[])):
+        result = await rag_assist(
+            task="apply",
+            job_description="job",
+            db=db,
+            user=SimpleNamespace(id="user-1"),
+            form_questions=["a", "b", "c"],
+        )
+
+    assert [answer["question"] for answer in result["answers"]] == ["a", "b", "c"]
+    assert llm.max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_stopping_early_cancels_pending_generations():
+    graph_rag = make_graph_rag(SlowLLM(delay=0))
+    cancelled = []
+
+    async def slow_cover_letter(*args):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("cover_letter")
+            raise
+
+    graph_rag._generate_smart_cover_letter = slow_cover_letter
+
+    events = graph_rag.iter_contextualized_information("job", ["Why us?"])
+    async for event in events:
+        if event["type"] == "optimized_resume":
+            break
+    await events.aclose()
+    await asyncio.sleep(0)
+
+    assert cancelled == ["cover_letter"]
@@ -0,0 +1,143 @@
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock
+
+from langchain_core.documents import Document as LCDocument
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.graph_rag_index import (
+    GraphRagIndexStore,
+    IndexSource,
+    content_hash,
+    get_cached_metadata,
+    store_cached_metadata,
+)
+from app.models_db import Base, GraphRagChunk, GraphRagMetadata
+
+DIMENSIONS = 768
+TOPICS = ["python", "kubernetes", "marketing"]
+
+
+def embed(text):
+    # One-hot per topic keyword so similarity is predictable
+    vector = [0.0] * DIMENSIONS
+    for i, topic in enumerate(TOPICS):
+        if topic in text.lower():
+            vector[i] = 1.0
+    vector[DIMENSIONS - 1] = 0.01
+    return vector
+
+
+def make_embeddings():
+    embeddings = AsyncMock()
+    embeddings.aembed_documents.side_effect = lambda texts: [embed(text) for text in texts]
+    embeddings.aembed_query.side_effect = embed
+    return embeddings
+
+
+def make_source(source_id, *texts):
+    build_chunks = AsyncMock(return_value=[
+        LCDocument(page_content=text, metadata={"document_id": source_id}) for text in texts
+    ])
+    return IndexSource(source_id=source_id, content_hash=content_hash(*texts), build_chunks=build_chunks)
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(
+                sync_conn, tables=[GraphRagChunk.__table__, GraphRagMetadata.__table__]
+            )
+        )
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_only_changed_sources_are_rebuilt_and_embedded(db):
+    store = GraphRagIndexStore()
+    embeddings = make_embeddings()
+    resume = make_source("document:1", "Python developer", "Kubernetes operator")
+    profile = make_source("user_profile", "Marketing background")
+
+    index = await store.get_index("user-1", [resume, profile], embeddings, db)
+    assert len(index) == 3
+    assert embeddings.aembed_documents.await_count == 1
+
+    # Unchanged sources: served from memory without touching the builders or the embedder
+    same = await store.get_index("user-1", [resume, profile], embeddings, db)
+    assert same is index
+    assert embeddings.aembed_documents.await_count == 1
+
+    # A fresh process reloads the persisted chunks without re-embedding
+    reloaded = await GraphRagIndexStore().get_index("user-1", [resume, profile], embeddings, db)
+    assert len(reloaded) == 3
+    assert embeddings.aembed_documents.await_count == 1
+
+    # Editing one document rebuilds that document only and drops its old chunks
+    edited = make_source("document:1", "Python and Kubernetes engineer")
+    index = await store.get_index("user-1", [edited, profile], embeddings, db)
+    assert embeddings.aembed_documents.await_args.args[0] == ["Python and Kubernetes engineer"]
+    profile.build_chunks.assert_awaited_once()
+    assert sorted(doc.page_content for doc in index.documents) == [
+        "Marketing background", "Python and Kubernetes engineer"
+    ]
+
+    # Deleting a document removes its rows
+    await store.get_index("user-1", [profile], embeddings, db)
+    rows = (await db.execute(select(GraphRagChunk.source_id))).scalars().all()
+    assert rows == ["user_profile"]
+
+
+@pytest.mark.asyncio
+async def test_index_search_ranks_by_cosine_and_filters(db):
+    store = GraphRagIndexStore()
+    index = await store.get_index(
+        "user-1",
+        [make_source("document:1", "Python developer", "Kubernetes operator"),
+         make_source("user_profile", "Marketing background")],
+        make_embeddings(),
+        db,
+    )
+
+    results = await index.asimilarity_search("kubernetes clusters", k=1)
+    assert [doc.page_content for doc in results] == ["Kubernetes operator"]
+
+    results = await index.asimilarity_search("python", k=2, filter={"document_id": "user_profile"})
+    assert [doc.page_content for doc in results] == ["Marketing background"]
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_roundtrip(db):
+    key = content_hash("resume", "Python developer")
+    assert await get_cached_metadata(key, db) is None
+
+    await store_cached_metadata(key, {"skills": ["Python"]}, db)
+    await store_cached_metadata(key, {"skills": ["ignored"]}, db)
+    await db.commit()
+
+    assert await get_cached_metadata(key, db) == {"skills": ["Python"]}
+
+
+@pytest.mark.asyncio
+async def test_users_with_the_same_sources_get_separate_chunks(db):
+    store = GraphRagIndexStore()
+    embeddings = make_embeddings()
+    # Knowledge documents and the profile source id are shared between users
+    industry = make_source("industry_technology", "Python and Kubernetes trends")
+    profile = make_source("user_profile", "Marketing background")
+
+    first = await store.get_index("user-1", [industry, profile], embeddings, db)
+    second = await store.get_index("user-2", [industry, profile], embeddings, db)
+
+    assert len(first) == 2 and len(second) == 2
+    rows = (await db.execute(select(GraphRagChunk.user_id))).scalars().all()
+    assert sorted(rows) == ["user-1", "user-1", "user-2", "user-2"]
+
+    # Re-indexing one user leaves the other's chunks alone
+    await store.get_index("user-1", [profile], embeddings, db)
+    assert len(await GraphRagIndexStore().get_index("user-2", [industry, profile], embeddings, db)) == 2
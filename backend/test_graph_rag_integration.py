@@ -60,14 +60,14 @@ async def test_graph_rag_basic():
         print(f"   Experience Level: {metadata.get('experience_level', 'N/A')}")
         print(f"   Job Titles: {metadata.get('job_titles', [])}")
         
-        # Test section splitting
-        sections = rag_instance._split_into_sections(test_content)
-        print(f"📝 Document split into {len(sections)} sections")
+        # Test section-aware chunking
+        from app.chunking import chunk_text
+        chunks = chunk_text(test_content, "test_doc")
+        print(f"📝 Document split into {len(chunks)} chunks")
         
         # Test section type identification
-        for i, section in enumerate(sections[:3]):  # Test first 3 sections
-            section_type = rag_instance._identify_section_type(section)
-            print(f"   Section {i+1}: {section_type} ({len(section)} chars)")
+        for i, chunk in enumerate(chunks[:3]):  # Test first 3 chunks
+            print(f"   Chunk {i+1}: {chunk.section_type} ({len(chunk.text)} chars)")
         
         print("\n✅ Basic Graph RAG functionality tests passed!")
         return True
@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+from langchain_core.documents import Document as LCDocument
+
+from app.graph_rag_index import GraphRagIndex
+from app.graph_retriever import GraphTraversalIndex
+
+EDGES = [("skills", "skills"), ("technologies", "technologies"), ("section_type", "section_type")]
+
+
+def make_docs():
+    return [
+        LCDocument(page_content="Built Python APIs", metadata={"skills": ["Python"], "section_type": "experience"}),
+        LCDocument(page_content="Django and FastAPI projects", metadata={"skills": ["python", "Django"]}),
+        LCDocument(page_content="Django admin work", metadata={"skills": ["Django"]}),
+        LCDocument(page_content="Marketing campaigns", metadata={"skills": ["SEO"], "technologies": ["HubSpot"]}),
+    ]
+
+
+def test_inverted_indexes_and_adjacency():
+    graph = GraphTraversalIndex(make_docs(), EDGES)
+
+    assert graph.lookup("skills", "PYTHON").tolist() == [0, 1]
+    assert graph.lookup("technologies", "hubspot").tolist() == [3]
+    assert graph.lookup("skills", "Rust").tolist() == []
+    assert graph.neighbors(0).tolist() == [1]
+    assert graph.neighbors(1).tolist() == [0, 2]
+    assert graph.neighbors(3).tolist() == []
+
+
+def test_eager_traversal_reaches_chunks_through_shared_attributes():
+    graph = GraphTraversalIndex(make_docs(), EDGES)
+    vectors = np.eye(4, dtype=np.float32)
+    # Only chunk 0 matches the query; chunk 2 is two hops away
+    scores = np.array([1.0, 0.0, 0.0, 0.1], dtype=np.float32)
+
+    assert graph.traverse(scores, vectors, k=3, start_k=1, max_depth=2) == [0, 1, 2]
+    assert graph.traverse(scores, vectors, k=3, start_k=1, max_depth=1) == [0, 1, 3]
+
+
+def test_mmr_prefers_diverse_chunks():
+    docs = [LCDocument(page_content=str(i), metadata={"skills": ["python"]}) for i in range(3)]
+    graph = GraphTraversalIndex(docs, EDGES)
+    vectors = np.array([[1, 0], [1, 0], [0.6, 0.8]], dtype=np.float32)
+    scores = np.array([1.0, 0.99, 0.6], dtype=np.float32)
+
+    assert graph.traverse(scores, vectors, k=2, start_k=1, strategy="eager") == [0, 1]
+    assert graph.traverse(scores, vectors, k=2, start_k=1, strategy="mmr") == [0, 2]
+    with pytest.raises(ValueError):
+        graph.traverse(scores, vectors, strategy="random")
+
+
+def test_traversal_is_sub_millisecond_on_a_large_index():
+    rng = np.random.default_rng(0)
+    skills = [f"skill{i}" for i in range(200)]
+    docs = [
+        LCDocument(page_content=str(i), metadata={
+            "skills": list(rng.choice(skills, 5)), "section_type": ["experience", "skills", "education"][i % 3]
+        })
+        for i in range(1000)
+    ]
+    graph = GraphTraversalIndex(docs, EDGES)
+    vectors = rng.normal(size=(1000, 32)).astype(np.float32)
+    scores = vectors @ vectors[0]
+
+    graph.traverse(scores, vectors, k=8)
+    runs = 50
+    started = time.perf_counter()
+    for _ in range(runs):
+        graph.traverse(scores, vectors, k=8)
+    assert (time.perf_counter() - started) / runs < 0.001
+
+
+@pytest.mark.asyncio
+async def test_index_graph_search_and_graph_reuse():
+    embeddings = AsyncMock()
+    embeddings.aembed_query.return_value = [1.0, 0.0, 0.0, 0.0]
+    index = GraphRagIndex(make_docs(), np.eye(4, dtype=np.float32), embeddings)
+
+    results = await index.agraph_search("python", EDGES, k=3, start_k=1, max_depth=2)
+
+    assert [doc.page_content for doc in results] == ["Built Python APIs", "Django and FastAPI projects", "Django admin work"]
+    assert index.graph(EDGES) is index.graph(list(EDGES))
@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.job_analysis import (
+    FALLBACK_ANALYSIS,
+    JobAnalysisService,
+    job_description_hash,
+    normalize_job_url,
+    parse_analysis,
+)
+from app.models_db import Base, JobAnalysis
+
+ANALYSIS = {"job_title": "Backend Engineer", "company": "Acme", "required_skills": ["Python"]}
+JD = "Backend Engineer at Acme.\n\nWe need  Python and PostgreSQL experience."
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[JobAnalysis.__table__]))
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    with patch("app.job_analysis.async_session_maker", maker):
+        yield maker
+    await engine.dispose()
+
+
+def make_service(reply=json.dumps(ANALYSIS), delay=0.0):
+    service = JobAnalysisService(ttl_hours=1)
+
+    async def ainvoke(prompt):
+        await asyncio.sleep(delay)
+        return SimpleNamespace(content=reply)
+
+    service._llm = SimpleNamespace(ainvoke=AsyncMock(side_effect=ainvoke))
+    return service
+
+
+def test_description_hash_ignores_case_and_whitespace():
+    assert job_description_hash(JD) == job_description_hash("  backend engineer AT acme. we need python and postgresql experience. ")
+    assert job_description_hash(JD) != job_description_hash("Frontend Engineer at Acme.")
+
+
+def test_url_normalization_drops_tracking_parameters():
+    assert normalize_job_url("https://Jobs.Example.com/view/42/?utm_source=x&id=7#apply") == "https://jobs.example.com/view/42?id=7"
+    assert normalize_job_url("  ") is None
+
+
+def test_parse_analysis_accepts_code_fences():
+    assert parse_analysis("```json\n" + json.dumps(ANALYSIS) + "\n```") == ANALYSIS
+    with pytest.raises(ValueError):
+        parse_analysis("no json here")
+
+
+@pytest.mark.asyncio
+async def test_posting_is_analyzed_once_across_calls(session_maker):
+    service = make_service()
+
+    first = await service.analyze(JD)
+    # Another feature sees the same posting with different whitespace
+    second = await service.analyze(JD.replace("\n\n", " "))
+
+    assert first == second == ANALYSIS
+    assert service.llm.ainvoke.await_count == 1
+    assert service.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_llm_call(session_maker):
+    service = make_service(delay=0.05)
+
+    results = await asyncio.gather(*(service.analyze(JD) for _ in range(5)))
+
+    assert all(result == ANALYSIS for result in results)
+    assert service.llm.ainvoke.await_count == 1
+    assert service.stats["shared"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_shared_analysis(session_maker):
+    service = make_service(delay=0.05)
+
+    leader = asyncio.create_task(service.analyze(JD))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(service.analyze(JD))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await follower == ANALYSIS
+    assert leader.cancelled()
+    assert service.llm.ainvoke.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_url_lookup_finds_analysis_of_different_scrape(session_maker):
+    service = make_service()
+    await service.analyze(JD, source_url="https://jobs.example.com/42?utm_source=mail")
+
+    assert await service.lookup(source_url="https://jobs.example.com/42") == ANALYSIS
+    assert await service.lookup(source_url="https://jobs.example.com/43") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_analysis_is_refreshed(session_maker):
+    service = make_service()
+    await service.analyze(JD)
+    async with session_maker() as db:
+        await db.execute(update(JobAnalysis).values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)))
+        await db.commit()
+
+    assert await service.lookup(JD) is None
+    await service.analyze(JD)
+    assert service.llm.ainvoke.await_count == 2
+    assert await service.lookup(JD) == ANALYSIS
+
+
+@pytest.mark.asyncio
+async def test_failed_analysis_uses_fallback_and_is_not_stored(session_maker):
+    service = make_service(reply="Sorry, I cannot help")
+
+    assert await service.analyze(JD) == FALLBACK_ANALYSIS
+    assert await service.analyze(JD, fallback={}) == {}
+    assert await service.lookup(JD) is None
+    assert service.stats["errors"] == 2
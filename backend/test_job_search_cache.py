@@ -0,0 +1,220 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.job_search_cache import JobSearchCache, normalize_query
+from app.linkedin_jobs_service import LinkedInJobsService
+from app.node_worker_pool import NodeWorkerError
+
+STUB_WORKER = [sys.executable, str(Path(__file__).parent / "scripts" / "stub_linkedin_worker.py")]
+
+QUERY = normalize_query("Software Engineer", "Berlin", "past week")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("app.job_search_cache.time.monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def cache():
+    return JobSearchCache(stale_seconds=50, ttl_seconds={"24hr": 10, "past week": 100}, default_ttl=30, empty_ttl=5)
+
+
+class Upstream:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.error = None
+        self.empty = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [] if self.empty else [f"job {self.calls}"]
+
+
+def test_equivalent_searches_share_a_key():
+    assert normalize_query("  software   ENGINEER ", "berlin", "Week") == QUERY
+    assert normalize_query("Software Engineer", "Berlin", "7d", page=None) == QUERY
+    assert normalize_query("Software Engineer", "Berlin", "past week", page=1) != QUERY
+    assert normalize_query("Software Engineer", "Berlin", "past week", remote_filter="Remote") != QUERY
+    assert normalize_query("x", date_since_posted="Past 24 Hours").date_since_posted == "24hr"
+
+
+def test_ttl_follows_the_date_window(cache):
+    assert cache.ttl_for(normalize_query("x", date_since_posted="24hr")) == 10
+    assert cache.ttl_for(normalize_query("x", date_since_posted="past week")) == 100
+    assert cache.ttl_for(normalize_query("x", date_since_posted="anytime")) == 30
+
+
+@pytest.mark.asyncio
+async def test_fresh_results_are_served_from_cache(clock, cache):
+    upstream = Upstream()
+
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 1"]
+    clock.now += 99
+    assert await cache.get_or_fetch(normalize_query("software engineer", "BERLIN", "week"), upstream) == ["job 1"]
+
+    assert upstream.calls == 1
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["upstream_calls_saved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_results_are_served_while_refreshing(clock, cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(QUERY, upstream)
+
+    clock.now += 120
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 1"]
+    await cache.wait_refreshes()
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 2"]
+
+    assert upstream.calls == 2
+    assert cache.stats["stale_hits"] == 1 and cache.stats["refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_results_are_fetched_again(clock, cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(QUERY, upstream)
+
+    clock.now += 151
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 2"]
+    assert cache.stats["misses"] == 2 and cache.stats["refreshes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_share_one_upstream_call(cache):
+    upstream = Upstream(delay=0.05)
+
+    results = await asyncio.gather(*(cache.get_or_fetch(QUERY, upstream) for _ in range(10)))
+
+    assert results == [["job 1"]] * 10
+    assert upstream.calls == 1
+    stats = cache.get_stats()
+    assert stats["shared"] == 9
+    assert stats["upstream_calls_saved"] == 9
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_search_does_not_cancel_shared_fetch(cache):
+    upstream = Upstream(delay=0.05)
+
+    leader = asyncio.create_task(cache.get_or_fetch(QUERY, upstream))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_fetch(QUERY, upstream))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await follower == ["job 1"]
+    assert leader.cancelled()
+    assert upstream.calls == 1
+    # The fetch finished for everyone and was cached
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 1"]
+
+
+@pytest.mark.asyncio
+async def test_empty_results_expire_quickly_and_are_never_served_stale(clock, cache):
+    upstream = Upstream()
+    upstream.empty = True
+
+    assert await cache.get_or_fetch(QUERY, upstream) == []
+    assert await cache.get_or_fetch(QUERY, upstream) == []
+    assert upstream.calls == 1
+
+    upstream.empty = False
+    clock.now += 6
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 2"]
+    assert cache.stats["empty_results"] == 1 and cache.stats["stale_hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(cache):
+    upstream = Upstream(delay=0.01)
+    upstream.error = RuntimeError("LinkedIn returned 429")
+
+    results = await asyncio.gather(*(cache.get_or_fetch(QUERY, upstream) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert upstream.calls == 1
+
+    upstream.error = None
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 2"]
+    assert cache.stats["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_results(clock, cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(QUERY, upstream)
+
+    upstream.error = RuntimeError("LinkedIn returned 429")
+    clock.now += 120
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 1"]
+    await cache.wait_refreshes()
+
+    assert await cache.get_or_fetch(QUERY, upstream) == ["job 1"]
+    await cache.wait_refreshes()
+    assert cache.stats["refresh_errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_searches_are_evicted():
+    cache = JobSearchCache(max_entries=2)
+    upstream = Upstream()
+    first, second, third = (normalize_query(keyword) for keyword in ("a", "b", "c"))
+
+    await cache.get_or_fetch(first, upstream)
+    await cache.get_or_fetch(second, upstream)
+    await cache.get_or_fetch(first, upstream)
+    await cache.get_or_fetch(third, upstream)
+
+    assert set(cache._entries) == {first, third}
+    assert cache.stats["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_service_searches_share_cached_pages():
+    cache = JobSearchCache()
+    service = LinkedInJobsService(command=STUB_WORKER, pool_size=1, timeout=5, cache=cache)
+    try:
+        first = await service.search_jobs("Python Developer", location="Berlin", limit=3)
+        second = await service.search_jobs("python developer", location="berlin", limit=10)
+        assert [job.position for job in first] == ["Python Developer 1", "Python Developer 2", "Python Developer 3"]
+        assert len(second) == 10 and second[:3] == first
+
+        assert await service.search_jobs("error") == []
+        assert await service.search_jobs("error") == []
+
+        assert service.get_stats()["requests"] == 3
+        assert cache.get_stats()["hits"] == 1
+    finally:
+        await service.stop()
+
+
+def test_unusable_worker_answers_are_errors():
+    service = LinkedInJobsService(command=STUB_WORKER, cache=JobSearchCache())
+
+    assert service._parse_jobs([]) == []
+    with pytest.raises(NodeWorkerError):
+        service._parse_jobs({"error": "blocked"})
+    with pytest.raises(NodeWorkerError):
+        service._parse_jobs(["<html>captcha</html>"])
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from app.job_search_cache import JobSearchCache
+from app.linkedin_jobs_service import WORKER_SCRIPT, LinkedInJobsService
+from app.node_worker_pool import NodeWorkerError, NodeWorkerPool, NodeWorkerUnavailable
+
+STUB_WORKER = [sys.executable, str(Path(__file__).parent / "scripts" / "stub_linkedin_worker.py")]
+
+
+@pytest_asyncio.fixture
+async def service():
+    service = LinkedInJobsService(command=STUB_WORKER, pool_size=2, max_in_flight=2, timeout=5, cache=JobSearchCache())
+    yield service
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_parsed(service):
+    jobs = await service.search_jobs("python developer", location="Berlin", limit=3)
+
+    assert [job.position for job in jobs] == ["Python Developer 1", "Python Developer 2", "Python Developer 3"]
+    assert jobs[0].location == "Berlin"
+    assert jobs[0].job_url == "https://www.linkedin.com/jobs/view/1"
+    assert jobs[0].salary is None
+
+
+@pytest.mark.asyncio
+async def test_workers_are_reused_and_bounded(service):
+    for i in range(3):
+        await service.search_jobs(f"engineer {i}", limit=1)
+    assert service.get_stats()["worker_starts"] == 1
+
+    results = await asyncio.gather(*(service.search_jobs(f"developer {i}", limit=2) for i in range(10)))
+
+    assert all(len(jobs) == 2 for jobs in results)
+    stats = service.get_stats()
+    assert stats["worker_starts"] == 2
+    assert stats["workers"] == 2
+    assert stats["requests"] == 13
+
+
+@pytest.mark.asyncio
+async def test_worker_error_returns_no_jobs(service):
+    assert await service.search_jobs("error") == []
+    assert service.get_stats()["errors"] == 1
+    # The worker is still usable
+    assert len(await service.search_jobs("engineer", limit=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_request_timeout(monkeypatch):
+    monkeypatch.setenv("STUB_WORKER_DELAY", "0.4")
+    service = LinkedInJobsService(command=STUB_WORKER, pool_size=1, timeout=0.2, cache=JobSearchCache())
+    try:
+        assert await service.search_jobs("slow") == []
+        assert service.get_stats()["timeouts"] == 1
+        # The late answer is dropped and the next request gets its own
+        await asyncio.sleep(0.3)
+        assert len(await service.search_jobs("engineer", limit=2)) == 2
+    finally:
+        await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_replaced(service):
+    assert await service.search_jobs("crash") == []
+    stats = service.get_stats()
+    assert stats["retries"] == 1
+    assert stats["errors"] == 1
+
+    assert len(await service.search_jobs("engineer", limit=1)) == 1
+    assert service.get_stats()["restarts"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_health_check_drops_unresponsive_workers(service):
+    await service.search_jobs("engineer", limit=1)
+    worker = service.pool._workers[0]
+    assert await service.pool.health_check() == {worker.pid: True}
+
+    worker.process.kill()
+    await worker.process.wait()
+    assert await service.pool.health_check() == {worker.pid: False}
+
+    assert len(await service.search_jobs("designer", limit=1)) == 1
+    assert service.get_stats()["worker_starts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_that_never_becomes_ready():
+    pool = NodeWorkerPool([sys.executable, "-c", "import sys; sys.exit(3)"], size=1)
+    with pytest.raises(NodeWorkerUnavailable):
+        await pool.request("ping", timeout=1)
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is not installed")
+async def test_node_worker_protocol(tmp_path):
+    package = tmp_path / "linkedin-jobs-api"
+    package.mkdir()
+    (package / "index.js").write_text(
+        "module.exports.query = async (options) => {\n"
+        "  console.log('library chatter on stdout');\n"
+        "  if (options.keyword === 'error') throw new Error('blocked');\n"
+        "  return [{position: options.keyword, company: 'Acme', location: options.location, jobUrl: 'https://x/1'}];\n"
+        "};\n"
+    )
+    pool = NodeWorkerPool(["node", WORKER_SCRIPT], size=1, env={**os.environ, "NODE_PATH": str(tmp_path)})
+    try:
+        assert (await pool.request("ping", timeout=5))["pid"]
+        results = await asyncio.gather(*(
+            pool.request("search", {"keyword": f"role {i}", "location": "Remote"}, timeout=5) for i in range(5)
+        ))
+        assert [result[0]["position"] for result in results] == [f"role {i}" for i in range(5)]
+        with pytest.raises(NodeWorkerError, match="blocked"):
+            await pool.request("search", {"keyword": "error"}, timeout=5)
+        assert pool.get_stats()["worker_starts"] == 1
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is not installed")
+async def test_node_worker_reports_missing_package(tmp_path):
+    pool = NodeWorkerPool(["node", WORKER_SCRIPT], size=1, env={**os.environ, "NODE_PATH": str(tmp_path)}, cwd=str(tmp_path))
+    with pytest.raises(NodeWorkerUnavailable, match="linkedin-jobs-api"):
+        await pool.request("ping", timeout=5)
+    await pool.stop()
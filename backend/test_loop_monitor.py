@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.loop_monitor import LoopBlockDetector, run_blocking
+
+
+def hold_the_loop(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_detector_logs_stack_of_blocking_callback(caplog):
+    detector = LoopBlockDetector(threshold_ms=40)
+    detector.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="app.loop_monitor"):
+            hold_the_loop(0.3)
+            await asyncio.sleep(0.1)
+    finally:
+        await detector.stop()
+
+    stats = detector.get_stats()
+    assert stats["blocks"] == 1
+    assert stats["max_block_ms"] >= 150
+    assert not stats["running"]
+    assert "hold_the_loop" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_keeps_the_loop_free():
+    detector = LoopBlockDetector(threshold_ms=40)
+    detector.start()
+    try:
+        loop_thread = threading.get_ident()
+        threads = await asyncio.gather(
+            run_blocking(lambda: (time.sleep(0.2), threading.get_ident())[1]),
+            run_blocking(lambda: (time.sleep(0.2), threading.get_ident())[1]),
+        )
+    finally:
+        await detector.stop()
+
+    assert loop_thread not in threads
+    assert detector.get_stats()["blocks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_browser_tool_runs_playwright_off_the_loop():
+    from app.langchain_webbrowser import create_webbrowser_tool
+
+    calls = []
+
+    def fake_navigate(url):
+        calls.append(threading.get_ident())
+        return f"content of {url}"
+
+    with patch("app.langchain_webbrowser._sync_browser_navigate", fake_navigate):
+        result = await create_webbrowser_tool().ainvoke({"url": "https://example.com"})
+
+    assert result == "content of https://example.com"
+    assert calls and calls[0] != threading.get_ident()
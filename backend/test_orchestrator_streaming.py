@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import AsyncMock
+from langchain_core.messages import AIMessageChunk
+
+from app.orchestrator import stream_langgraph_updates, get_chunk_text
+
+
+class FakeGraph:
+    def __init__(self, events):
+        self.events = events
+        self.stream_mode = None
+
+    async def astream(self, graph_input, config=None, stream_mode="updates"):
+        self.stream_mode = stream_mode
+        for event in self.events:
+            if stream_mode == "updates":
+                if event[0] == "updates":
+                    yield event[1]
+            else:
+                yield event
+
+
+def test_chunk_text_reads_anthropic_content_blocks():
+    chunk = AIMessageChunk(content=[
+        {"type": "text", "text": "Hello", "index": 0},
+        {"type": "tool_use", "partial_json": "{", "index": 1},
+    ])
+    assert get_chunk_text(chunk) == "Hello"
+    assert get_chunk_text(AIMessageChunk(content=" world")) == " world"
+
+
+@pytest.mark.asyncio
+async def test_stream_tokens_forwards_conversation_deltas():
+    graph = FakeGraph([
+        ("messages", (AIMessageChunk(content="Hi"), {"langgraph_node": "conversation"})),
+        ("messages", (AIMessageChunk(content="ignored"), {"langgraph_node": "response_formatting"})),
+        ("messages", (AIMessageChunk(content=" there"), {"langgraph_node": "conversation"})),
+        ("updates", {"response_formatting": {"frontend_response": {"type": "message", "message": "Hi there"}}}),
+    ])
+    websocket = AsyncMock()
+
+    updates = [
+        update async for update in stream_langgraph_updates(
+            graph, {}, {}, websocket, page_id="page-1", stream_tokens=True
+        )
+    ]
+
+    assert graph.stream_mode == ["updates", "messages"]
+    frames = [call.args[0] for call in websocket.send_json.await_args_list]
+    assert frames == [
+        {"type": "message_chunk", "content": "Hi", "index": 0, "page_id": "page-1"},
+        {"type": "message_chunk", "content": " there", "index": 1, "page_id": "page-1"},
+    ]
+    assert updates == [("response_formatting", {"frontend_response": {"type": "message", "message": "Hi there"}})]
+
+
+@pytest.mark.asyncio
+async def test_without_stream_tokens_only_updates_are_yielded():
+    graph = FakeGraph([("updates", {"conversation": {"processing_stage": "conversation_complete"}})])
+    websocket = AsyncMock()
+
+    updates = [update async for update in stream_langgraph_updates(graph, {}, {}, websocket)]
+
+    assert graph.stream_mode == "updates"
+    assert updates == [("conversation", {"processing_stage": "conversation_complete"})]
+    websocket.send_json.assert_not_awaited()
@@ -0,0 +1,46 @@
+from langchain_core.messages import AIMessage
+
+from app.master_agent import (
+    STATIC_SYSTEM_PROMPT,
+    create_cached_system_prompt,
+    create_enhanced_system_prompt,
+)
+from app.orchestrator import PromptCacheMetrics
+
+
+def test_cached_prompt_puts_breakpoint_after_static_rules():
+    context = {"location": "Berlin", "current_time": "Monday, January 06, 2025 at 09:00 AM"}
+
+    blocks = create_cached_system_prompt("Ada", context)
+
+    assert blocks[0] == {"type": "text", "text": STATIC_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+    assert "cache_control" not in blocks[1]
+    assert "Ada" in blocks[1]["text"] and "Berlin" in blocks[1]["text"]
+    # The static prefix does not depend on the user
+    assert create_cached_system_prompt("Bob", {})[0] == blocks[0]
+    # The plain string prompt still contains both parts
+    assert create_enhanced_system_prompt("Ada", context) == f"{blocks[1]['text']}\n\n{STATIC_SYSTEM_PROMPT}"
+
+
+def test_prompt_cache_metrics_record_hits_and_misses():
+    metrics = PromptCacheMetrics()
+    miss = AIMessage(content="", usage_metadata={
+        "input_tokens": 3100, "output_tokens": 10, "total_tokens": 3110,
+        "input_token_details": {"cache_read": 0, "cache_creation": 3000},
+    })
+    hit = AIMessage(content="", usage_metadata={
+        "input_tokens": 3120, "output_tokens": 10, "total_tokens": 3130,
+        "input_token_details": {"cache_read": 3000, "cache_creation": 0},
+    })
+
+    metrics.record_usage(miss)
+    metrics.record_usage(hit)
+    metrics.record_usage(AIMessage(content="no usage"))
+
+    stats = metrics.get_stats()
+    assert stats["requests"] == 3
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 2
+    assert stats["cache_read_tokens"] == 3000
+    assert stats["cache_creation_tokens"] == 3000
+    assert stats["uncached_input_tokens"] == 220
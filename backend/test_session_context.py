@@ -0,0 +1,62 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.session_context import SessionContext, SessionContextRegistry, session_context_registry
+from app.user_events import publish_user_event, RESUME_UPDATED
+
+
+def make_context(prompt="prompt"):
+    return SessionContext(
+        user=SimpleNamespace(id="test_user_id", name="Test User"),
+        resume_data=None,
+        documents_count=2,
+        user_context={"name": "Test User"},
+        system_prompt=prompt,
+    )
+
+
+@pytest.mark.asyncio
+async def test_context_is_loaded_once_per_session():
+    registry = SessionContextRegistry()
+    loader = AsyncMock(return_value=make_context())
+
+    first = await registry.get_context("test_user_id", loader)
+    second = await registry.get_context("test_user_id", loader)
+
+    assert first is second
+    loader.assert_awaited_once()
+    assert registry.stats == {"hits": 1, "misses": 1, "invalidations": 0, "prompt_renders": 0}
+
+
+@pytest.mark.asyncio
+async def test_resume_update_event_invalidates_global_registry():
+    loader = AsyncMock(side_effect=[make_context("old"), make_context("new")])
+
+    await session_context_registry.get_context("test_user_id", loader)
+    publish_user_event("test_user_id", RESUME_UPDATED)
+    context = await session_context_registry.get_context("test_user_id", loader)
+
+    assert context.system_prompt == "new"
+    assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_conversation_context_reuses_db_work_across_turns():
+    from app.orchestrator import get_session_context
+
+    user = SimpleNamespace(id="user-ctx", name="Ada", first_name="Ada", last_name="L", email="a@x.io", address="")
+    state = {"user_id": "user-ctx", "db_session_id": "user-ctx", "messages": []}
+
+    with patch("app.orchestrator.get_user_by_id", AsyncMock(return_value=user)) as get_user, \
+         patch("app.orchestrator.get_resume_data_for_user", AsyncMock(return_value=None)) as get_resume, \
+         patch("app.orchestrator.get_documents_count_for_user", AsyncMock(return_value=3)):
+        first = await get_session_context(state, db_session=object())
+        second = await get_session_context(state, db_session=object())
+
+    assert get_user.await_count == 1
+    assert get_resume.await_count == 1
+    assert second.user is user
+    assert "Ada" in first.system_prompt[-1]["text"]
+    assert second.documents_count == 3
+    session_context_registry.invalidate("user-ctx")
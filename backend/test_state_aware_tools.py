@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+from app.state_aware_tools import StateAwareToolNode
+from app.orchestrator_tools import with_serialization_key, RESUME_SERIALIZATION_KEY
+
+
+def make_tool(name, events, delay=0.05):
+    async def run(query: str = "") -> str:
+        events.append(("start", name))
+        await asyncio.sleep(delay)
+        events.append(("end", name))
+        return f"{name} done"
+
+    return StructuredTool.from_function(coroutine=run, name=name, description=name)
+
+
+def make_tool_calls(*names):
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": name, "args": {"query": "x"}, "id": f"call_{i}"} for i, name in enumerate(names)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_independent_tool_calls_run_concurrently_in_order():
+    events = []
+    node = StateAwareToolNode([make_tool("search_jobs", events), make_tool("browse_web", events)])
+
+    result = await node.ainvoke({"messages": [make_tool_calls("search_jobs", "browse_web")]})
+
+    # Both started before either finished
+    assert events[:2] == [("start", "search_jobs"), ("start", "browse_web")]
+    assert [m.tool_call_id for m in result["messages"]] == ["call_0", "call_1"]
+    assert [m.content for m in result["messages"]] == ["search_jobs done", "browse_web done"]
+
+
+@pytest.mark.asyncio
+async def test_tools_sharing_serialization_key_run_sequentially():
+    events = []
+    resume_tools = with_serialization_key(
+        [make_tool("refine_cv", events), make_tool("enhanced_document_search", events)],
+        RESUME_SERIALIZATION_KEY,
+    )
+    node = StateAwareToolNode(resume_tools + [make_tool("search_jobs", events)])
+
+    result = await node.ainvoke(
+        {"messages": [make_tool_calls("refine_cv", "search_jobs", "enhanced_document_search")]}
+    )
+
+    resume_events = [event for event in events if event[1] != "search_jobs"]
+    assert resume_events == [
+        ("start", "refine_cv"),
+        ("end", "refine_cv"),
+        ("start", "enhanced_document_search"),
+        ("end", "enhanced_document_search"),
+    ]
+    # The job search overlapped with the resume chain
+    assert events.index(("start", "search_jobs")) < events.index(("end", "refine_cv"))
+    assert [m.tool_call_id for m in result["messages"]] == ["call_0", "call_1", "call_2"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_errors():
+    events = []
+
+    async def broken(query: str = "") -> str:
+        raise RuntimeError("boom")
+
+    tools = [
+        make_tool("a", events),
+        make_tool("b", events),
+        StructuredTool.from_function(coroutine=broken, name="broken", description="broken"),
+    ]
+    node = StateAwareToolNode(tools, max_concurrency=1)
+
+    result = await node.ainvoke({"messages": [make_tool_calls("a", "b", "broken", "missing")]})
+
+    assert events == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+    assert "Error executing broken" in result["messages"][2].content
+    assert result["messages"][3].content == "Tool missing not found"
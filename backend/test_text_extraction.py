@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from reportlab.pdfgen import canvas
+
+from app.text_extraction import TextExtractor, extract_text_sync, file_sha256, page_ranges
+
+
+def make_pdf(path, pages):
+    pdf = canvas.Canvas(str(path))
+    for number in range(pages):
+        pdf.drawString(72, 720, f"Page {number} experience")
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+@pytest.fixture
+def extractor():
+    extractor = TextExtractor(workers=2)
+    yield extractor
+    extractor.shutdown()
+
+
+def test_pool_does_not_fork_the_server(extractor):
+    extractor.start()
+    assert extractor._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+
+def test_page_ranges_cover_every_page():
+    assert page_ranges(20, 8) == [(0, 8), (8, 16), (16, 20)]
+    assert page_ranges(3, 8) == [(0, 3)]
+    assert page_ranges(0, 8) == []
+
+
+def test_text_file_falls_back_to_latin1(tmp_path):
+    path = tmp_path / "cv.txt"
+    path.write_bytes("Zürich café".encode("latin-1"))
+    assert extract_text_sync(path) == "Zürich café"
+
+
+@pytest.mark.asyncio
+async def test_large_pdf_is_split_across_workers(tmp_path, extractor):
+    path = make_pdf(tmp_path / "cv.pdf", 20)
+
+    with patch("app.text_extraction.page_ranges", wraps=lambda count: page_ranges(count, 8)) as ranges:
+        text = await extractor.extract(path)
+
+    ranges.assert_called_once_with(20)
+    lines = [line for line in text.splitlines() if line]
+    assert lines[0] == "Page 0 experience"
+    assert lines[-1] == "Page 19 experience"
+    assert len(lines) == 20
+    # One page count plus three page ranges
+    assert extractor.stats["pool_tasks"] == 4
+    assert text == extract_text_sync(path)
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_parsed_once(tmp_path, extractor):
+    first = make_pdf(tmp_path / "cv.pdf", 2)
+    copy = tmp_path / "cv-copy.pdf"
+    copy.write_bytes(first.read_bytes())
+
+    text = await extractor.extract(first)
+    tasks = extractor.stats["pool_tasks"]
+    assert await extractor.extract(first) == text
+    assert await extractor.extract(copy) == text
+
+    assert extractor.stats["pool_tasks"] == tasks
+    assert extractor.stats["cache_hits"] == 2
+    assert extractor.stats["extractions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_extraction(tmp_path, extractor):
+    path = make_pdf(tmp_path / "cv.pdf", 3)
+    results = await asyncio.gather(*(extractor.extract(path) for _ in range(5)))
+
+    assert len(set(results)) == 1
+    assert extractor.stats["extractions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_shared_extraction(tmp_path, extractor):
+    path = make_pdf(tmp_path / "cv.pdf", 3)
+
+    leader = asyncio.create_task(extractor.extract(path))
+    while not extractor._in_flight:
+        await asyncio.sleep(0.001)
+    follower = asyncio.create_task(extractor.extract(path))
+    # The follower joins the leader's extraction
+    while not extractor.stats["cache_hits"]:
+        await asyncio.sleep(0.001)
+    leader.cancel()
+
+    assert "Page 2 experience" in await follower
+    assert leader.cancelled()
+    assert extractor.stats["extractions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_extraction_is_not_cached(tmp_path, extractor):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf")
+
+    with pytest.raises(Exception):
+        await extractor.extract(path)
+    assert extractor.stats["errors"] == 1
+    assert extractor.get_stats()["cached"] == 0
+
+
+def test_file_hash_of_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert file_sha256(path) == "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+
+
+@pytest.mark.asyncio
+async def test_reprocess_cv_uses_stored_text():
+    from app import documents
+
+    doc = SimpleNamespace(id="doc-1", type="resume", content="Jane Doe, Python developer", path=None)
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = doc
+    db = AsyncMock()
+    db.execute.return_value = result
+    extract = AsyncMock()
+
+    with patch.object(documents.cv_processor, "extract_cv_information_from_text", AsyncMock(return_value="parsed")) as parse, \
+            patch.object(documents.text_extractor, "extract", extract):
+        response = await documents.reprocess_cv_extraction(
+            "doc-1", auto_update_profile=False, db=db, db_user=SimpleNamespace(id="user-1")
+        )
+
+    parse.assert_awaited_once_with("Jane Doe, Python developer")
+    extract.assert_not_called()
+    assert response["extracted_info"] == "parsed"
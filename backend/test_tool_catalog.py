@@ -0,0 +1,66 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from app.tool_catalog import ToolCatalog
+from app.user_events import publish_user_event, DOCUMENTS_CHANGED
+
+
+@pytest.fixture
+def mock_user():
+    return SimpleNamespace(id="test_user_id")
+
+
+@pytest.mark.asyncio
+async def test_tools_are_built_once_per_session(mock_user):
+    catalog = ToolCatalog()
+    session = object()
+    tools = [SimpleNamespace(name="search_jobs_linkedin_api")]
+
+    with patch("app.orchestrator_tools.create_all_tools", AsyncMock(return_value=tools)) as create_all_tools:
+        first = await catalog.get_tools(mock_user, session)
+        second = await catalog.get_tools(mock_user, session)
+
+    assert first is second
+    create_all_tools.assert_awaited_once()
+    assert catalog.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tools_are_rebuilt_after_invalidation_or_new_session(mock_user):
+    catalog = ToolCatalog()
+    session = object()
+    tools = [SimpleNamespace(name="list_documents")]
+
+    with patch("app.orchestrator_tools.create_all_tools", AsyncMock(return_value=tools)) as create_all_tools:
+        await catalog.get_tools(mock_user, session)
+        catalog.invalidate_user(mock_user.id)
+        await catalog.get_tools(mock_user, session)
+        await catalog.get_tools(mock_user, object())
+
+    assert create_all_tools.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_documents_changed_event_invalidates_global_catalog(mock_user):
+    from app.tool_catalog import tool_catalog
+
+    session = object()
+    with patch("app.orchestrator_tools.create_all_tools", AsyncMock(return_value=[SimpleNamespace(name="t")])):
+        await tool_catalog.get_tools(mock_user, session)
+        publish_user_event(mock_user.id, DOCUMENTS_CHANGED)
+
+    assert mock_user.id not in tool_catalog._entries
+
+
+def test_bound_model_is_shared_for_same_tool_names():
+    catalog = ToolCatalog()
+    llm = MagicMock()
+    llm_factory = MagicMock(return_value=llm)
+    tools = [SimpleNamespace(name="a"), SimpleNamespace(name="b")]
+
+    first = catalog.get_bound_model("claude", llm_factory, tools)
+    second = catalog.get_bound_model("claude", llm_factory, list(tools))
+
+    assert first is second
+    llm.bind_tools.assert_called_once_with(tools)
@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, AsyncMock
+
+from app.vector_store import _document_chunks, _document_version, _sync_documents, SYNC_STATE_KEY
+
+
+def make_document(doc_id="doc-1", content="Python developer with FastAPI experience.", updated=None):
+    return SimpleNamespace(
+        id=doc_id,
+        type="resume",
+        name="cv.pdf",
+        content=content,
+        date_updated=updated or datetime(2025, 1, 1, 12, 0, 0),
+    )
+
+
+def make_db(collection, rows=()):
+    """Mock AsyncSession returning the collection first and the embedding rows second."""
+    collection_result = MagicMock()
+    collection_result.scalar_one_or_none.return_value = collection
+    rows_result = MagicMock()
+    rows_result.all.return_value = list(rows)
+
+    db = AsyncMock()
+    db.execute.side_effect = [collection_result, rows_result, MagicMock()]
+    return db
+
+
+def test_document_chunks_are_deterministic():
+    doc = make_document(content="Experience\n" + "Built APIs. " * 300)
+
+    first = _document_chunks(doc)
+    second = _document_chunks(doc)
+
+    assert [chunk_id for chunk_id, _, _ in first] == [chunk_id for chunk_id, _, _ in second]
+    assert all(chunk_id.startswith("doc-1:") for chunk_id, _, _ in first)
+    assert all(metadata["document_id"] == "doc-1" for _, _, metadata in first)
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_embedding_when_nothing_changed():
+    doc = make_document()
+    collection = SimpleNamespace(
+        uuid="collection-uuid",
+        cmetadata={SYNC_STATE_KEY: {doc.id: _document_version(doc)}},
+    )
+    db = make_db(collection)
+    vector_store = MagicMock()
+    vector_store.aadd_texts = AsyncMock()
+
+    result = await _sync_documents(vector_store, "user_1", [doc], db)
+
+    assert result.skipped
+    vector_store.aadd_texts.assert_not_awaited()
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_embeds_only_new_chunks_and_prunes_stale_rows():
+    doc = make_document(updated=datetime(2025, 2, 1))
+    (kept_id, _, _), = _document_chunks(make_document())
+    collection = SimpleNamespace(
+        uuid="collection-uuid",
+        cmetadata={SYNC_STATE_KEY: {doc.id: "2025-01-01T12:00:00", "deleted-doc": "2025-01-01T12:00:00"}},
+    )
+    rows = [
+        ("row-kept", kept_id, {"document_id": doc.id}),
+        ("row-deleted-doc", "deleted-doc:abc", {"document_id": "deleted-doc"}),
+        ("row-legacy", "legacy-uuid", {}),
+        ("row-memory", "memory-uuid", {"memory_id": "m1"}),
+    ]
+    db = make_db(collection, rows)
+    vector_store = MagicMock()
+    vector_store.aadd_texts = AsyncMock()
+
+    result = await _sync_documents(vector_store, "user_1", [doc], db)
+
+    # Content is unchanged, so the existing chunk is reused even though the timestamp moved
+    vector_store.aadd_texts.assert_not_awaited()
+    assert result.embedded == 0
+    assert result.deleted == 2
+    assert collection.cmetadata[SYNC_STATE_KEY] == {doc.id: _document_version(doc)}
+    db.commit.assert_awaited_once()